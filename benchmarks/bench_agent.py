@@ -0,0 +1,55 @@
+"""
+Latency of run_agent() with a cold agent (rebuilt per query, as before)
+vs the shared warm agent. A zero-latency fake LLM answers immediately,
+so the numbers are pure construction and framework overhead:
+
+    python -m benchmarks.bench_agent
+"""
+
+import contextlib
+import io
+import time
+
+import src.agents as agents
+from benchmarks.fakes import FakeChatModel
+
+
+RUNS = 200
+
+
+def time_per_call(fn, runs=RUNS):
+    """Average wall-clock milliseconds per call (agent output silenced)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(runs):
+            fn()
+        return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    fake = FakeChatModel(response="Thought: I know this\nFinal Answer: 42")
+    agents.get_llm = lambda: fake
+
+    def cold():
+        agents.clear_agent_cache()
+        return agents.run_agent("What is the answer?", verbose=False)
+
+    def warm():
+        return agents.run_agent("What is the answer?", verbose=False)
+
+    print("=" * 50)
+    print(f"AGENT COLD VS WARM ({RUNS} runs, fake LLM)")
+    print("=" * 50)
+
+    build = time_per_call(agents.create_research_agent)
+    cold_ms = time_per_call(cold)
+    warm()
+    warm_ms = time_per_call(warm)
+    print(f"  Build agent only:     {build:7.3f} ms")
+    print(f"  Cold run_agent:       {cold_ms:7.3f} ms")
+    print(f"  Warm run_agent:       {warm_ms:7.3f} ms")
+    print(f"  Speedup:              {cold_ms / warm_ms:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Load test: blocking chat()/run_research_workflow() vs the async API.
+
+A fake LLM sleeps LATENCY seconds per call to stand in for Bedrock:
+
+    python -m benchmarks.bench_async
+"""
+
+import asyncio
+import contextlib
+import io
+import time
+
+import src.chains as chains
+import src.nodes as nodes
+from src.workflows import run_research_workflow, arun_research_workflow
+from benchmarks.fakes import FakeChatModel
+
+
+LATENCY = 0.05
+SERIAL_REQUESTS = 20
+CONCURRENT_REQUESTS = 200
+
+
+def report(label, requests, elapsed):
+    """Print throughput for a batch of requests"""
+    print(f"  {label:<38} {requests:>4} req in {elapsed:6.2f}s "
+          f"= {requests / elapsed:8.1f} req/s")
+
+
+async def run_concurrently(make_call, requests):
+    """Await requests copies of make_call() on one event loop"""
+    start = time.perf_counter()
+    await asyncio.gather(*(make_call(i) for i in range(requests)))
+    return time.perf_counter() - start
+
+
+def main():
+    fake = FakeChatModel(latency=LATENCY)
+    chains.get_shared_llm = lambda *args, **kwargs: fake
+    chains.invalidate_chain_cache()
+    nodes.get_llm = lambda: fake
+
+    print("=" * 50)
+    print(f"ASYNC LOAD TEST (fake LLM latency {LATENCY * 1000:.0f} ms)")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    for i in range(SERIAL_REQUESTS):
+        chains.chat("English", f"message {i}")
+    report("chat() serial", SERIAL_REQUESTS, time.perf_counter() - start)
+
+    elapsed = asyncio.run(run_concurrently(
+        lambda i: chains.achat("English", f"message {i}"), CONCURRENT_REQUESTS))
+    report("achat() on one event loop", CONCURRENT_REQUESTS, elapsed)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for i in range(SERIAL_REQUESTS):
+            run_research_workflow(f"query {i}")
+        serial = time.perf_counter() - start
+
+        concurrent = asyncio.run(run_concurrently(
+            lambda i: arun_research_workflow(f"query {i}"), CONCURRENT_REQUESTS))
+    report("run_research_workflow() serial", SERIAL_REQUESTS, serial)
+    report("arun_research_workflow() on one loop", CONCURRENT_REQUESTS, concurrent)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Throughput of summarize_many() at increasing concurrency vs a serial loop.
+
+A fake LLM sleeps LATENCY seconds per call to stand in for Bedrock:
+
+    python -m benchmarks.bench_batch
+"""
+
+import time
+
+import src.chains as chains
+from benchmarks.fakes import FakeChatModel
+
+
+LATENCY = 0.05
+DOCUMENTS = 64
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32]
+
+
+def main():
+    fake = FakeChatModel(latency=LATENCY)
+    chains.get_shared_llm = lambda *args, **kwargs: fake
+    chains.invalidate_chain_cache()
+    texts = [f"Document {i} about renewable energy." for i in range(DOCUMENTS)]
+
+    print("=" * 50)
+    print(f"BATCH SUMMARIZE ({DOCUMENTS} docs, fake latency {LATENCY * 1000:.0f} ms)")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    for text in texts:
+        chains.summarize(text)
+    serial = time.perf_counter() - start
+    print(f"  Serial loop:          {DOCUMENTS / serial:7.1f} docs/s")
+
+    for level in CONCURRENCY_LEVELS:
+        start = time.perf_counter()
+        chains.summarize_many(texts, max_concurrency=level)
+        elapsed = time.perf_counter() - start
+        print(f"  max_concurrency={level:<3}  {DOCUMENTS / elapsed:7.1f} docs/s "
+              f"({serial / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Per-request overhead of fresh vs shared Bedrock clients.
+
+Runs against a local stub of the bedrock-runtime InvokeModel endpoint,
+so no AWS account is needed:
+
+    python -m benchmarks.bench_client
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.client import (
+    create_client, create_llm, get_shared_client, get_shared_llm,
+    clear_shared_clients
+)
+
+
+REQUESTS = 200
+
+
+class StubBedrockHandler(BaseHTTPRequestHandler):
+    """Answers every InvokeModel call with a fixed completion"""
+    protocol_version = "HTTP/1.1"  # keep connections alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        body = json.dumps({"output": {"message": {"content": [{"text": "ok"}]}}})
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    """Start the stub endpoint on a free local port"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubBedrockHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def invoke(client):
+    """Send one small InvokeModel request"""
+    response = client.invoke_model(
+        modelId="us.amazon.nova-lite-v1:0",
+        body=json.dumps({"messages": [{"role": "user", "content": [{"text": "hi"}]}]})
+    )
+    return response["body"].read()
+
+
+def time_per_request(fn, requests=REQUESTS):
+    """Average wall-clock milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    return (time.perf_counter() - start) / requests * 1000
+
+
+def main():
+    # Requests must be signed, but the stub ignores the signature
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+    server, endpoint_url = start_stub_server()
+    clear_shared_clients()
+
+    print("=" * 50)
+    print(f"CLIENT OVERHEAD ({REQUESTS} requests, stub at {endpoint_url})")
+    print("=" * 50)
+
+    fresh = time_per_request(
+        lambda: invoke(create_client(endpoint_url=endpoint_url)))
+    shared = time_per_request(
+        lambda: invoke(get_shared_client(endpoint_url=endpoint_url)))
+    print(f"  Fresh client per request:  {fresh:.2f} ms")
+    print(f"  Shared client per request: {shared:.2f} ms")
+    print(f"  Speedup: {fresh / shared:.1f}x")
+
+    get_shared_llm(endpoint_url=endpoint_url)  # warm the registry
+    fresh_llm = time_per_request(
+        lambda: create_llm(create_client(endpoint_url=endpoint_url)), 50)
+    shared_llm = time_per_request(
+        lambda: get_shared_llm(endpoint_url=endpoint_url), 50)
+    print(f"\n  Fresh ChatBedrock build:   {fresh_llm:.2f} ms")
+    print(f"  Shared ChatBedrock lookup: {shared_llm:.4f} ms")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Recording throughput of the monitoring collectors at increasing thread counts.
+
+Each thread records into one of a few locked stripes, so adding threads should not make
+recording slower per call (under the GIL total throughput stays roughly flat;
+free-threaded builds can scale):
+
+    python -m benchmarks.bench_collectors
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.errors import ErrorTracker
+from src.feedback import FeedbackCollector
+from src.performance import PerformanceMonitor
+
+
+CALLS = 40000
+THREAD_COUNTS = [1, 2, 4, 8]
+
+RUN = {
+    "execution_time": 1.2,
+    "token_estimate": 300,
+    "error": None,
+    "trace_metadata": {"steps": [
+        {"step_name": "research", "duration": 0.6, "tokens": 150, "status": "success"},
+        {"step_name": "summary", "duration": 0.6, "tokens": 150, "status": "success"}
+    ]}
+}
+
+
+def _throughput(record, threads: int) -> float:
+    per_thread = CALLS // threads
+
+    def work(_):
+        for i in range(per_thread):
+            record(i)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(work, range(threads)))
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def main():
+    print("=" * 50)
+    print(f"COLLECTOR THROUGHPUT ({CALLS} calls, calls/s)")
+    print("=" * 50)
+    print(f"  {'threads':<8} {'record_run':>12} {'log_error':>12} {'feedback':>12}")
+
+    for threads in THREAD_COUNTS:
+        monitor = PerformanceMonitor()
+        tracker = ErrorTracker()
+        collector = FeedbackCollector()
+        runs = _throughput(lambda i: monitor.record_run(RUN), threads)
+        errors = _throughput(lambda i: tracker.log_error("Request timed out"), threads)
+        feedback = _throughput(lambda i: collector.submit_feedback("t", i % 5 + 1), threads)
+        print(f"  {threads:<8} {runs:12.0f} {errors:12.0f} {feedback:12.0f}")
+
+        # Merged totals must be exact whatever the thread count
+        assert monitor.get_summary()["total_runs"] == CALLS
+        assert tracker.error_counts["timeout"] == CALLS
+        assert collector.get_summary()["total_feedback"] == CALLS
+
+
+if __name__ == "__main__":
+    main()
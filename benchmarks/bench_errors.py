@@ -0,0 +1,80 @@
+"""
+Error classification speed over a synthetic corpus.
+
+Compares the original nested keyword scan with the compiled single-pass
+classifier, with and without its LRU of recent messages:
+
+    python -m benchmarks.bench_errors
+"""
+
+import random
+import time
+
+from src.errors import ErrorTracker, compile_error_classifier
+
+
+MESSAGES = 100000
+DISTINCT = 2000
+EXTRA_CATEGORIES = 40  # User-registered categories for the scaling rows
+
+TEMPLATES = [
+    "Read timed out after {n}s calling bedrock-runtime",
+    "ThrottlingException: Rate limit exceeded for model, retry in {n}ms",
+    "ValidationException: input is too long, context length {n} exceeds limit",
+    "Could not connect to the endpoint URL: connection reset (attempt {n})",
+    "Failed to parse JSON output at line {n}",
+    "UnrecognizedClientException: The security token included is unauthorized",
+    "Unexpected tool result {n} while composing the final answer",
+]
+
+
+def _legacy_classifier(error_types):
+    def classify(message: str) -> str:
+        lower = message.lower()
+        for error_type, keywords in error_types.items():
+            if any(keyword in lower for keyword in keywords):
+                return error_type
+        return "unknown"
+    return classify
+
+
+_legacy_classify = _legacy_classifier(ErrorTracker.ERROR_TYPES)
+
+
+def _time(classify, corpus) -> float:
+    start = time.perf_counter()
+    for message in corpus:
+        classify(message)
+    return (time.perf_counter() - start) / len(corpus) * 1e6
+
+
+def main():
+    random.seed(0)
+    distinct = [random.choice(TEMPLATES).format(n=i) for i in range(DISTINCT)]
+    corpus = [random.choice(distinct) for _ in range(MESSAGES)]
+    compiled = compile_error_classifier(ErrorTracker.ERROR_TYPES)
+    tracker = ErrorTracker()
+
+    assert all(compiled(m.lower()) == _legacy_classify(m) for m in distinct)
+
+    print("=" * 50)
+    print(f"ERROR CLASSIFICATION ({MESSAGES} messages, {DISTINCT} distinct)")
+    print("=" * 50)
+    print(f"  Nested keyword scan:      {_time(_legacy_classify, corpus):6.2f} us/msg")
+    print(f"  Compiled, no cache:       {_time(lambda m: compiled(m.lower()), corpus):6.2f} us/msg")
+    print(f"  Compiled + LRU:           {_time(tracker.classify_error, corpus):6.2f} us/msg")
+
+    extra = {
+        f"service_{i}": [f"svc{i}-failure", f"svc{i} unavailable", f"quota {i} reached"]
+        for i in range(EXTRA_CATEGORIES)
+    }
+    error_types = {**ErrorTracker.ERROR_TYPES, **extra}
+    legacy = _legacy_classifier(error_types)
+    compiled = compile_error_classifier(error_types)
+    print(f"\n  With {EXTRA_CATEGORIES} registered categories:")
+    print(f"  Nested keyword scan:      {_time(legacy, corpus):6.2f} us/msg")
+    print(f"  Compiled, no cache:       {_time(lambda m: compiled(m.lower()), corpus):6.2f} us/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Cost of token estimation per call and for deduplicated batches.
+
+    python -m benchmarks.bench_tokens
+"""
+
+import random
+import time
+
+from src.tracing import bpe_token_count, estimate_tokens, estimate_tokens_bulk
+
+
+TEXTS = 20000
+SAMPLE = (
+    "Solar panels convert sunlight into electricity. Installation costs "
+    "vary by region; a typical 6 kW system costs $15,000-$20,000. "
+    "def payback(cost, savings):\n    return cost / savings\n"
+    "太阳能电池板将阳光转化为电能。"
+)
+
+
+def main():
+    random.seed(0)
+    words = SAMPLE.split(" ")
+    texts = [" ".join(random.sample(words, 12)) for _ in range(TEXTS)]
+    repeated = texts[:TEXTS // 10] * 10
+
+    print("=" * 50)
+    print(f"TOKEN ESTIMATION ({TEXTS} texts)")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    for text in texts:
+        bpe_token_count(text)
+    uncached = (time.perf_counter() - start) / TEXTS * 1e6
+    print(f"  Single text, no memo:     {uncached:6.2f} us/call")
+
+    estimate_tokens(SAMPLE)
+    start = time.perf_counter()
+    for _ in range(TEXTS):
+        estimate_tokens(SAMPLE)
+    memo = (time.perf_counter() - start) / TEXTS * 1e6
+    print(f"  Repeated text, memo hit:  {memo:6.2f} us/call")
+
+    start = time.perf_counter()
+    estimate_tokens_bulk(texts)
+    bulk = (time.perf_counter() - start) / TEXTS * 1e6
+    print(f"  Batch, all distinct:      {bulk:6.2f} us/text")
+
+    start = time.perf_counter()
+    estimate_tokens_bulk(repeated)
+    bulk_repeated = (time.perf_counter() - start) / TEXTS * 1e6
+    print(f"  Batch, 10x duplicates:    {bulk_repeated:6.2f} us/text")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Graph build/compile cost vs invoke cost for the research workflows, and
+wall-clock time of the parallel fan-out vs the conditional workflow.
+
+Build/invoke use a zero-latency fake LLM, so those numbers are pure
+framework overhead:
+
+    python -m benchmarks.bench_workflows
+"""
+
+import contextlib
+import io
+import time
+
+import src.nodes as nodes
+from src.state import create_initial_state
+from src.workflows import WORKFLOW_BUILDERS, get_workflow, clear_workflow_cache
+from benchmarks.fakes import FakeChatModel
+
+
+RUNS = 100
+FANOUT_LATENCY = 0.1
+FANOUT_RUNS = 5
+
+
+def time_per_call(fn, runs=RUNS):
+    """Average wall-clock milliseconds per call (node output silenced)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(runs):
+            fn()
+        return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    fake = FakeChatModel()
+    nodes.get_llm = lambda: fake
+    clear_workflow_cache()
+
+    print("=" * 50)
+    print(f"WORKFLOW BUILD VS INVOKE ({RUNS} runs)")
+    print("=" * 50)
+
+    for workflow_type, builder in WORKFLOW_BUILDERS.items():
+        state = create_initial_state("benchmark query")
+        build = time_per_call(builder)
+        invoke = time_per_call(lambda: get_workflow(workflow_type).invoke(state))
+        per_query_before = time_per_call(lambda: builder().invoke(state))
+
+        print(f"\n  {workflow_type.upper()}:")
+        print(f"    Build + compile:        {build:.2f} ms")
+        print(f"    Invoke (cached graph):  {invoke:.2f} ms")
+        print(f"    Per query, rebuilding:  {per_query_before:.2f} ms")
+        print(f"    Saved per query:        {per_query_before - invoke:.2f} ms")
+
+    # Brief research that mentions price triggers both follow-up branches
+    slow = FakeChatModel(response="The price is high.", latency=FANOUT_LATENCY)
+    nodes.get_llm = lambda: slow
+    state = create_initial_state("benchmark query")
+
+    print(f"\n  FAN-OUT (fake latency {FANOUT_LATENCY * 1000:.0f} ms per call):")
+    for workflow_type in ["conditional", "parallel"]:
+        elapsed = time_per_call(lambda: get_workflow(workflow_type).invoke(state), FANOUT_RUNS)
+        with contextlib.redirect_stdout(io.StringIO()):
+            steps = get_workflow(workflow_type).invoke(state)["step_count"]
+        print(f"    {workflow_type:<12} {elapsed:7.1f} ms/query, {steps} LLM steps")
+    print(f"    Serial equivalent of 5 steps: {5 * FANOUT_LATENCY * 1000:.1f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,87 +1,189 @@
+import re
+import threading
+from concurrent.futures import Future
+from contextvars import ContextVar
+from typing import List, Optional, Union
+
 from langchain.tools import Tool
 from langchain.agents import create_react_agent, AgentExecutor
+from langchain.agents.agent import RunnableMultiActionAgent
+from langchain.agents.output_parsers import ReActSingleInputOutputParser
 from langchain.prompts import PromptTemplate
-from src.client import create_llm
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from src.cache import ToolResultCache
+from src.client import get_shared_llm
+
+
+# Most tool calls run at once when the agent plans several in one step
+DEFAULT_MAX_PARALLEL_TOOLS = 4
+
+# Pool for the tool calls of the planning step being executed (if any)
+_step_pool: ContextVar = ContextVar("agent_step_pool", default=None)
+
+# One "Action: ... Action Input: ..." pair; the input runs to the next Action
+_ACTION_PATTERN = re.compile(
+    r"Action\s*\d*\s*:[\s]*(.*?)\s*Action\s*\d*\s*Input\s*\d*\s*:[\s]*(.*?)"
+    r"(?=\n\s*Action\s*\d*\s*:|\Z)",
+    re.DOTALL
+)
 
 
 def get_llm():
     """Get LLM instance for agent"""
-    return create_llm()
+    return get_shared_llm()
 
 
-def create_agent_tools():
-    """Create tools that the agent can choose from"""
-    llm = get_llm()
+def _llm_tool_funcs(llm, name, log_message, build_prompt, result_label, error_label,
+                    cache=None):
+    """Build the sync and async functions for a tool that asks the LLM"""
 
-    def research_tool(topic: str) -> str:
-        """Research a topic"""
-        print("🔍 Tool: Researching '{topic}'")
-        try:
-            response = llm.invoke(
-                f"Research and provide key information about: {topic}")
-            return f"Research Results: {response.content}"
-        except Exception as e:
-            return f"Research Error: {str(e)}"
+    def ask(text: str) -> str:
+        return llm.invoke(build_prompt(text)).content
 
-    def analyze_tool(data: str) -> str:
-        """Analyze data"""
-        print("📊 Tool: Analyzing data")
-        try:
-            response = llm.invoke(
-                f"Analyze this information and provide insights: {data[:500]}")
-            return f"Analysis: {response.content}"
-        except Exception as e:
-            return f"Analysis Error: {str(e)}"
+    async def aask(text: str) -> str:
+        return (await llm.ainvoke(build_prompt(text))).content
 
-    def summarize_tool(content: str) -> str:
-        """Summarize content"""
-        print("📝 Tool: Summarizing")
+    def run(text: str) -> str:
+        print(log_message)
         try:
-            response = llm.invoke(
-                f"Provide a clear, concise summary of: {content[:500]}")
-            return f"Summary: {response.content}"
+            content = cache.call(name, text, ask) if cache is not None else ask(text)
+            return f"{result_label}: {content}"
         except Exception as e:
-            return f"Summary Error: {str(e)}"
+            return f"{error_label}: {str(e)}"
 
-    def fact_check_tool(claim: str) -> str:
-        """Fact-check a claim"""
-        print("✅ Tool: Fact-checking")
+    async def arun(text: str) -> str:
+        print(log_message)
         try:
-            response = llm.invoke(
-                f"Evaluate the accuracy of this claim and provide evidence: {claim}")
-            return f"Fact Check: {response.content}"
+            if cache is not None:
+                content = await cache.acall(name, text, aask)
+            else:
+                content = await aask(text)
+            return f"{result_label}: {content}"
         except Exception as e:
-            return f"Fact Check Error: {str(e)}"
+            return f"{error_label}: {str(e)}"
+
+    return run, arun
+
+
+def create_agent_tools(llm=None, cache: Optional[ToolResultCache] = None):
+    """Create tools that the agent can choose from (results memoized in cache)"""
+    llm = llm or get_llm()
 
-    # Package each function as a Tool
+    research_tool, aresearch_tool = _llm_tool_funcs(
+        llm, "Research", "🔍 Tool: Researching '{topic}'",
+        lambda topic: f"Research and provide key information about: {topic}",
+        "Research Results", "Research Error", cache)
+
+    analyze_tool, aanalyze_tool = _llm_tool_funcs(
+        llm, "Analyze", "📊 Tool: Analyzing data",
+        lambda data: f"Analyze this information and provide insights: {data[:500]}",
+        "Analysis", "Analysis Error", cache)
+
+    summarize_tool, asummarize_tool = _llm_tool_funcs(
+        llm, "Summarize", "📝 Tool: Summarizing",
+        lambda content: f"Provide a clear, concise summary of: {content[:500]}",
+        "Summary", "Summary Error", cache)
+
+    fact_check_tool, afact_check_tool = _llm_tool_funcs(
+        llm, "FactCheck", "✅ Tool: Fact-checking",
+        lambda claim: f"Evaluate the accuracy of this claim and provide evidence: {claim}",
+        "Fact Check", "Fact Check Error", cache)
+
+    # Package each function as a Tool (coroutine is used by ainvoke)
     tools = [
         Tool(
             name="Research",
             description="Research any topic to gather comprehensive information",
-            func=research_tool),
+            func=research_tool,
+            coroutine=aresearch_tool),
         Tool(
             name="Analyze",
             description="Analyze data or information to extract insights and patterns",
-            func=analyze_tool),
+            func=analyze_tool,
+            coroutine=aanalyze_tool),
         Tool(
             name="Summarize",
             description="Create a concise summary of content or information",
-            func=summarize_tool),
+            func=summarize_tool,
+            coroutine=asummarize_tool),
         Tool(
             name="FactCheck",
             description="Verify the accuracy of claims and provide evidence",
-            func=fact_check_tool),
+            func=fact_check_tool,
+            coroutine=afact_check_tool),
     ]
 
     return tools
 
 
-def create_research_agent():
+class MultiActionReActParser(ReActSingleInputOutputParser):
+    """ReAct parser that also accepts several Action/Action Input pairs at once"""
+
+    def parse(self, text: str) -> Union[AgentAction, List[AgentAction], AgentFinish]:
+        matches = list(_ACTION_PATTERN.finditer(text))
+        if len(matches) < 2 or "Final Answer:" in text:
+            return super().parse(text)
+
+        actions = []
+        for i, match in enumerate(matches):
+            # Each action logs only its own lines (the first keeps the thought),
+            # so the scratchpad lists every action next to its observation
+            start = 0 if i == 0 else match.start()
+            log = text[start:match.end()].rstrip()
+            tool_input = match.group(2).strip().strip('"')
+            actions.append(AgentAction(match.group(1).strip(), tool_input, log))
+        return actions
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor that runs all tool calls from one planning step concurrently.
+
+    Sync runs use a thread pool (async runs already gather). Observations
+    are returned in the order the agent listed the actions, so the
+    scratchpad is the same however the calls finish.
+    """
+
+    max_parallel_tools: int = DEFAULT_MAX_PARALLEL_TOOLS
+
+    def _perform_agent_action(self, name_to_tool_map, color_mapping, agent_action,
+                              run_manager=None):
+        pool = _step_pool.get()
+        if pool is None:
+            return super()._perform_agent_action(
+                name_to_tool_map, color_mapping, agent_action, run_manager)
+        # Hand back a future; _iter_next_step resolves them in order
+        return pool.submit(super()._perform_agent_action, name_to_tool_map,
+                           color_mapping, agent_action, run_manager)
+
+    def _iter_next_step(self, name_to_tool_map, color_mapping, inputs,
+                        intermediate_steps, run_manager=None):
+        with ContextThreadPoolExecutor(max_workers=self.max_parallel_tools) as pool:
+            token = _step_pool.set(pool)
+            try:
+                items = list(super()._iter_next_step(
+                    name_to_tool_map, color_mapping, inputs,
+                    intermediate_steps, run_manager))
+            finally:
+                _step_pool.reset(token)
+            for item in items:
+                yield item.result() if isinstance(item, Future) else item
+
+
+PARALLEL_TOOLS_INSTRUCTIONS = """
+When several tools are needed and do not depend on each other (for example
+Research and FactCheck), list one Action and Action Input pair per tool before
+waiting for any Observation. They will run at the same time."""
+
+
+def create_research_agent(parallel_tools: bool = False,
+                          tool_cache: Optional[ToolResultCache] = None):
     """Create an agent that autonomously selects tools"""
     print("🤖 Building research agent...")
 
     llm = get_llm()
-    tools = create_agent_tools()
+    tools = create_agent_tools(llm, tool_cache)
 
     # Instructions for the agent
     agent_prompt = PromptTemplate.from_template(
@@ -93,20 +195,30 @@ Tool descriptions:
 {tools}
 
 Think step by step about which tools to use to help answer the user's request.
-
+""" + (PARALLEL_TOOLS_INSTRUCTIONS if parallel_tools else "") + """
 User Request: {input}
 
 {agent_scratchpad}""")
 
     # Create ReAct agent (Reasoning + Acting)
-    agent = create_react_agent(
-        llm=llm,
-        tools=tools,
-        prompt=agent_prompt
-    )
+    if parallel_tools:
+        agent = RunnableMultiActionAgent(runnable=create_react_agent(
+            llm=llm,
+            tools=tools,
+            prompt=agent_prompt,
+            output_parser=MultiActionReActParser()
+        ))
+        executor_class = ParallelAgentExecutor
+    else:
+        agent = create_react_agent(
+            llm=llm,
+            tools=tools,
+            prompt=agent_prompt
+        )
+        executor_class = AgentExecutor
 
     # Create executor
-    executor = AgentExecutor(
+    executor = executor_class(
         agent=agent,
         tools=tools,
         verbose=True,  # Show the thinking process
@@ -118,10 +230,91 @@ User Request: {input}
     return executor
 
 
-def run_agent(query: str) -> str:
-    """Run the research agent on a query"""
-    agent = create_research_agent()
-    result = agent.invoke({"input": query})
+# Built agents are reused by every thread and task: invoke() keeps its
+# state in locals, so one executor can serve concurrent queries.
+# parallel_tools -> (llm it was built with, executor)
+_agents = {}
+# Tool results shared by the built agents, as (llm they came from, cache)
+_tool_cache = None
+_agents_lock = threading.Lock()
+
+
+def _tool_cache_for(llm) -> ToolResultCache:
+    """Tool cache for results of this LLM (call with _agents_lock held)"""
+    global _tool_cache
+    if _tool_cache is None or _tool_cache[0] is not llm:
+        _tool_cache = (llm, ToolResultCache())
+    return _tool_cache[1]
+
+
+def get_research_agent(parallel_tools: bool = False):
+    """Get the shared research agent, building it on first use"""
+    llm = get_llm()
+    entry = _agents.get(parallel_tools)
+    # Rebuild if the shared LLM was replaced since the agent was built
+    if entry is None or entry[0] is not llm:
+        with _agents_lock:
+            entry = _agents.get(parallel_tools)
+            if entry is None or entry[0] is not llm:
+                agent = create_research_agent(parallel_tools, _tool_cache_for(llm))
+                entry = (llm, agent)
+                _agents[parallel_tools] = entry
+    return entry[1]
+
+
+def get_tool_cache() -> Optional[ToolResultCache]:
+    """Tool result cache of the shared agents (None before one is built)"""
+    entry = _tool_cache
+    return entry[1] if entry is not None else None
+
+
+def clear_agent_cache():
+    """Drop shared agents and their cached tool results (rebuilt on next use)"""
+    global _tool_cache
+    with _agents_lock:
+        _agents.clear()
+        _tool_cache = None
+
+
+def _agent_for_call(parallel_tools: bool, max_iterations: Optional[int],
+                    verbose: Optional[bool]):
+    """Shared agent, or a shallow copy of it carrying per-call overrides"""
+    agent = get_research_agent(parallel_tools)
+    overrides = {}
+    if max_iterations is not None:
+        overrides["max_iterations"] = max_iterations
+    if verbose is not None:
+        overrides["verbose"] = verbose
+    # The copy shares the agent, tools and LLM; the shared one is never mutated
+    return agent.model_copy(update=overrides) if overrides else agent
+
+
+def run_agent(query: str, parallel_tools: bool = False, max_iterations: Optional[int] = None,
+              verbose: Optional[bool] = None, config: Optional[dict] = None) -> str:
+    """
+    Run the research agent on a query.
+
+    Args:
+        query: User request
+        parallel_tools: Allow several tool calls per planning step
+        max_iterations: Override the agent's iteration limit for this call
+        verbose: Override the agent's verbose logging for this call
+        config: Optional RunnableConfig (callbacks, tags, metadata)
+
+    Returns:
+        The agent's final answer
+    """
+    agent = _agent_for_call(parallel_tools, max_iterations, verbose)
+    result = agent.invoke({"input": query}, config=config)
+    return result["output"]
+
+
+async def arun_agent(query: str, parallel_tools: bool = False,
+                     max_iterations: Optional[int] = None, verbose: Optional[bool] = None,
+                     config: Optional[dict] = None) -> str:
+    """Run the research agent on a query without blocking the event loop"""
+    agent = _agent_for_call(parallel_tools, max_iterations, verbose)
+    result = await agent.ainvoke({"input": query}, config=config)
     return result["output"]
 
 
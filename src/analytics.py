@@ -0,0 +1,113 @@
+"""Joins between user feedback and recorded workflow runs."""
+
+from typing import Optional
+
+import numpy as np
+
+
+# Run fields available to queries, as (run record key, column name)
+RUN_COLUMNS = [
+    ("execution_time", "execution_time"),
+    ("step_count", "step_count"),
+    ("token_estimate", "tokens"),
+    ("cost_estimate", "cost"),
+    ("has_error", "has_error")
+]
+
+
+class TraceAnalytics:
+    """
+    Answer questions like "p95 latency of runs rated 1-2 stars".
+
+    Feedback and runs are joined on trace_id with one hash lookup per
+    distinct trace (PerformanceMonitor's trace index), so a join is linear
+    in the data instead of a nested scan. Filtering and statistics then
+    run on NumPy columns.
+    """
+
+    def __init__(self, monitor, feedback):
+        self.monitor = monitor
+        self.feedback = feedback
+
+    def join(self) -> dict:
+        """
+        Pair every feedback entry with the run of the same trace.
+
+        Feedback for traces the monitor has not indexed is left out.
+
+        Returns:
+            Dict of equal-length NumPy arrays: trace_id, score, timestamp,
+            execution_time, step_count, tokens, cost, has_error
+        """
+        feedback = self.feedback.get_columns()
+        runs = self.monitor.get_run_index()
+
+        # Resolve each distinct trace once, then broadcast to its rows
+        positions = {}
+        inverse = np.fromiter(
+            (positions.setdefault(t, len(positions)) for t in feedback["trace_id"]),
+            dtype=np.int64, count=len(feedback["trace_id"])
+        )
+        matched = [runs.get(trace_id) for trace_id in positions]
+        found = np.array([run is not None for run in matched], dtype=bool)
+        rows = found[inverse]
+
+        joined = {
+            "trace_id": feedback["trace_id"][rows],
+            "score": feedback["score"][rows],
+            "timestamp": feedback["timestamp"][rows]
+        }
+        for key, column in RUN_COLUMNS:
+            per_trace = np.array(
+                [run[key] if run is not None else 0 for run in matched], dtype=np.float64
+            )
+            joined[column] = per_trace[inverse][rows]
+        joined["has_error"] = joined["has_error"].astype(bool)
+        return joined
+
+    def _select(self, metric: str, min_score: int, max_score: int) -> np.ndarray:
+        joined = self.join()
+        if metric not in joined:
+            raise ValueError(f"Unknown metric: {metric}")
+        mask = (joined["score"] >= min_score) & (joined["score"] <= max_score)
+        return joined[metric][mask]
+
+    def percentile(self, q: float, metric: str = "execution_time",
+                   min_score: int = 1, max_score: int = 5) -> Optional[float]:
+        """
+        Percentile of a run metric over runs rated within a score range.
+
+        Args:
+            q: Percentile between 0 and 100 (e.g. 95)
+            metric: Joined column, e.g. "execution_time" or "step_count"
+            min_score: Lowest feedback score included
+            max_score: Highest feedback score included
+
+        Returns:
+            The percentile, or None when no rated run matches
+        """
+        values = self._select(metric, min_score, max_score)
+        return float(np.percentile(values, q)) if len(values) else None
+
+    def metric_by_score(self, metric: str = "execution_time") -> dict:
+        """
+        Summarize a run metric for each feedback score.
+
+        Returns:
+            {score: {"count", "mean", "p50", "p95"}} for scores with rated runs
+        """
+        joined = self.join()
+        if metric not in joined:
+            raise ValueError(f"Unknown metric: {metric}")
+
+        result = {}
+        for score in range(1, 6):
+            values = joined[metric][joined["score"] == score]
+            if len(values):
+                result[score] = {
+                    "count": int(len(values)),
+                    "mean": float(values.mean()),
+                    "p50": float(np.percentile(values, 50)),
+                    "p95": float(np.percentile(values, 95))
+                }
+        return result
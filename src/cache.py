@@ -0,0 +1,576 @@
+"""Response caching for LLM calls."""
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Optional
+
+import numpy as np
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace and case so trivially different prompts share a key"""
+    return re.sub(r"\s+", " ", prompt).strip().casefold()
+
+
+def serialize_generations(generations) -> str:
+    """Serialize cached generations to a JSON string"""
+    rows = []
+    for generation in generations:
+        if isinstance(generation, ChatGeneration):
+            rows.append({
+                "message": message_to_dict(generation.message),
+                "generation_info": generation.generation_info
+            })
+        else:
+            rows.append({
+                "text": generation.text,
+                "generation_info": generation.generation_info
+            })
+    return json.dumps(rows)
+
+
+def deserialize_generations(data: str):
+    """Rebuild generations from serialize_generations() output"""
+    generations = []
+    for row in json.loads(data):
+        if "message" in row:
+            message = messages_from_dict([row["message"]])[0]
+            generations.append(ChatGeneration(
+                message=message, generation_info=row["generation_info"]))
+        else:
+            generations.append(Generation(
+                text=row["text"], generation_info=row["generation_info"]))
+    return generations
+
+
+class MemoryCacheTier:
+    """In-memory LRU cache tier with optional time-to-live"""
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = 3600,
+                 clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.bytes_stored = 0
+        self.evictions = 0
+        # Key -> (expires_at, value, size in bytes)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value, size = entry
+            if expires_at is not None and self.clock() >= expires_at:
+                del self._entries[key]
+                self.bytes_stored -= size
+                self.evictions += 1
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, size: int):
+        """Store a value, evicting the least recently used entries if full"""
+        expires_at = self.clock() + self.ttl if self.ttl else None
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes_stored -= old[2]
+
+            self._entries[key] = (expires_at, value, size)
+            self.bytes_stored += size
+
+            while len(self._entries) > self.max_entries:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.bytes_stored -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes_stored = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheTier:
+    """Persistent cache tier stored in a SQLite file"""
+
+    def __init__(self, path: str, ttl: Optional[float] = None):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored JSON string, or None if missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created = row
+            if self.ttl is not None and time.time() - created >= self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return value
+
+    def set(self, key: str, value: str):
+        """Store a JSON string"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def bytes_stored(self) -> int:
+        """Total size of stored values"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM llm_cache"
+            ).fetchone()
+        return row[0]
+
+
+class LLMResponseCache(BaseCache):
+    """
+    Two-tier LLM response cache (memory LRU in front of optional SQLite).
+
+    Keys combine the model id, model kwargs (both carried in LangChain's
+    llm_string) and the prompt. Attach it to a model with
+    src.client.set_response_cache() or ChatBedrock(cache=...).
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = 3600,
+                 sqlite_path: Optional[str] = None, normalize: bool = False,
+                 clock=time.monotonic):
+        self.normalize = normalize
+        self.memory = MemoryCacheTier(max_entries, ttl, clock)
+        self.disk = SQLiteCacheTier(sqlite_path, ttl) if sqlite_path else None
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def make_key(self, prompt: str, llm_string: str) -> str:
+        """Hash the model config and (optionally normalized) prompt"""
+        if self.normalize:
+            prompt = normalize_prompt(prompt)
+        raw = f"{llm_string}\x00{prompt}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, prompt: str, llm_string: str):
+        """Look up cached generations for a prompt and model config"""
+        key = self.make_key(prompt, llm_string)
+
+        generations = self.memory.get(key)
+        if generations is None and self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None:
+                generations = deserialize_generations(data)
+                self.memory.set(key, generations, len(data))
+
+        self._count(generations is not None)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val):
+        """Store generations for a prompt and model config"""
+        key = self.make_key(prompt, llm_string)
+        data = serialize_generations(return_val)
+        self.memory.set(key, return_val, len(data))
+        if self.disk is not None:
+            self.disk.set(key, data)
+
+    def clear(self, **kwargs):
+        """Remove every cached response from both tiers"""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def get_stats(self) -> dict:
+        """Get hit rate, size and eviction counters"""
+        lookups = self.hits + self.misses
+        disk_bytes = self.disk.bytes_stored() if self.disk is not None else 0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.memory),
+            "memory_bytes": self.memory.bytes_stored,
+            "disk_bytes": disk_bytes,
+            "bytes_stored": self.memory.bytes_stored + disk_bytes,
+            "evictions": self.memory.evictions
+        }
+
+
+# Words too common to say anything about what a query is asking for
+STOP_WORDS = {
+    "a", "an", "the", "of", "for", "to", "in", "on", "and", "or",
+    "is", "are", "what", "how", "about", "me", "tell"
+}
+
+
+# Whole words outweigh their trigrams, so "install" and "uninstall" (which
+# share most trigrams) stay far apart
+WORD_WEIGHT = 4.0
+
+# Words that flip a query's meaning; they must match for a semantic hit
+NEGATIONS = {"no", "not", "never", "without", "non", "nor", "cannot"}
+
+_REQUIRED_PATTERN = re.compile(r"\d+(?:\.\d+)?|\w+n't|\w+")
+
+
+def _stem(word: str) -> str:
+    """Drop a plural "s" so "panel" and "panels" share their word feature"""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def required_tokens(text: str) -> frozenset:
+    """Numbers and negations in a query ("2023", "not", "don't")"""
+    return frozenset(
+        token for token in _REQUIRED_PATTERN.findall(text.casefold())
+        if token[0].isdigit() or token in NEGATIONS or token.endswith("n't")
+    )
+
+
+def hashing_embed(text: str, dim: int = 1024) -> np.ndarray:
+    """
+    Embed text offline with a deterministic hashing vectorizer.
+
+    Each content word contributes itself (weighted WORD_WEIGHT, after
+    dropping a plural "s") and its character trigrams, so reordered queries
+    and plurals ("panel"/"panels") land close together while words that
+    merely look alike ("install"/"uninstall") do not. It has no notion of
+    synonyms: "cost of solar panels" and "solar panel prices" score about
+    0.6, below the default threshold.
+
+    Returns:
+        Unit-length float32 vector of size dim
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in re.findall(r"\w+", text.casefold()):
+        if word in STOP_WORDS:
+            continue
+        padded = f"#{word}#"
+        features = [(_stem(word), WORD_WEIGHT)]
+        features += [(padded[i:i + 3], 1.0) for i in range(len(padded) - 2)]
+        for feature, weight in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % dim] += weight if h & 0x80000000 else -weight
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """
+    Cache keyed by meaning: a lookup hits when a stored query is similar enough.
+
+    Query embeddings live in a preallocated NumPy matrix that is searched
+    with one matrix-vector product. When full, the oldest entry is replaced.
+    With the default hashing_embed only rewordings that share content words
+    hit (reordered, plural, extra filler words); to match synonyms such as
+    cost/prices, pass a real sentence embedding as embed_fn. Queries whose
+    required_fn tokens differ (by default numbers and negations, so "cost
+    2023" vs "cost 2024") never hit, whatever their similarity.
+    """
+
+    def __init__(self, threshold: float = 0.85, max_entries: int = 1000,
+                 ttl: Optional[float] = None, embed_fn=hashing_embed,
+                 dim: int = 1024, clock=time.monotonic,
+                 required_fn=required_tokens):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embed_fn = embed_fn
+        self.required_fn = required_fn
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._expires = np.full(max_entries, np.inf)
+        self._queries = [None] * max_entries
+        self._values = [None] * max_entries
+        self._required = [None] * max_entries
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, query: str):
+        """Return the value cached for the most similar query, or None"""
+        vector = self.embed_fn(query)
+        required = self.required_fn(query) if self.required_fn else None
+        with self._lock:
+            if self._size:
+                scores = self._vectors[:self._size] @ vector
+                scores[self._expires[:self._size] <= self.clock()] = -np.inf
+                # Best candidate above the threshold whose required tokens match
+                candidates = np.flatnonzero(scores >= self.threshold)
+                for slot in candidates[np.argsort(-scores[candidates])]:
+                    if self._required[slot] == required:
+                        self.hits += 1
+                        return self._values[slot]
+            self.misses += 1
+            return None
+
+    def update(self, query: str, value):
+        """Store a value under a query's embedding"""
+        vector = self.embed_fn(query)
+        with self._lock:
+            slot = self._next
+            if self._values[slot] is not None:
+                self.evictions += 1
+            self._vectors[slot] = vector
+            self._expires[slot] = self.clock() + self.ttl if self.ttl else np.inf
+            self._queries[slot] = query
+            self._values[slot] = value
+            self._required[slot] = self.required_fn(query) if self.required_fn else None
+            self._next = (slot + 1) % self.max_entries
+            self._size = max(self._size, slot + 1)
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._vectors[:] = 0
+            self._expires[:] = np.inf
+            self._queries = [None] * self.max_entries
+            self._values = [None] * self.max_entries
+            self._required = [None] * self.max_entries
+            self._size = 0
+            self._next = 0
+
+    def get_stats(self) -> dict:
+        """Get hit rate, size and eviction counters"""
+        lookups = self.hits + self.misses
+        value_bytes = sum(len(str(v)) for v in self._values[:self._size])
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._size,
+            "bytes_stored": self._vectors.nbytes + value_bytes,
+            "evictions": self.evictions
+        }
+
+
+# Seconds a tool result stays fresh. 0 means never cached (the answer
+# changes on every call); None means cached until evicted.
+DEFAULT_TOOL_TTLS = {
+    "Research": 24 * 3600,
+    "Analyze": 3600,
+    "Summarize": 3600,
+    "FactCheck": 300,
+    "CurrentTime": 0
+}
+
+
+class ToolResultCache:
+    """
+    Memoize agent tool results with a time-to-live per tool.
+
+    Inputs are keyed after normalize_prompt(), so an agent repeating an
+    action with different spacing or case reuses the result. Identical
+    calls that arrive while the first is still running wait for it instead
+    of calling the tool again (single-flight). Failures are never cached.
+    """
+
+    def __init__(self, ttls: Optional[dict] = None, default_ttl: Optional[float] = 0,
+                 max_entries: int = 500, clock=time.monotonic):
+        self.ttls = dict(DEFAULT_TOOL_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._tiers = {}
+        self._stats = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def ttl_for(self, tool: str) -> Optional[float]:
+        """TTL policy for a tool (0 means never cached)"""
+        return self.ttls.get(tool, self.default_ttl)
+
+    def _count(self, tool: str, outcome: str):
+        with self._lock:
+            stats = self._stats.get(tool)
+            if stats is None:
+                stats = self._stats[tool] = {"hits": 0, "coalesced": 0, "misses": 0}
+            stats[outcome] += 1
+
+    def _tier(self, tool: str) -> MemoryCacheTier:
+        tier = self._tiers.get(tool)
+        if tier is None:
+            with self._lock:
+                tier = self._tiers.get(tool)
+                if tier is None:
+                    tier = MemoryCacheTier(self.max_entries, self.ttl_for(tool), self.clock)
+                    self._tiers[tool] = tier
+        return tier
+
+    def _claim(self, tool: str, key: str, make_future):
+        """Return (future, is_leader) for the in-flight call on a key"""
+        with self._lock:
+            future = self._in_flight.get((tool, key))
+            if future is not None:
+                return future, False
+            future = self._in_flight[(tool, key)] = make_future()
+            return future, True
+
+    def _release(self, tool: str, key: str):
+        with self._lock:
+            self._in_flight.pop((tool, key), None)
+
+    def call(self, tool: str, tool_input: str, func):
+        """
+        Return func(tool_input), served from cache when possible.
+
+        Args:
+            tool: Tool name, used to pick the TTL policy
+            tool_input: Raw input given to the tool
+            func: Function running the tool on an input
+
+        Returns:
+            The (possibly cached) tool result
+        """
+        if self.ttl_for(tool) == 0:
+            return func(tool_input)
+
+        key = normalize_prompt(tool_input)
+        tier = self._tier(tool)
+        value = tier.get(key)
+        if value is None:
+            future, leader = self._claim(tool, key, Future)
+            if not leader:
+                self._count(tool, "coalesced")
+                return future.result()
+            try:
+                # The previous leader may have finished since our lookup
+                value = tier.get(key)
+                if value is None:
+                    value = func(tool_input)
+                    tier.set(key, value, len(str(value)))
+                    self._count(tool, "misses")
+                    future.set_result(value)
+                    return value
+                future.set_result(value)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                self._release(tool, key)
+        self._count(tool, "hits")
+        return value
+
+    async def acall(self, tool: str, tool_input: str, afunc):
+        """Async call(): afunc is a coroutine function running the tool"""
+        if self.ttl_for(tool) == 0:
+            return await afunc(tool_input)
+
+        key = normalize_prompt(tool_input)
+        tier = self._tier(tool)
+        value = tier.get(key)
+        if value is None:
+            loop = asyncio.get_running_loop()
+            # Async waiters are tied to their event loop, so flights are per loop
+            flight_key = f"{id(loop)}\x00{key}"
+            future, leader = self._claim(tool, flight_key, loop.create_future)
+            if not leader:
+                self._count(tool, "coalesced")
+                return await asyncio.shield(future)
+            try:
+                value = tier.get(key)
+                if value is None:
+                    value = await afunc(tool_input)
+                    tier.set(key, value, len(str(value)))
+                    self._count(tool, "misses")
+                    future.set_result(value)
+                    return value
+                future.set_result(value)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except BaseException as e:
+                future.set_exception(e)
+                # Retrieve it so a failure nobody waited for is not logged
+                future.exception()
+                raise
+            finally:
+                self._release(tool, flight_key)
+        self._count(tool, "hits")
+        return value
+
+    def clear(self):
+        """Remove every cached result"""
+        for tier in list(self._tiers.values()):
+            tier.clear()
+
+    def get_tool_stats(self) -> dict:
+        """Hits, coalesced calls, misses and hit rate for each tool"""
+        with self._lock:
+            snapshot = {tool: dict(stats) for tool, stats in self._stats.items()}
+        for tool, stats in snapshot.items():
+            lookups = stats["hits"] + stats["coalesced"] + stats["misses"]
+            saved = stats["hits"] + stats["coalesced"]
+            stats["hit_rate"] = saved / lookups if lookups else 0.0
+            tier = self._tiers.get(tool)
+            stats["entries"] = len(tier) if tier is not None else 0
+        return snapshot
+
+    def get_stats(self) -> dict:
+        """Get hit rate, size and eviction counters over all tools"""
+        tools = self.get_tool_stats()
+        # Coalesced calls were answered without running the tool, so they count as hits
+        hits = sum(stats["hits"] + stats["coalesced"] for stats in tools.values())
+        misses = sum(stats["misses"] for stats in tools.values())
+        tiers = list(self._tiers.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": sum(len(tier) for tier in tiers),
+            "bytes_stored": sum(tier.bytes_stored for tier in tiers),
+            "evictions": sum(tier.evictions for tier in tiers),
+            "tools": tools
+        }
@@ -1,5 +1,6 @@
 """Chain implementations for LangChain application."""
 
+import threading
 from langchain_core.output_parsers import StrOutputParser
 from langchain.chains.llm import LLMChain
 from langchain.chains.sequential import (
@@ -8,21 +9,112 @@ from langchain.chains.sequential import (
 )
 from langchain.prompts import PromptTemplate
 from src.prompts import get_prompt_by_name
-from src.client import create_client, create_llm
+from src.client import DEFAULT_MODEL_ID, DEFAULT_MODEL_KWARGS, get_shared_llm
+from src.tracing import time_stream, atime_stream
 
 
-def build_chain(prompt_name="assistant"):
+# Upper bound on in-flight Bedrock calls for the *_many batch helpers
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Compiled chains, reused across calls
+# Key = (chain kind, prompt name, model id, merged model kwargs)
+# Value = (LLM the chain was built with, chain)
+_chain_cache = {}
+_chain_cache_lock = threading.Lock()
+_chain_cache_stats = {"hits": 0, "misses": 0}
+
+
+def build_chain(prompt_name="assistant", model_id=DEFAULT_MODEL_ID,
+                model_kwargs=None):
     """Build and return an LCEL chain."""
+    return _compose_chain(prompt_name, get_shared_llm(model_id, model_kwargs))
+
+
+def _compose_chain(prompt_name, llm):
+    """Build a prompt | llm | StrOutputParser() chain."""
     prompt = get_prompt_by_name(prompt_name)
-    client = create_client()
-    llm = create_llm(client)
     chain = prompt | llm | StrOutputParser()
     return chain
 
 
+def _get_cached_chain(kind, prompt_name, model_id, model_kwargs, builder):
+    """
+    Look up a compiled chain, building it with builder(llm) on a miss.
+
+    The chain is also rebuilt when get_shared_llm() no longer returns the
+    LLM it was built with (e.g. after clear_shared_clients()).
+    """
+    merged_kwargs = {**DEFAULT_MODEL_KWARGS, **(model_kwargs or {})}
+    key = (
+        kind,
+        prompt_name,
+        model_id,
+        tuple(sorted(merged_kwargs.items()))
+    )
+    llm = get_shared_llm(model_id, model_kwargs)
+    with _chain_cache_lock:
+        entry = _chain_cache.get(key)
+        if entry is not None and entry[0] is llm:
+            _chain_cache_stats["hits"] += 1
+            return entry[1]
+        _chain_cache_stats["misses"] += 1
+        chain = builder(llm)
+        _chain_cache[key] = (llm, chain)
+        return chain
+
+
+def get_chain(prompt_name="assistant", model_id=DEFAULT_MODEL_ID,
+              model_kwargs=None):
+    """
+    Get a compiled LCEL chain, building it only on first use.
+
+    Args:
+        prompt_name: Prompt to use ("assistant" or "summarizer")
+        model_id: Bedrock model identifier
+        model_kwargs: Overrides for the default model kwargs
+
+    Returns:
+        Cached prompt | llm | StrOutputParser() chain
+    """
+    return _get_cached_chain(
+        "lcel", prompt_name, model_id, model_kwargs,
+        lambda llm: _compose_chain(prompt_name, llm)
+    )
+
+
+def invalidate_chain_cache(prompt_name=None):
+    """
+    Drop cached chains so they are rebuilt on next use.
+
+    Args:
+        prompt_name: Only drop chains for this prompt (default: drop all)
+    """
+    with _chain_cache_lock:
+        if prompt_name is None:
+            _chain_cache.clear()
+            return
+        for key in [k for k in _chain_cache if k[1] == prompt_name]:
+            del _chain_cache[key]
+
+
+def get_chain_cache_stats():
+    """Get chain cache hit/miss counters"""
+    with _chain_cache_lock:
+        hits = _chain_cache_stats["hits"]
+        misses = _chain_cache_stats["misses"]
+        size = len(_chain_cache)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "size": size,
+        "hit_rate": hits / lookups if lookups else 0.0
+    }
+
+
 def chat(language, message):
     """Send a message and get a response."""
-    chain = build_chain("assistant")
+    chain = get_chain("assistant")
     response = chain.invoke({
         "language": language,
         "message": message
@@ -30,9 +122,18 @@ def chat(language, message):
     return response
 
 
+async def achat(language, message):
+    """Send a message and get a response without blocking the event loop."""
+    chain = get_chain("assistant")
+    return await chain.ainvoke({
+        "language": language,
+        "message": message
+    })
+
+
 def summarize(text, length="brief"):
     """Summarize text."""
-    chain = build_chain("summarizer")
+    chain = get_chain("summarizer")
     response = chain.invoke({
         "text": text,
         "length": length
@@ -40,6 +141,132 @@ def summarize(text, length="brief"):
     return response
 
 
+async def asummarize(text, length="brief"):
+    """Summarize text without blocking the event loop."""
+    chain = get_chain("summarizer")
+    return await chain.ainvoke({
+        "text": text,
+        "length": length
+    })
+
+
+def stream_chat(language, message):
+    """
+    Stream a response to a message.
+
+    Yields:
+        Text deltas as the model produces them. Time to first token is
+        recorded in src.tracing.stream_timings.
+    """
+    chain = get_chain("assistant")
+    yield from time_stream(chain.stream({
+        "language": language,
+        "message": message
+    }), "chat")
+
+
+async def astream_chat(language, message):
+    """Async version of stream_chat()."""
+    chain = get_chain("assistant")
+    async for delta in atime_stream(chain.astream({
+        "language": language,
+        "message": message
+    }), "chat"):
+        yield delta
+
+
+def stream_summarize(text, length="brief"):
+    """
+    Stream a summary of text.
+
+    Yields:
+        Text deltas as the model produces them. Time to first token is
+        recorded in src.tracing.stream_timings.
+    """
+    chain = get_chain("summarizer")
+    yield from time_stream(chain.stream({
+        "text": text,
+        "length": length
+    }), "summarize")
+
+
+async def astream_summarize(text, length="brief"):
+    """Async version of stream_summarize()."""
+    chain = get_chain("summarizer")
+    async for delta in atime_stream(chain.astream({
+        "text": text,
+        "length": length
+    }), "summarize"):
+        yield delta
+
+
+def chat_many(language, messages, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """
+    Send many messages as one batch.
+
+    Args:
+        language: Language to respond in
+        messages: List of user messages
+        max_concurrency: Most requests in flight at once
+
+    Returns:
+        List of responses in input order. A failed item is returned as
+        its exception instead of failing the whole batch.
+    """
+    chain = get_chain("assistant")
+    inputs = [{"language": language, "message": m} for m in messages]
+    return chain.batch(
+        inputs,
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    )
+
+
+async def achat_many(language, messages, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """Async version of chat_many()."""
+    chain = get_chain("assistant")
+    inputs = [{"language": language, "message": m} for m in messages]
+    return await chain.abatch(
+        inputs,
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    )
+
+
+def summarize_many(texts, length="brief", max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """
+    Summarize many texts as one batch.
+
+    Args:
+        texts: List of texts to summarize
+        length: Summary length for every text ("brief" or "detailed")
+        max_concurrency: Most requests in flight at once
+
+    Returns:
+        List of summaries in input order. A failed item is returned as
+        its exception instead of failing the whole batch.
+    """
+    chain = get_chain("summarizer")
+    inputs = [{"text": text, "length": length} for text in texts]
+    return chain.batch(
+        inputs,
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    )
+
+
+async def asummarize_many(texts, length="brief",
+                          max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """Async version of summarize_many()."""
+    chain = get_chain("summarizer")
+    inputs = [{"text": text, "length": length} for text in texts]
+    return await chain.abatch(
+        inputs,
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    )
+
+
 def build_simple_chain(llm):
     """
     Build a two-step chain: generate ideas, then evaluate them.
@@ -130,9 +357,10 @@ def generate_and_evaluate(topic):
     Returns:
         The AI's evaluation of which idea is best
     """
-    client = create_client()
-    llm = create_llm(client)
-    chain = build_simple_chain(llm)
+    chain = _get_cached_chain(
+        "simple_sequential", None, DEFAULT_MODEL_ID, None,
+        build_simple_chain
+    )
     return chain.run(topic)
 
 
@@ -146,7 +374,8 @@ def research_pipeline(topic):
     Returns:
         Dictionary with keys: research, outline, summary
     """
-    client = create_client()
-    llm = create_llm(client)
-    chain = build_research_chain(llm)
+    chain = _get_cached_chain(
+        "research_sequential", None, DEFAULT_MODEL_ID, None,
+        build_research_chain
+    )
     return chain({"topic": topic})
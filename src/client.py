@@ -1,29 +1,180 @@
 import os
+import threading
 import boto3
+from botocore.config import Config
 from dotenv import load_dotenv
 from langchain_aws import ChatBedrock
 
 
-def create_client():
+DEFAULT_REGION = "us-east-1"
+DEFAULT_MODEL_ID = "us.amazon.nova-lite-v1:0"
+DEFAULT_MODEL_KWARGS = {
+    "max_tokens": 1500,
+    "temperature": 0.7
+}
+
+# Connection pool settings (override with BEDROCK_MAX_POOL_CONNECTIONS
+# and BEDROCK_TCP_KEEPALIVE in .env)
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+DEFAULT_TCP_KEEPALIVE = True
+
+# Process-wide registries of shared clients and LLMs
+# Key = tuple of the settings used to build the object
+_registry_lock = threading.Lock()
+_clients = {}
+_llms = {}
+_env_loaded = False
+
+# Optional response cache attached to shared LLMs (see set_response_cache)
+_response_cache = None
+_bypass_cache_when_sampling = False
+
+
+def _load_env():
+    """Load .env once per process"""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+
+def _pool_settings(max_pool_connections=None, tcp_keepalive=None):
+    """Resolve connection pool settings from arguments or environment"""
+    if max_pool_connections is None:
+        max_pool_connections = int(os.getenv(
+            "BEDROCK_MAX_POOL_CONNECTIONS", DEFAULT_MAX_POOL_CONNECTIONS))
+    if tcp_keepalive is None:
+        env_value = os.getenv("BEDROCK_TCP_KEEPALIVE")
+        if env_value is None:
+            tcp_keepalive = DEFAULT_TCP_KEEPALIVE
+        else:
+            tcp_keepalive = env_value.lower() in ("1", "true", "yes")
+    return max_pool_connections, tcp_keepalive
+
+
+def create_client(region_name=DEFAULT_REGION, endpoint_url=None,
+                  max_pool_connections=None, tcp_keepalive=None):
     """Create AWS Bedrock client"""
-    load_dotenv()
+    _load_env()
+    max_pool_connections, tcp_keepalive = _pool_settings(
+        max_pool_connections, tcp_keepalive)
 
     return boto3.client(
         service_name="bedrock-runtime",
-        region_name="us-east-1"
+        region_name=region_name,
+        endpoint_url=endpoint_url,
+        config=Config(
+            max_pool_connections=max_pool_connections,
+            tcp_keepalive=tcp_keepalive
+        )
     )
 
 
-def create_llm(client=None):
+def create_llm(client=None, model_id=DEFAULT_MODEL_ID, model_kwargs=None,
+               cache=None):
     """Create LLM instance"""
     if client is None:
-        client = create_client()
+        client = get_shared_client()
 
     return ChatBedrock(
-        model_id="us.amazon.nova-lite-v1:0",
+        model_id=model_id,
         client=client,
-        model_kwargs={
-            "max_tokens": 1500,
-            "temperature": 0.7
-        }
+        model_kwargs={**DEFAULT_MODEL_KWARGS, **(model_kwargs or {})},
+        cache=cache
+    )
+
+
+def _cache_for(model_kwargs):
+    """Pick the response cache for a model config (False = never cache)"""
+    if _bypass_cache_when_sampling and model_kwargs.get("temperature", 0) > 0:
+        # None would fall back to LangChain's global LLM cache
+        return False
+    return _response_cache
+
+
+def get_shared_client(region_name=DEFAULT_REGION, endpoint_url=None,
+                      max_pool_connections=None, tcp_keepalive=None):
+    """
+    Get the process-wide Bedrock client for these settings.
+
+    The client is built on first use and reused afterwards, so its
+    connection pool (and any open TLS connections) survive across requests.
+
+    Returns:
+        boto3 bedrock-runtime client
+    """
+    max_pool_connections, tcp_keepalive = _pool_settings(
+        max_pool_connections, tcp_keepalive)
+    key = (region_name, endpoint_url, max_pool_connections, tcp_keepalive)
+
+    client = _clients.get(key)
+    if client is None:
+        with _registry_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = create_client(
+                    region_name=region_name,
+                    endpoint_url=endpoint_url,
+                    max_pool_connections=max_pool_connections,
+                    tcp_keepalive=tcp_keepalive
+                )
+                _clients[key] = client
+    return client
+
+
+def get_shared_llm(model_id=DEFAULT_MODEL_ID, model_kwargs=None,
+                   **client_settings):
+    """
+    Get the process-wide ChatBedrock instance for a model config.
+
+    Args:
+        model_id: Bedrock model identifier
+        model_kwargs: Overrides for DEFAULT_MODEL_KWARGS
+        **client_settings: Passed to get_shared_client()
+
+    Returns:
+        ChatBedrock instance shared by every caller with the same config
+    """
+    merged_kwargs = {**DEFAULT_MODEL_KWARGS, **(model_kwargs or {})}
+    key = (
+        model_id,
+        tuple(sorted(merged_kwargs.items())),
+        tuple(sorted(client_settings.items()))
     )
+
+    llm = _llms.get(key)
+    if llm is None:
+        client = get_shared_client(**client_settings)
+        with _registry_lock:
+            llm = _llms.get(key)
+            if llm is None:
+                llm = create_llm(client, model_id, merged_kwargs,
+                                 cache=_cache_for(merged_kwargs))
+                _llms[key] = llm
+    return llm
+
+
+def set_response_cache(cache, bypass_when_sampling=False):
+    """
+    Attach an LLM response cache to every shared LLM.
+
+    Args:
+        cache: A LangChain BaseCache (e.g. src.cache.LLMResponseCache),
+               or None to turn caching off
+        bypass_when_sampling: Skip the cache for models with temperature > 0,
+                              whose outputs are meant to vary
+    """
+    global _response_cache, _bypass_cache_when_sampling
+    with _registry_lock:
+        _response_cache = cache
+        _bypass_cache_when_sampling = bypass_when_sampling
+        # Update existing instances in place so cached chains pick it up
+        for (_, kwargs, _), llm in _llms.items():
+            llm.cache = _cache_for(dict(kwargs))
+
+
+def clear_shared_clients():
+    """Drop all shared clients and LLMs (they are rebuilt on next use)"""
+    with _registry_lock:
+        _clients.clear()
+        _llms.clear()
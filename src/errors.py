@@ -1,9 +1,206 @@
+import json
+import os
+import re
+import sqlite3
+import threading
 import time
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+
+# Logged messages and context values are cut to these lengths
+MAX_MESSAGE_LENGTH = 500
+MAX_CONTEXT_VALUE_LENGTH = 200
+
+
+class ErrorRecord:
+    """Compact logged error (no per-instance __dict__)"""
+
+    __slots__ = ("timestamp", "type", "message", "context")
+
+    def __init__(self, timestamp: float, error_type: str, message: str, context: dict):
+        self.timestamp = timestamp
+        self.type = error_type
+        self.message = message[:MAX_MESSAGE_LENGTH]
+        # Context values become short strings so a big object is never retained
+        self.context = {
+            key: value if isinstance(value, (int, float, bool)) or value is None
+            else str(value)[:MAX_CONTEXT_VALUE_LENGTH]
+            for key, value in context.items()
+        } if context else None
+
+    def to_dict(self) -> dict:
+        return {
+            "timestamp": self.timestamp,
+            "type": self.type,
+            "message": self.message,
+            "context": dict(self.context) if self.context else {}
+        }
+
+
+class ErrorRing:
+    """Fixed-capacity ring buffer of ErrorRecords, oldest overwritten first"""
+
+    __slots__ = ("capacity", "_records", "_next", "_size")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._records = [None] * capacity
+        self._next = 0
+        self._size = 0
+
+    def append(self, record: ErrorRecord) -> Optional[ErrorRecord]:
+        """Store a record, returning the one it displaced (if the ring was full)"""
+        evicted = self._records[self._next]
+        self._records[self._next] = record
+        self._next = (self._next + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        return evicted
+
+    def records(self) -> List[ErrorRecord]:
+        """Stored records, oldest first"""
+        records = list(self._records)
+        start = self._next if self._size == self.capacity else 0
+        ordered = records[start:] + records[:start]
+        return [r for r in ordered if r is not None]
+
+    def __len__(self):
+        return self._size
+
+
+class JSONLErrorSpill:
+    """
+    Appends evicted errors to a JSONL file, rotating it at max_bytes.
+
+    Rotation keeps path.1 ... path.<backups>, like logging's RotatingFileHandler.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backups: int = 3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def write(self, record: ErrorRecord):
+        line = json.dumps(record.to_dict()) + "\n"
+        with self._lock:
+            if (os.path.exists(self.path)
+                    and os.path.getsize(self.path) + len(line) > self.max_bytes):
+                self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class SQLiteErrorSpill:
+    """Appends evicted errors to a SQLite table, keeping at most max_rows"""
+
+    def __init__(self, path: str, max_rows: int = 100000):
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS errors ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL NOT NULL, "
+            "type TEXT NOT NULL, message TEXT NOT NULL, context TEXT)"
+        )
+        self._conn.commit()
+
+    def write(self, record: ErrorRecord):
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO errors (timestamp, type, message, context) VALUES (?, ?, ?, ?)",
+                (record.timestamp, record.type, record.message,
+                 json.dumps(record.context) if record.context else None)
+            )
+            # Rotate: drop the oldest rows once past max_rows
+            self._conn.execute("DELETE FROM errors WHERE id <= ?",
+                               (cursor.lastrowid - self.max_rows,))
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM errors").fetchone()[0]
+
+
+# Recent messages remembered by each tracker's classifier
+CLASSIFY_CACHE_SIZE = 1024
+
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """Regex matching any keyword, factored by shared prefixes"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True  # End of a keyword
+
+    def emit(node) -> str:
+        branches = [re.escape(char) + emit(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A keyword can end here; the greedy ? still prefers the longer one
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+def compile_error_classifier(error_types: Dict[str, List[str]]):
+    """
+    Compile a keyword table into one regex that classifies in a single pass.
+
+    The keywords are merged into a prefix trie and emitted as one regex, so
+    the scan costs about the same however many categories are registered.
+    Every keyword found maps to its category's position, and the earliest
+    category in error_types wins, as with checking the lists in order.
+
+    The trie sits in a lookahead, so matches may overlap and every start
+    position is tried. At each position the regex reports only the longest
+    keyword, so each keyword is ranked as the best of every keyword it
+    contains ("throttle" also counts as "throttl").
+
+    Returns:
+        Function mapping a lowercased message to its category or "unknown"
+    """
+    ranks = {}
+    for rank, keywords in enumerate(error_types.values()):
+        for keyword in keywords:
+            ranks.setdefault(keyword.lower(), rank)
+    ranks.pop("", None)
+    if not ranks:
+        return lambda message: "unknown"
+
+    effective = {
+        keyword: min(rank for other, rank in ranks.items() if other in keyword)
+        for keyword in ranks
+    }
+    names = list(error_types)
+    findall = re.compile(f"(?=({_trie_pattern(list(ranks))}))").findall
+
+    def classify(message: str) -> str:
+        found = findall(message)
+        if not found:
+            return "unknown"
+        return names[min(effective[keyword] for keyword in found)]
+
+    return classify
 
 
 class ErrorTracker:
-    """Track and analyze errors in workflows"""
+    """Track and analyze errors in workflows (safe to share between threads)"""
     
     ERROR_TYPES = {
         "timeout": ["timeout", "timed out", "deadline"],
@@ -52,53 +249,100 @@ class ErrorTracker:
         ]
     }
     
-    def __init__(self):
-        self.errors = []
-        self.error_counts = {}
+    def __init__(self, max_errors: int = 10000, spill=None):
+        """
+        Args:
+            max_errors: Recent errors kept in memory; older ones
+                        are dropped (counts still include them)
+            spill: Optional JSONLErrorSpill/SQLiteErrorSpill receiving
+                   errors as they fall out of memory
+        """
+        self.max_errors = max_errors
+        self.spill = spill
+        # One bounded ring and running counts, shared by every thread
+        self._ring = ErrorRing(max_errors)
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.error_types = {name: list(k) for name, k in self.ERROR_TYPES.items()}
+        self.solutions = dict(self.SOLUTIONS)
+        self._compile()
+
+    def _compile(self):
+        classify = compile_error_classifier(self.error_types)
+        self._classify = lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(
+            lambda message: classify(message.lower())
+        )
+
+    def register_error_type(self, error_type: str, keywords: List[str],
+                            solutions: List[str] = None, first: bool = False):
+        """
+        Add (or replace) an error category for this tracker.
+
+        Args:
+            error_type: Category name reported by classify_error()
+            keywords: Case-insensitive substrings that identify it
+            solutions: Optional suggestions shown by get_solutions()
+            first: Check this category before the existing ones
+        """
+        error_types = {k: v for k, v in self.error_types.items() if k != error_type}
+        if first:
+            error_types = {error_type: list(keywords), **error_types}
+        else:
+            error_types[error_type] = list(keywords)
+        self.error_types = error_types
+        if solutions is not None:
+            self.solutions[error_type] = list(solutions)
+        self._compile()
+
+    @property
+    def errors(self) -> List[dict]:
+        """Recently logged errors, oldest first"""
+        with self._lock:
+            records = self._ring.records()
+        return [record.to_dict() for record in records]
+
+    @property
+    def error_counts(self) -> dict:
+        """Error count per type (a copy)"""
+        with self._lock:
+            return dict(self._counts)
     
     def classify_error(self, error_message: str) -> str:
-        """Classify error type based on message"""
-        error_lower = error_message.lower()
-        
-        for error_type, keywords in self.ERROR_TYPES.items():
-            if any(keyword in error_lower for keyword in keywords):
-                return error_type
-        
-        return "unknown"
+        """Classify error type based on message (one regex pass, memoized)"""
+        return self._classify(error_message)
     
     def log_error(self, error_message: str, context: dict = None):
         """Log an error with context"""
         error_type = self.classify_error(error_message)
         
-        error_entry = {
-            "timestamp": time.time(),
-            "type": error_type,
-            "message": error_message,
-            "context": context or {}
-        }
+        record = ErrorRecord(time.time(), error_type, error_message, context)
         
-        self.errors.append(error_entry)
-        self.error_counts[error_type] = self.error_counts.get(error_type, 0) + 1
+        with self._lock:
+            evicted = self._ring.append(record)
+            self._counts[error_type] = self._counts.get(error_type, 0) + 1
+        if evicted is not None and self.spill is not None:
+            self.spill.write(evicted)
         
-        return error_entry
+        return record.to_dict()
     
     def get_summary(self) -> dict:
-        """Get error summary"""
-        if not self.errors:
+        """Get error summary (from running counters, not the stored errors)"""
+        error_counts = self.error_counts
+        if not error_counts:
             return {"total_errors": 0}
         
         return {
-            "total_errors": len(self.errors),
-            "by_type": dict(self.error_counts),
-            "most_common": max(self.error_counts.items(), key=lambda x: x[1]) if self.error_counts else None
+            "total_errors": sum(error_counts.values()),
+            "by_type": error_counts,
+            "most_common": max(error_counts.items(), key=lambda x: x[1])
         }
     
     def get_solutions(self) -> dict:
         """Get solutions for logged error types"""
         relevant_solutions = {}
         for error_type in self.error_counts.keys():
-            if error_type in self.SOLUTIONS:
-                relevant_solutions[error_type] = self.SOLUTIONS[error_type]
+            if error_type in self.solutions:
+                relevant_solutions[error_type] = self.solutions[error_type]
         
         return relevant_solutions
     
@@ -0,0 +1,200 @@
+"""OpenMetrics export of monitoring data over HTTP."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from src.performance import WINDOWS
+
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _number(value) -> str:
+    if value is None:
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Family:
+    """One metric family: TYPE/HELP header plus its samples"""
+
+    def __init__(self, name: str, metric_type: str, help_text: str):
+        self.name = name
+        self.lines = [f"# TYPE {name} {metric_type}", f"# HELP {name} {help_text}"]
+
+    def sample(self, suffix: str, value, **labels):
+        self.lines.append(f"{self.name}{suffix}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, stats, **labels):
+        """Bucket/count/sum samples from a StreamingStats created with bounds"""
+        for bound, count in zip(stats.bounds, stats.cumulative_counts()):
+            self.sample("_bucket", count, **labels, le=_number(float(bound)))
+        self.sample("_bucket", stats.count, **labels, le="+Inf")
+        self.sample("_count", stats.count, **labels)
+        self.sample("_sum", stats.total, **labels)
+
+
+def _monitor_families(monitor) -> List[_Family]:
+    # Merged copies: a scrape reads a snapshot, never the live aggregates
+    run_stats = monitor.run_stats
+    step_metrics = list(monitor.step_metrics.items())
+
+    runs = _Family("assistant_runs", "counter", "Workflow runs recorded")
+    runs.sample("_total", run_stats["execution_time"].count)
+    run_errors = _Family("assistant_run_errors", "counter",
+                         "Workflow runs that ended with an error")
+    run_errors.sample("_total", monitor.error_count)
+    tokens = _Family("assistant_tokens", "counter", "Estimated tokens used by workflow runs")
+    tokens.sample("_total", run_stats["tokens"].total)
+    cost = _Family("assistant_cost_dollars", "counter", "Estimated cost of workflow runs")
+    cost.sample("_total", run_stats["cost"].total)
+    run_duration = _Family("assistant_run_duration_seconds", "histogram", "Workflow run duration")
+    run_duration.histogram(run_stats["execution_time"])
+
+    step_duration = _Family("assistant_step_duration_seconds", "histogram",
+                            "Workflow step duration")
+    step_runs = _Family("assistant_step_runs", "counter", "Workflow step executions by status")
+    step_tokens = _Family("assistant_step_tokens", "counter",
+                          "Estimated tokens used by workflow steps")
+    for step_name, metrics in step_metrics:
+        step_duration.histogram(metrics["duration"], step=step_name)
+        step_runs.sample("_total", metrics["success_count"], step=step_name, status="success")
+        step_runs.sample("_total", metrics["failure_count"], step=step_name, status="failure")
+        step_tokens.sample("_total", metrics["tokens"].total, step=step_name)
+
+    throughput = _Family("assistant_window_throughput", "gauge",
+                         "Runs per second over a recent window")
+    error_rate = _Family("assistant_window_error_rate", "gauge",
+                         "Run error rate over a recent window")
+    latency = _Family("assistant_window_latency_seconds", "gauge",
+                      "Run latency quantiles over a recent window")
+    for window in WINDOWS:
+        stats = monitor.get_window_stats(window)["runs"]
+        throughput.sample("", stats["throughput"], window=window)
+        error_rate.sample("", stats["error_rate"], window=window)
+        for quantile in ("p50", "p95", "p99"):
+            latency.sample("", stats[f"{quantile}_latency"], window=window, quantile=quantile)
+
+    cache_hits = _Family("assistant_cache_hits", "counter", "Cache lookups served from cache")
+    cache_misses = _Family("assistant_cache_misses", "counter", "Cache lookups that missed")
+    cache_bytes = _Family("assistant_cache_bytes", "gauge", "Bytes held by a cache")
+    for name, stats in monitor.get_cache_stats().items():
+        cache_hits.sample("_total", stats.get("hits", 0), cache=name)
+        cache_misses.sample("_total", stats.get("misses", 0), cache=name)
+        cache_bytes.sample("", stats.get("bytes_stored", 0), cache=name)
+
+    return [runs, run_errors, tokens, cost, run_duration, step_duration, step_runs,
+            step_tokens, throughput, error_rate, latency, cache_hits, cache_misses, cache_bytes]
+
+
+def _error_families(error_tracker) -> List[_Family]:
+    errors = _Family("assistant_errors", "counter", "Errors logged by type")
+    for error_type, count in list(error_tracker.error_counts.items()):
+        errors.sample("_total", count, type=error_type)
+    return [errors]
+
+
+def _feedback_families(feedback) -> List[_Family]:
+    summary = feedback.get_summary()
+    entries = _Family("assistant_feedback", "counter", "Feedback entries by score")
+    for score, count in summary.get("score_distribution", {}).items():
+        entries.sample("_total", count, score=score)
+    average = _Family("assistant_feedback_score", "gauge", "Average feedback score (1-5)")
+    average.sample("", summary.get("avg_score"))
+    return [entries, average]
+
+
+def render_metrics(monitor=None, error_tracker=None, feedback=None) -> str:
+    """
+    Render monitoring data in OpenMetrics text format.
+
+    Args:
+        monitor: Optional PerformanceMonitor
+        error_tracker: Optional ErrorTracker
+        feedback: Optional FeedbackCollector
+
+    Returns:
+        Exposition text ending with "# EOF"
+    """
+    families = []
+    if monitor is not None:
+        families += _monitor_families(monitor)
+    if error_tracker is not None:
+        families += _error_families(error_tracker)
+    if feedback is not None:
+        families += _feedback_families(feedback)
+
+    lines = [line for family in families for line in family.lines]
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Background HTTP server answering GET /metrics with render_metrics().
+
+    Each scrape runs on its own daemon thread, so the request path of the
+    application never waits for an exporter.
+    """
+
+    def __init__(self, port: int = 9100, host: str = "127.0.0.1", monitor=None,
+                 error_tracker=None, feedback=None):
+        self.monitor = monitor
+        self.error_tracker = error_tracker
+        self.feedback = feedback
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_metrics(exporter.monitor, exporter.error_tracker,
+                                      exporter.feedback).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes every few seconds would flood the console
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """Bound port (useful when created with port=0)"""
+        return self._server.server_address[1]
+
+    def start(self) -> "MetricsServer":
+        """Start serving on a daemon thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"📈 Metrics available at http://{self._server.server_address[0]}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def start_metrics_server(port: int = 9100, host: str = "127.0.0.1", monitor=None,
+                         error_tracker=None, feedback=None) -> MetricsServer:
+    """Create and start a MetricsServer"""
+    return MetricsServer(port, host, monitor, error_tracker, feedback).start()
@@ -1,17 +1,155 @@
+import json
+import threading
 import time
 from typing import List
 
+import numpy as np
+
+from src.metrics import StripedShards
+
+
+class _FeedbackColumns:
+    """One stripe of feedback as NumPy columns plus a running histogram"""
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.trace_codes = np.empty(capacity, dtype=np.int64)
+        self.scores = np.empty(capacity, dtype=np.uint8)
+        self.timestamps = np.empty(capacity, dtype=np.float64)
+        self.notes = {}  # row -> (comment, tags), only for rows that have them
+        self.histogram = [0] * 6  # Index = score
+        self.comment_count = 0
+
+    def _reserve(self, extra: int):
+        needed = self.size + extra
+        capacity = len(self.scores)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        # Copy before swapping in, so readers never see a half-filled array
+        for name in ("trace_codes", "scores", "timestamps"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def append(self, code: int, score: int, timestamp: float, comment: str, tags):
+        self._reserve(1)
+        row = self.size
+        self.trace_codes[row] = code
+        self.scores[row] = score
+        self.timestamps[row] = timestamp
+        if comment or tags:
+            self.notes[row] = (comment, list(tags or []))
+            if comment:
+                self.comment_count += 1
+        self.histogram[score] += 1
+        self.size = row + 1  # Publish the row last
+
+    def extend(self, codes, scores, timestamps):
+        count = len(scores)
+        self._reserve(count)
+        rows = slice(self.size, self.size + count)
+        self.trace_codes[rows] = codes
+        self.scores[rows] = scores
+        self.timestamps[rows] = timestamps
+        for score, n in enumerate(np.bincount(scores, minlength=6)):
+            self.histogram[score] += int(n)
+        self.size += count
+
+    def columns(self):
+        size = self.size
+        return (self.trace_codes[:size], self.scores[:size],
+                self.timestamps[:size], dict(self.notes))
+
 
 class FeedbackCollector:
-    """Collect and analyze user feedback"""
+    """
+    Collect and analyze user feedback (safe to share between threads).
+
+    Feedback lives in striped NumPy columns (trace id code as int64,
+    score as uint8, timestamp as float64) with running score histograms,
+    so summaries cost O(1) however many ratings were collected.
+    """
     
     def __init__(self):
-        self.feedback_entries = []
+        # Each thread appends to its stripe's columns; readers merge them
+        self._shards = StripedShards(_FeedbackColumns)
+        self._trace_codes = {}   # trace_id -> code
+        self._trace_ids = []     # code -> trace_id
+        self._codes_lock = threading.Lock()
+
+    def _code(self, trace_id: str) -> int:
+        code = self._trace_codes.get(trace_id)
+        if code is None:
+            with self._codes_lock:
+                code = self._trace_codes.get(trace_id)
+                if code is None:
+                    code = len(self._trace_ids)
+                    self._trace_ids.append(trace_id)
+                    self._trace_codes[trace_id] = code
+        return code
+
+    def get_columns(self) -> dict:
+        """
+        All feedback as columns, oldest first.
+
+        Returns:
+            Dict of NumPy arrays: trace_id, score (uint8), timestamp (float64),
+            comment and tags (JSON strings)
+        """
+        # Start from empty chunks so a collector with no feedback still concatenates
+        codes, scores = [np.empty(0, np.int64)], [np.empty(0, np.uint8)]
+        timestamps = [np.empty(0, np.float64)]
+        comments, tags = [np.empty(0, dtype=object)], [np.empty(0, dtype=object)]
+        for shard in self._shards.all():
+            shard_codes, shard_scores, shard_times, notes = shard.columns()
+            codes.append(shard_codes)
+            scores.append(shard_scores)
+            timestamps.append(shard_times)
+            shard_comments = np.full(len(shard_scores), "", dtype=object)
+            shard_tags = np.full(len(shard_scores), "[]", dtype=object)
+            for row, (comment, row_tags) in notes.items():
+                if row < len(shard_scores):
+                    shard_comments[row] = comment
+                    shard_tags[row] = json.dumps(row_tags)
+            comments.append(shard_comments)
+            tags.append(shard_tags)
+
+        timestamps = np.concatenate(timestamps)
+        order = np.argsort(timestamps, kind="stable")
+        trace_ids = np.array(self._trace_ids, dtype=object)
+        return {
+            "trace_id": trace_ids[np.concatenate(codes)][order],
+            "score": np.concatenate(scores)[order],
+            "timestamp": timestamps[order],
+            "comment": np.concatenate(comments)[order],
+            "tags": np.concatenate(tags)[order]
+        }
+
+    @property
+    def feedback_entries(self) -> List[dict]:
+        """Every feedback entry as a dict, oldest first"""
+        columns = self.get_columns()
+        return [
+            {
+                "trace_id": trace_id,
+                "timestamp": float(timestamp),
+                "score": int(score),
+                "comment": comment,
+                "tags": json.loads(tags)
+            }
+            for trace_id, score, timestamp, comment, tags in zip(
+                columns["trace_id"], columns["score"], columns["timestamp"],
+                columns["comment"], columns["tags"])
+        ]
     
     def submit_feedback(self, trace_id: str, score: int, comment: str = "", tags: List[str] = None):
-        """Submit feedback for a trace"""
-        if not 1 <= score <= 5:
-            raise ValueError("Score must be between 1 and 5")
+        """Submit feedback for a trace (score is a whole number of stars)"""
+        if not 1 <= score <= 5 or score != int(score):
+            raise ValueError("Score must be a whole number between 1 and 5")
+        score = int(score)  # Stored as uint8, so 4.0 becomes 4
         
         entry = {
             "trace_id": trace_id,
@@ -21,24 +159,75 @@ class FeedbackCollector:
             "tags": tags or []
         }
         
-        self.feedback_entries.append(entry)
+        code = self._code(trace_id)
+        with self._shards.local() as shard:
+            shard.append(code, score, entry["timestamp"], comment, tags)
         return entry
+
+    def export_npz(self, path: str):
+        """Write all feedback columns to a compressed NumPy .npz file"""
+        columns = self.get_columns()
+        np.savez_compressed(
+            path,
+            trace_id=columns["trace_id"].astype(str),
+            score=columns["score"],
+            timestamp=columns["timestamp"],
+            comment=columns["comment"].astype(str),
+            tags=columns["tags"].astype(str)
+        )
+
+    def import_npz(self, path: str) -> int:
+        """
+        Bulk-load feedback written by export_npz().
+
+        Rows without comments or tags are appended as whole arrays.
+
+        Returns:
+            Number of entries imported
+        """
+        with np.load(path) as data:
+            trace_ids = data["trace_id"]
+            raw_scores = data["score"]
+            timestamps = data["timestamp"].astype(np.float64)
+            comments = data["comment"]
+            tags = data["tags"]
+
+        # Validate before casting: uint8 would wrap 261 to 5 and cut 3.7 to 3
+        if len(raw_scores) and (
+                raw_scores.min() < 1 or raw_scores.max() > 5
+                or not np.array_equal(raw_scores, np.floor(raw_scores))):
+            raise ValueError("Score must be a whole number between 1 and 5")
+        scores = raw_scores.astype(np.uint8)
+
+        unique_ids, inverse = np.unique(trace_ids, return_inverse=True)
+        codes = np.array([self._code(str(t)) for t in unique_ids], dtype=np.int64)[inverse]
+
+        plain = (comments == "") & (tags == "[]")
+        with self._shards.local() as shard:
+            shard.extend(codes[plain], scores[plain], timestamps[plain])
+            for row in np.flatnonzero(~plain):
+                shard.append(int(codes[row]), int(scores[row]), float(timestamps[row]),
+                             str(comments[row]), json.loads(str(tags[row])))
+        return len(scores)
     
     def get_summary(self) -> dict:
-        """Get feedback summary"""
-        if not self.feedback_entries:
+        """Get feedback summary (from running histograms)"""
+        histogram = [0] * 6
+        for shard in self._shards.all():
+            for score, count in enumerate(list(shard.histogram)):
+                histogram[score] += count
+        total = sum(histogram)
+        if not total:
             return {"total_feedback": 0, "message": "No feedback recorded"}
         
-        scores = [f["score"] for f in self.feedback_entries]
-        
         return {
-            "total_feedback": len(self.feedback_entries),
-            "avg_score": sum(scores) / len(scores),
+            "total_feedback": total,
+            "avg_score": sum(score * count for score, count in enumerate(histogram)) / total,
             "score_distribution": {
-                i: scores.count(i) for i in range(1, 6)
+                i: histogram[i] for i in range(1, 6)
             },
-            "positive_rate": sum(1 for s in scores if s >= 4) / len(scores),
-            "negative_rate": sum(1 for s in scores if s <= 2) / len(scores)
+            "positive_rate": (histogram[4] + histogram[5]) / total,
+            "negative_rate": (histogram[1] + histogram[2]) / total
         }
     
     def get_insights(self) -> List[str]:
@@ -66,9 +255,9 @@ class FeedbackCollector:
         if neg_rate >= 0.2:
             insights.append(f"{neg_rate:.0%} of responses rated negatively (1-2 stars)")
         
-        comments = [f["comment"] for f in self.feedback_entries if f["comment"]]
-        if comments:
-            insights.append(f"{len(comments)} feedback entries include comments")
+        comment_count = sum(shard.comment_count for shard in self._shards.all())
+        if comment_count:
+            insights.append(f"{comment_count} feedback entries include comments")
         
         return insights
     
@@ -0,0 +1,162 @@
+"""Disk-backed chat message histories for conversation memory."""
+
+import json
+import os
+import sqlite3
+import threading
+from collections import deque
+from typing import List
+from urllib.parse import quote
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+
+def _dump_message(message: BaseMessage) -> str:
+    return json.dumps(message_to_dict(message))
+
+
+def _load_messages(rows: List[str]) -> List[BaseMessage]:
+    return messages_from_dict([json.loads(row) for row in rows])
+
+
+class SQLiteMessageStore:
+    """
+    SQLite database (WAL mode) holding the messages of every session.
+
+    Each append (one add_messages call, i.e. one turn) is written in a
+    single transaction, so a turn costs one commit however many messages
+    it has, and it is on disk before append returns.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "session_id TEXT NOT NULL, "
+            "message TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_messages_session "
+            "ON messages (session_id, id)"
+        )
+        self._conn.commit()
+
+    def append(self, session_id: str, rows: List[str]):
+        """Write serialized messages in one transaction"""
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO messages (session_id, message) VALUES (?, ?)",
+                [(session_id, row) for row in rows]
+            )
+            self._conn.commit()
+
+    def tail(self, session_id: str, limit: int) -> List[str]:
+        """Get the last limit serialized messages of a session, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT message FROM messages WHERE session_id = ? "
+                "ORDER BY id DESC LIMIT ?",
+                (session_id, limit)
+            ).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def count(self, session_id: str) -> int:
+        """Total messages stored for a session"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0]
+
+    def delete(self, session_id: str):
+        """Remove every message of a session"""
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+
+class SQLiteChatMessageHistory(BaseChatMessageHistory):
+    """
+    Chat history for one session stored in a SQLiteMessageStore.
+
+    Nothing is kept in RAM: reading .messages loads only the last
+    window messages, however long the conversation is.
+    """
+
+    def __init__(self, session_id: str, store: SQLiteMessageStore, window: int = 50):
+        self.session_id = session_id
+        self.store = store
+        self.window = window
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        return _load_messages(self.store.tail(self.session_id, self.window))
+
+    def add_messages(self, messages) -> None:
+        self.store.append(self.session_id, [_dump_message(m) for m in messages])
+
+    def add_message(self, message: BaseMessage) -> None:
+        self.add_messages([message])
+
+    def clear(self) -> None:
+        self.store.delete(self.session_id)
+
+
+def _tail_lines(path: str, limit: int, block_size: int = 8192) -> List[str]:
+    """Read the last limit lines of a file without reading all of it"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= limit:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+
+    lines = deque(
+        (line.decode("utf-8") for line in data.splitlines() if line.strip()),
+        maxlen=limit
+    )
+    return list(lines)
+
+
+class JSONLChatMessageHistory(BaseChatMessageHistory):
+    """
+    Chat history for one session in an append-only JSONL file.
+
+    Each turn is appended with one write. Reading .messages scans backwards
+    from the end of the file for the last window messages.
+    """
+
+    def __init__(self, session_id: str, directory: str, window: int = 50):
+        self.session_id = session_id
+        self.window = window
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, quote(session_id, safe="") + ".jsonl")
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        if not os.path.exists(self.path):
+            return []
+        return _load_messages(_tail_lines(self.path, self.window))
+
+    def add_messages(self, messages) -> None:
+        lines = "".join(_dump_message(m) + "\n" for m in messages)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def add_message(self, message: BaseMessage) -> None:
+        self.add_messages([message])
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,18 +1,144 @@
 """Conversation memory implementation for maintaining chat context."""
 
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
 from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_core.prompts import (
     ChatPromptTemplate,
     MessagesPlaceholder
 )
-from src.client import create_client, create_llm
+from src.client import get_shared_llm
+from src.history import (
+    SQLiteMessageStore, SQLiteChatMessageHistory, JSONLChatMessageHistory
+)
+from src.tracing import time_stream, atime_stream, estimate_tokens
+
+
+class BoundedChatMessageHistory(InMemoryChatMessageHistory):
+    """In-memory history that keeps only the most recent messages"""
+
+    max_messages: Optional[int] = None
+
+    def add_message(self, message):
+        """Add a message, dropping the oldest ones past max_messages"""
+        self.messages.append(message)
+        if self.max_messages and len(self.messages) > self.max_messages:
+            del self.messages[:len(self.messages) - self.max_messages]
+
+
+class SessionStore:
+    """
+    Thread-safe map of session_id -> chat history with bounded size.
+
+    Sessions are kept in least-recently-used order. Past max_sessions the
+    oldest is evicted, and sessions idle longer than idle_ttl seconds expire.
+    Each history keeps at most max_messages messages. on_drop, if set, is
+    called with the id of every evicted or expired session.
+    """
+
+    def __init__(self, max_sessions: int = 10000,
+                 idle_ttl: Optional[float] = 24 * 3600,
+                 max_messages: Optional[int] = 200,
+                 history_factory=None, clock=time.monotonic, on_drop=None):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_messages = max_messages
+        self.history_factory = history_factory or self._new_history
+        self.clock = clock
+        self.on_drop = on_drop
+        self.evictions = 0
+        self.expirations = 0
+        # Key = session_id, Value = (history, last access time)
+        self._sessions = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _new_history(self, session_id):
+        return BoundedChatMessageHistory(max_messages=self.max_messages)
+
+    def _expire_idle(self, now, dropped):
+        """Drop idle sessions (they sit at the front of the LRU order)"""
+        if self.idle_ttl is None:
+            return
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if now - last_access < self.idle_ttl:
+                break
+            del self._sessions[session_id]
+            dropped.append(session_id)
+            self.expirations += 1
 
+    def get(self, session_id):
+        """Get or create the history for a session"""
+        now = self.clock()
+        dropped = []
+        with self._lock:
+            self._expire_idle(now, dropped)
 
-# Global dictionary to store all user conversations
+            entry = self._sessions.pop(session_id, None)
+            history = entry[0] if entry else self.history_factory(session_id)
+            self._sessions[session_id] = (history, now)
+
+            while len(self._sessions) > self.max_sessions:
+                dropped.append(self._sessions.popitem(last=False)[0])
+                self.evictions += 1
+
+        if self.on_drop is not None:
+            for dropped_id in dropped:
+                self.on_drop(dropped_id)
+        return history
+
+    def remove(self, session_id):
+        """Forget a session"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def clear(self):
+        """Forget every session"""
+        with self._lock:
+            self._sessions.clear()
+
+    def __contains__(self, session_id):
+        with self._lock:
+            return session_id in self._sessions
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def approx_bytes(self) -> int:
+        """Approximate bytes held by message contents"""
+        with self._lock:
+            histories = [history for history, _ in self._sessions.values()]
+        return sum(
+            sys.getsizeof(message.content)
+            for history in histories
+            for message in history.messages
+        )
+
+    def get_gauges(self) -> dict:
+        """Get resident session count and approximate bytes held"""
+        return {
+            "resident_sessions": len(self),
+            "approx_bytes": self.approx_bytes(),
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+# Global store for all user conversations
 # Key = session_id (like "alice" or "bob")
-# Value = InMemoryChatMessageHistory object (list of messages)
-memory_store = {}
+# Value = BoundedChatMessageHistory object (recent messages)
+memory_store = SessionStore()
+
+# Disk-backed history factory, if enabled (see use_persistent_history)
+persistent_history = None
 
 
 def get_session_history(session_id):
@@ -23,11 +149,9 @@ def get_session_history(session_id):
         session_id: Unique identifier for conversation (e.g., "alice")
 
     Returns:
-        InMemoryChatMessageHistory object containing user's messages
+        Chat history object containing user's messages
     """
-    if session_id not in memory_store:
-        memory_store[session_id] = InMemoryChatMessageHistory()
-    return memory_store[session_id]
+    return memory_store.get(session_id)
 
 
 def clear_session(session_id):
@@ -37,8 +161,246 @@ def clear_session(session_id):
     Args:
         session_id: The session to clear
     """
-    if session_id in memory_store:
-        del memory_store[session_id]
+    memory_store.remove(session_id)
+    history_window.forget(session_id)
+    if persistent_history is not None:
+        persistent_history(session_id).clear()
+
+
+def use_persistent_history(path, backend="sqlite", window=50):
+    """
+    Keep conversations on disk so they survive restarts.
+
+    Only the last window messages of a session are loaded into the prompt,
+    so RAM per session stays constant however long the conversation gets.
+
+    Args:
+        path: SQLite file (backend="sqlite") or directory (backend="jsonl")
+        backend: "sqlite" (WAL mode, one transaction per turn) or "jsonl" (append-only)
+        window: Messages loaded per turn
+    """
+    global persistent_history
+
+    if backend == "sqlite":
+        store = SQLiteMessageStore(path)
+
+        def factory(session_id):
+            return SQLiteChatMessageHistory(session_id, store, window)
+    elif backend == "jsonl":
+        def factory(session_id):
+            return JSONLChatMessageHistory(session_id, path, window)
+    else:
+        raise ValueError(f"Unknown history backend: {backend}")
+
+    persistent_history = factory
+    memory_store.history_factory = factory
+    memory_store.clear()
+
+
+def _fingerprint(message) -> str:
+    """Identify a message by type and content (ids are not always set)"""
+    raw = f"{message.type}\x00{message.content}".encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()
+
+
+# Summarized messages remembered to locate the summary boundary again
+BOUNDARY_MESSAGES = 4
+
+
+def _find_boundary(fingerprints, anchor, offset) -> int:
+    """
+    Locate the summary boundary in a (possibly front-trimmed) history.
+
+    anchor holds the fingerprints of the last summarized messages followed
+    by every message after them, with the boundary at anchor[offset]. The
+    history only grows at the end, so the latest alignment where the whole
+    anchor (or its surviving suffix) matches is the real one; repeated
+    messages elsewhere cannot match the full sequence.
+
+    Returns:
+        Index of the first unsummarized message, or None when no message of
+        the anchor is left (e.g. a new conversation reusing the session id)
+    """
+    n = len(fingerprints)
+    for p in range(n - len(anchor), -len(anchor), -1):
+        skip = max(0, -p)
+        if fingerprints[p + skip:p + len(anchor)] == anchor[skip:]:
+            return max(p + offset, 0)
+    return None
+
+
+class HistoryWindow:
+    """
+    Fit chat history into a token budget with a rolling summary.
+
+    Recent messages are sent verbatim. Once they exceed the budget, older
+    messages are folded into a per-session summary. The summary is cached
+    and only recomputed when the window slides. Each slide trims the
+    verbatim part to slide_fraction of its budget, so that happens every
+    few turns rather than on every turn.
+
+    Summaries are kept for at most max_sessions sessions (least recently
+    used first out) and dropped after idle_ttl seconds, like SessionStore.
+    """
+
+    def __init__(self, max_tokens: int = 2000, summary_tokens: int = 300,
+                 slide_fraction: float = 0.5, llm=None, max_sessions: int = 10000,
+                 idle_ttl: Optional[float] = 24 * 3600, clock=time.monotonic):
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.slide_fraction = slide_fraction
+        self.llm = llm
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        # Key = session_id, Value = (anchor, boundary offset in anchor, summary,
+        # last access time), least recently used first (see _find_boundary)
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+        # Per-turn token savings, newest last
+        self.stats = deque(maxlen=1000)
+
+    def _plan(self, messages, session_id):
+        """
+        Decide what to send.
+
+        Returns:
+            (summary, start, fold_start, fold_end): send the summary plus
+            messages[start:], after folding messages[fold_start:fold_end]
+            into the summary (nothing to fold when fold_start == fold_end)
+        """
+        with self._lock:
+            entry = self._summaries.get(session_id)
+        if entry is not None and self.idle_ttl is not None \
+                and self.clock() - entry[3] >= self.idle_ttl:
+            entry = None
+
+        start = 0
+        summary = ""
+        if entry is not None:
+            anchor, offset, summary, _ = entry
+            start = _find_boundary([_fingerprint(m) for m in messages], anchor, offset)
+            if start is None:
+                # None of the summarized conversation is left: it is not this one
+                self.forget(session_id)
+                start, summary = 0, ""
+
+        tokens = [estimate_tokens(m.content) for m in messages]
+        recent_budget = self.max_tokens - self.summary_tokens
+
+        if not summary and sum(tokens) <= self.max_tokens:
+            return "", 0, 0, 0
+        if summary and sum(tokens[start:]) <= recent_budget:
+            return summary, start, start, start
+
+        # Slide: keep only the newest messages that fit a fraction of the budget
+        keep_budget = recent_budget * self.slide_fraction
+        kept = 0
+        cut = len(messages)
+        for i in range(len(messages) - 1, start - 1, -1):
+            if kept + tokens[i] > keep_budget:
+                break
+            kept += tokens[i]
+            cut = i
+        return summary, cut, start, cut
+
+    def _summary_prompt(self, summary, messages) -> str:
+        transcript = "\n".join(f"{m.type}: {m.content}" for m in messages)
+        return (
+            "Update this summary of a conversation with the new messages. "
+            "Keep every fact the user shared, in a few sentences.\n\n"
+            f"Current summary: {summary or '(none)'}\n\n"
+            f"New messages:\n{transcript}"
+        )
+
+    def _finish(self, messages, session_id, summary, start, fold_end):
+        """Cache the summary and build the windowed history"""
+        if fold_end > 0 and summary:
+            first = max(0, fold_end - BOUNDARY_MESSAGES)
+            anchor = [_fingerprint(m) for m in messages[first:]]
+            now = self.clock()
+            with self._lock:
+                self._summaries.pop(session_id, None)
+                self._summaries[session_id] = (anchor, fold_end - first, summary, now)
+                self._trim(now)
+
+        windowed = list(messages[start:])
+        if summary:
+            windowed.insert(0, SystemMessage(
+                content=f"Summary of the earlier conversation: {summary}"))
+
+        original = sum(estimate_tokens(m.content) for m in messages)
+        sent = sum(estimate_tokens(m.content) for m in windowed)
+        self.stats.append({
+            "session_id": session_id,
+            "original_tokens": original,
+            "windowed_tokens": sent,
+            "saved_tokens": original - sent
+        })
+        return windowed
+
+    def apply(self, messages, session_id="default"):
+        """Return the history to send for a session"""
+        summary, start, fold_start, fold_end = self._plan(messages, session_id)
+        if fold_end > fold_start:
+            llm = self.llm or get_shared_llm()
+            prompt = self._summary_prompt(summary, messages[fold_start:fold_end])
+            summary = llm.invoke(prompt).content
+        return self._finish(messages, session_id, summary, start, fold_end)
+
+    async def aapply(self, messages, session_id="default"):
+        """Async version of apply()"""
+        summary, start, fold_start, fold_end = self._plan(messages, session_id)
+        if fold_end > fold_start:
+            llm = self.llm or get_shared_llm()
+            prompt = self._summary_prompt(summary, messages[fold_start:fold_end])
+            summary = (await llm.ainvoke(prompt)).content
+        return self._finish(messages, session_id, summary, start, fold_end)
+
+    def _trim(self, now):
+        """Drop idle and least recently used summaries (call with _lock held)"""
+        while self._summaries:
+            session_id, entry = next(iter(self._summaries.items()))
+            idle = self.idle_ttl is not None and now - entry[3] >= self.idle_ttl
+            if not idle and len(self._summaries) <= self.max_sessions:
+                break
+            del self._summaries[session_id]
+
+    def forget(self, session_id):
+        """Drop the cached summary for a session"""
+        with self._lock:
+            self._summaries.pop(session_id, None)
+
+    def get_stats(self) -> dict:
+        """Get input-token savings across recorded turns"""
+        turns = list(self.stats)
+        original = sum(t["original_tokens"] for t in turns)
+        saved = sum(t["saved_tokens"] for t in turns)
+        return {
+            "turns": len(turns),
+            "original_tokens": original,
+            "saved_tokens": saved,
+            "savings_rate": saved / original if original else 0.0
+        }
+
+
+# Token budget applied to history by the memory chatbot
+history_window = HistoryWindow()
+
+# A session dropped from the store starts over, so its summary goes too
+memory_store.on_drop = history_window.forget
+
+
+def _session_id(config):
+    return config.get("configurable", {}).get("session_id", "default")
+
+
+def _window_history(inputs, config):
+    return history_window.apply(inputs["history"], _session_id(config))
+
+
+async def _awindow_history(inputs, config):
+    return await history_window.aapply(inputs["history"], _session_id(config))
 
 
 def build_memory_chatbot():
@@ -48,8 +410,7 @@ def build_memory_chatbot():
     Returns:
         RunnableWithMessageHistory object (chatbot with memory)
     """
-    client = create_client()
-    llm = create_llm(client)
+    llm = get_shared_llm()
 
     prompt = ChatPromptTemplate.from_messages([
         ("system", "You are a helpful assistant. "
@@ -58,7 +419,9 @@ def build_memory_chatbot():
         ("human", "{input}")
     ])
 
-    chain = prompt | llm
+    # Trim history to the token budget before it reaches the prompt
+    window = RunnableLambda(_window_history, afunc=_awindow_history)
+    chain = RunnablePassthrough.assign(history=window) | prompt | llm
 
     return RunnableWithMessageHistory(
         chain,
@@ -83,3 +446,50 @@ def chat_with_memory(message, session_id="default"):
     config = {"configurable": {"session_id": session_id}}
     response = chatbot.invoke({"input": message}, config=config)
     return response.content
+
+
+async def achat_with_memory(message, session_id="default"):
+    """
+    Chat with the memory-enabled bot without blocking the event loop.
+
+    Args:
+        message: What the user is saying
+        session_id: Which user this is (default: "default")
+
+    Returns:
+        The bot's response as a string
+    """
+    chatbot = build_memory_chatbot()
+    config = {"configurable": {"session_id": session_id}}
+    response = await chatbot.ainvoke({"input": message}, config=config)
+    return response.content
+
+
+def stream_chat_with_memory(message, session_id="default"):
+    """
+    Stream a reply from the memory-enabled bot.
+
+    The assembled reply is added to the session history once the stream
+    finishes.
+
+    Args:
+        message: What the user is saying
+        session_id: Which user this is (default: "default")
+
+    Yields:
+        Text deltas as the model produces them
+    """
+    chatbot = build_memory_chatbot()
+    config = {"configurable": {"session_id": session_id}}
+    chunks = chatbot.stream({"input": message}, config=config)
+    for chunk in time_stream(chunks, "chat_with_memory"):
+        yield chunk.content
+
+
+async def astream_chat_with_memory(message, session_id="default"):
+    """Async version of stream_chat_with_memory()"""
+    chatbot = build_memory_chatbot()
+    config = {"configurable": {"session_id": session_id}}
+    chunks = chatbot.astream({"input": message}, config=config)
+    async for chunk in atime_stream(chunks, "chat_with_memory"):
+        yield chunk.content
@@ -0,0 +1,265 @@
+"""Constant-memory streaming aggregates for performance monitoring."""
+
+import math
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import List, Optional, Sequence
+
+
+# Histogram bucket upper bounds for durations, in seconds
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class QuantileSketch:
+    """
+    Log-bucketed histogram for approximate quantiles (DDSketch/HDR style).
+
+    A value v lands in bucket ceil(log(v) / log(gamma)), so every quantile
+    is returned within relative_error of a real sample. Buckets are sparse,
+    which bounds memory by the value range rather than the sample count
+    (about 1,400 buckets cover 1us to 1,000,000s at 1%).
+    """
+
+    def __init__(self, relative_error: float = 0.01):
+        self.relative_error = relative_error
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0  # Values <= 0 (e.g. cache hits timed as 0s)
+        self.count = 0
+
+    def add(self, value: float):
+        """Record one value in O(1)"""
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: "QuantileSketch"):
+        """Add another sketch's counts (same relative_error) into this one"""
+        for index, count in list(other.buckets.items()):
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate q-quantile (0 <= q <= 1), or None when empty"""
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class StreamingStats:
+    """
+    Count, mean, variance, min/max and quantiles of a stream in O(1) memory.
+
+    Mean and variance use Welford's update, so they stay accurate over
+    millions of samples; quantiles come from a QuantileSketch. With bounds,
+    exact per-bucket counts are also kept for histogram export, since the
+    sketch only knows each value to within relative_error.
+    """
+
+    def __init__(self, relative_error: float = 0.01,
+                 bounds: Optional[Sequence[float]] = None):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch(relative_error)
+        self.bounds = tuple(bounds or ())
+        self._bucket_counts = [0] * len(self.bounds)
+
+    def add(self, value: float):
+        """Record one value"""
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sketch.add(value)
+        index = bisect_left(self.bounds, value)  # First bound >= value
+        if index < len(self.bounds):
+            self._bucket_counts[index] += 1
+
+    def merge(self, other: "StreamingStats"):
+        """Combine another stream's aggregates into this one"""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        for i, bucket_count in enumerate(other._bucket_counts):
+            self._bucket_counts[i] += bucket_count
+
+    def cumulative_counts(self) -> List[int]:
+        """Exact count of values <= each bound, for histogram export"""
+        counts, seen = [], 0
+        for bucket_count in self._bucket_counts:
+            seen += bucket_count
+            counts.append(seen)
+        return counts
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 with fewer than two values)"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.sketch.quantile(q)
+
+    def to_dict(self) -> dict:
+        """Snapshot of every aggregate"""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "stddev": self.stddev,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+
+class _WindowSlot:
+    """Aggregates for one time slice of a RollingWindow"""
+
+    __slots__ = ("count", "errors", "tokens", "duration", "latency")
+
+    def __init__(self, relative_error: float):
+        self.count = 0
+        self.errors = 0
+        self.tokens = 0
+        self.duration = 0.0
+        self.latency = QuantileSketch(relative_error)
+
+
+class RollingWindow:
+    """
+    Sliding-window aggregates over the last span seconds.
+
+    The window is a ring of slot_width-second slots. Recording touches only
+    the current slot (stale slots are reset when the ring wraps onto them),
+    and reading merges at most span / slot_width slots, so both costs are
+    independent of traffic.
+    """
+
+    def __init__(self, span: float, slot_width: float, clock,
+                 relative_error: float = 0.01):
+        self.span = span
+        self.slot_width = slot_width
+        self.clock = clock
+        self.relative_error = relative_error
+        size = math.ceil(span / slot_width)
+        self._epochs = [None] * size
+        self._slots = [None] * size
+
+    def add(self, duration: float, tokens: float = 0, error: bool = False):
+        """Record one event (a run or a step) at the current time"""
+        epoch = int(self.clock() // self.slot_width)
+        index = epoch % len(self._slots)
+        slot = self._slots[index]
+        if self._epochs[index] != epoch:
+            slot = self._slots[index] = _WindowSlot(self.relative_error)
+            self._epochs[index] = epoch
+
+        slot.count += 1
+        slot.errors += error
+        slot.tokens += tokens
+        slot.duration += duration
+        slot.latency.add(duration)
+
+    def snapshot(self) -> dict:
+        """Throughput, error rate, latency percentiles and tokens/sec"""
+        return RollingWindow.combined_snapshot([self])
+
+    @staticmethod
+    def combined_snapshot(windows: List["RollingWindow"]) -> dict:
+        """snapshot() over several windows with the same span, slots and clock"""
+        first = windows[0]
+        oldest = int(first.clock() // first.slot_width) - len(first._slots) + 1
+        count = errors = tokens = 0
+        duration = 0.0
+        latency = QuantileSketch(first.relative_error)
+        for window in windows:
+            for epoch, slot in list(zip(window._epochs, window._slots)):
+                if epoch is None or epoch < oldest:
+                    continue
+                count += slot.count
+                errors += slot.errors
+                tokens += slot.tokens
+                duration += slot.duration
+                latency.merge(slot.latency)
+
+        return {
+            "count": count,
+            "throughput": count / first.span,
+            "error_rate": errors / count if count else 0.0,
+            "avg_latency": duration / count if count else 0.0,
+            "p50_latency": latency.quantile(0.50),
+            "p95_latency": latency.quantile(0.95),
+            "p99_latency": latency.quantile(0.99),
+            "avg_tokens": tokens / count if count else 0.0,
+            "tokens_per_sec": tokens / duration if duration else 0.0
+        }
+
+
+# Shards per striped collector. Fixed, so memory does not grow with the
+# number of threads a server has ever run.
+DEFAULT_STRIPES = 8
+
+
+class StripedShards:
+    """
+    A fixed set of lock-protected collector instances, merged by readers.
+
+    A writer locks the stripe picked by its thread id, so concurrent threads
+    mostly record without contending, while thread-per-request servers
+    still keep a constant number of shards.
+    """
+
+    def __init__(self, factory, stripes: int = DEFAULT_STRIPES):
+        self._shards = [factory() for _ in range(stripes)]
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    @contextmanager
+    def local(self):
+        """Lock and yield this thread's stripe"""
+        # Native ids are small sequential ints, so they spread evenly
+        index = threading.get_native_id() % len(self._shards)
+        with self._locks[index]:
+            yield self._shards[index]
+
+    def all(self) -> list:
+        """Every stripe"""
+        return list(self._shards)
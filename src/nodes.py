@@ -1,98 +1,217 @@
+from typing import List
 from src.state import ResearchState
-from src.client import create_llm
+from src.client import get_shared_llm
+
+
+# Optional semantic cache in front of research_node (see set_research_cache)
+research_cache = None
 
 
 def get_llm():
     """Get LLM instance for nodes"""
-    return create_llm()
+    return get_shared_llm()
 
 
-def research_node(state: ResearchState) -> ResearchState:
-    """Research node - gathers information"""
-    print("🔍 Research Node: Investigating '{state['query']}'")
+def set_research_cache(cache):
+    """Serve research for similar queries from cache (None turns it off)"""
+    global research_cache
+    research_cache = cache
+
 
+def _call_llm(prompt: str):
+    """Invoke the LLM, returning (content, exception)"""
     llm = get_llm()
-    prompt = f"Research and provide key information about: {state['query']}"
+    try:
+        return llm.invoke(prompt).content, None
+    except Exception as e:
+        return "", e
+
 
+async def _acall_llm(prompt: str):
+    """Invoke the LLM without blocking the event loop"""
+    llm = get_llm()
     try:
-        response = llm.invoke(prompt)
-        research_results = response.content
-        error = None
+        return (await llm.ainvoke(prompt)).content, None
     except Exception as e:
-        research_results = ""
-        error = f"Research failed: {str(e)}"
+        return "", e
+
 
+# State fields each node's prompt reads, as field -> character limit
+# (None = whole field); used to count a traced step's input tokens
+PROMPT_FIELDS = {
+    "research": {"query": None},
+    "analysis": {"research_results": None},
+    "summary": {"query": None, "analysis": None},
+    "cost_research": {"research_results": 500},
+    "expand_research": {"query": None, "research_results": None}
+}
+
+
+# Research
+
+def _research_prompt(state: ResearchState) -> str:
+    return f"Research and provide key information about: {state['query']}"
+
+
+def _research_update(state: ResearchState, content: str, exc) -> ResearchState:
     return {
         **state,  # Keep all existing fields
-        "research_results": research_results,
+        "research_results": content,
         "step_count": state["step_count"] + 1,
-        "error": error
+        "error": f"Research failed: {str(exc)}" if exc else None
+    }
+
+
+def _cached_research(state: ResearchState):
+    """Look up research for a similar query in research_cache"""
+    if research_cache is None:
+        return None
+    cached = research_cache.lookup(state["query"])
+    if cached is not None:
+        print("⚡ Research Node: Reusing research for a similar query")
+    return cached
+
+
+def _store_research(state: ResearchState, content: str, exc):
+    if research_cache is not None and exc is None:
+        research_cache.update(state["query"], content)
+
+
+def research_node(state: ResearchState) -> ResearchState:
+    """Research node - gathers information"""
+    print("🔍 Research Node: Investigating '{state['query']}'")
+    cached = _cached_research(state)
+    if cached is not None:
+        return _research_update(state, cached, None)
+
+    content, exc = _call_llm(_research_prompt(state))
+    _store_research(state, content, exc)
+    return _research_update(state, content, exc)
+
+
+async def aresearch_node(state: ResearchState) -> ResearchState:
+    """Async research node"""
+    print("🔍 Research Node: Investigating '{state['query']}'")
+    cached = _cached_research(state)
+    if cached is not None:
+        return _research_update(state, cached, None)
+
+    content, exc = await _acall_llm(_research_prompt(state))
+    _store_research(state, content, exc)
+    return _research_update(state, content, exc)
+
+
+# Analysis
+
+def _analysis_prompt(state: ResearchState) -> str:
+    return f"Analyze this research and provide insights:\n{state['research_results']}"
+
+
+def _analysis_update(state: ResearchState, content: str, exc) -> ResearchState:
+    return {
+        **state,
+        "analysis": content,
+        "step_count": state["step_count"] + 1,
+        "error": f"Analysis failed: {str(exc)}" if exc else None
     }
 
 
 def analysis_node(state: ResearchState) -> ResearchState:
     """Analysis node - analyzes research results"""
     print("🧠 Analysis Node: Analyzing research")
+    content, exc = _call_llm(_analysis_prompt(state))
+    return _analysis_update(state, content, exc)
 
-    llm = get_llm()
-    prompt = f"Analyze this research and provide insights:\n{state['research_results']}"
 
-    try:
-        response = llm.invoke(prompt)
-        analysis = response.content
-        error = None
-    except Exception as e:
-        analysis = ""
-        error = f"Analysis failed: {str(e)}"
+async def aanalysis_node(state: ResearchState) -> ResearchState:
+    """Async analysis node"""
+    print("🧠 Analysis Node: Analyzing research")
+    content, exc = await _acall_llm(_analysis_prompt(state))
+    return _analysis_update(state, content, exc)
 
+
+# Summary
+
+def _summary_prompt(state: ResearchState) -> str:
+    return f"Create a summary for {state['query']}:\nAnalysis: {state['analysis']}"
+
+
+def _summary_update(state: ResearchState, content: str, exc) -> ResearchState:
     return {
         **state,
-        "analysis": analysis,
+        "summary": content,
         "step_count": state["step_count"] + 1,
-        "error": error
+        "error": f"Summary failed: {str(exc)}" if exc else None
     }
 
 
 def summary_node(state: ResearchState) -> ResearchState:
     """Summary node - creates final summary"""
     print("📝 Summary Node: Creating summary")
+    content, exc = _call_llm(_summary_prompt(state))
+    return _summary_update(state, content, exc)
 
-    llm = get_llm()
-    prompt = f"Create a summary for {state['query']}:\nAnalysis: {state['analysis']}"
 
-    try:
-        response = llm.invoke(prompt)
-        summary = response.content
-        error = None
-    except Exception as e:
-        summary = ""
-        error = f"Summary failed: {str(e)}"
+async def asummary_node(state: ResearchState) -> ResearchState:
+    """Async summary node"""
+    print("📝 Summary Node: Creating summary")
+    content, exc = await _acall_llm(_summary_prompt(state))
+    return _summary_update(state, content, exc)
+
+
+# Cost research
+
+def _cost_research_prompt(state: ResearchState) -> str:
+    return f"Research cost solutions for: {state['research_results'][:500]}"
+
+
+def _cost_research_update(state: ResearchState, content: str, exc) -> ResearchState:
+    # Optional extra research: on failure keep what we have, but report it
+    if exc is not None:
+        return {
+            **state,
+            "step_count": state["step_count"] + 1,
+            "error": f"Cost research failed: {str(exc)}"
+        }
 
     return {
         **state,
-        "summary": summary,
-        "step_count": state["step_count"] + 1,
-        "error": error
+        "research_results": state['research_results'] + f"\n\nCost Solutions:\n{content}",
+        "step_count": state["step_count"] + 1
     }
 
 
 def cost_research_node(state: ResearchState) -> ResearchState:
     """Research cost-related solutions"""
     print("💰 Cost Research Node: Finding solutions")
+    content, exc = _call_llm(_cost_research_prompt(state))
+    return _cost_research_update(state, content, exc)
 
-    llm = get_llm()
-    prompt = f"Research cost solutions for: {state['research_results'][:500]}"
 
-    try:
-        response = llm.invoke(prompt)
-        enhanced = state['research_results'] + \
-            f"\n\nCost Solutions:\n{response.content}"
-    except Exception as e:
-        enhanced = state['research_results']
+async def acost_research_node(state: ResearchState) -> ResearchState:
+    """Async cost research node"""
+    print("💰 Cost Research Node: Finding solutions")
+    content, exc = await _acall_llm(_cost_research_prompt(state))
+    return _cost_research_update(state, content, exc)
+
+
+# Expand research
+
+def _expand_research_prompt(state: ResearchState) -> str:
+    return f"Expand on this research about {state['query']}: {state['research_results']}"
+
+
+def _expand_research_update(state: ResearchState, content: str, exc) -> ResearchState:
+    if exc is not None:
+        return {
+            **state,
+            "step_count": state["step_count"] + 1,
+            "error": f"Expand research failed: {str(exc)}"
+        }
 
     return {
         **state,
-        "research_results": enhanced,
+        "research_results": state['research_results'] + f"\n\nExpanded:\n{content}",
         "step_count": state["step_count"] + 1
     }
 
@@ -100,42 +219,37 @@ def cost_research_node(state: ResearchState) -> ResearchState:
 def expand_research_node(state: ResearchState) -> ResearchState:
     """Expand brief research"""
     print("📚 Expand Research Node: Gathering more info")
+    content, exc = _call_llm(_expand_research_prompt(state))
+    return _expand_research_update(state, content, exc)
 
-    llm = get_llm()
-    prompt = f"Expand on this research about {state['query']}: {state['research_results']}"
-
-    try:
-        response = llm.invoke(prompt)
-        enhanced = state['research_results'] + \
-            f"\n\nExpanded:\n{response.content}"
-    except Exception as e:
-        enhanced = state['research_results']
 
-    return {
-        **state,
-        "research_results": enhanced,
-        "step_count": state["step_count"] + 1
-    }
+async def aexpand_research_node(state: ResearchState) -> ResearchState:
+    """Async expand research node"""
+    print("📚 Expand Research Node: Gathering more info")
+    content, exc = await _acall_llm(_expand_research_prompt(state))
+    return _expand_research_update(state, content, exc)
 
 # Decision Functions
 
+COST_KEYWORDS = ["expensive", "costly", "high cost", "price"]
+BRIEF_RESEARCH_LENGTH = 300
+
+
+def _has_cost_concerns(research: str) -> bool:
+    return any(word in research for word in COST_KEYWORDS)
+
 
 def decide_after_research(state: ResearchState) -> str:
     """Decide next step based on research content"""
     research = state.get("research_results", "").lower()
 
     # Check for cost keywords
-    if any(
-        word in research for word in [
-            "expensive",
-            "costly",
-            "high cost",
-            "price"]):
+    if _has_cost_concerns(research):
         print("💡 Decision: Cost concerns -> cost_research")
         return "cost_research"
 
     # Check if too short
-    elif len(research) < 300:
+    elif len(research) < BRIEF_RESEARCH_LENGTH:
         print("💡 Decision: Brief results -> expand_research")
         return "expand_research"
 
@@ -143,3 +257,21 @@ def decide_after_research(state: ResearchState) -> str:
     else:
         print("💡 Decision: Sufficient -> analysis")
         return "analysis"
+
+
+def decide_research_branches(state: ResearchState) -> List[str]:
+    """Pick every follow-up research branch that applies (run in parallel)"""
+    research = state.get("research_results", "").lower()
+    branches = []
+
+    if _has_cost_concerns(research):
+        branches.append("cost_research")
+    if len(research) < BRIEF_RESEARCH_LENGTH:
+        branches.append("expand_research")
+
+    if not branches:
+        print("💡 Decision: Sufficient -> analysis")
+        return ["analysis"]
+
+    print(f"💡 Decision: Fan out -> {', '.join(branches)}")
+    return branches
@@ -1,68 +1,211 @@
-from typing import List
+import threading
+import time
+from typing import List, Optional
+
+from src.metrics import DURATION_BUCKETS, RollingWindow, StreamingStats, StripedShards
+
+
+# Sliding windows: name -> (span seconds, slot width seconds)
+WINDOWS = {
+    "1m": (60, 1),
+    "5m": (300, 5),
+    "1h": (3600, 60)
+}
+
+RUN_STATS = ("execution_time", "tokens", "cost")
+STEP_STATS = ("duration", "tokens", "cost")
+# Stats that keep exact histogram buckets for the exporter
+DURATION_STATS = ("execution_time", "duration")
+
+
+def _new_stats(names) -> dict:
+    return {
+        name: StreamingStats(bounds=DURATION_BUCKETS if name in DURATION_STATS else None)
+        for name in names
+    }
+
+
+def _new_windows(clock) -> dict:
+    return {
+        name: RollingWindow(span, slot_width, clock)
+        for name, (span, slot_width) in WINDOWS.items()
+    }
+
+
+class _MonitorShard:
+    """One stripe of a PerformanceMonitor's aggregates"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.run_stats = _new_stats(RUN_STATS)
+        self.error_count = 0
+        self.step_metrics = {}
+        self.run_windows = _new_windows(clock)
+        self.step_windows = {}
+
+    def record(self, run_data: dict):
+        self.run_stats["execution_time"].add(run_data["execution_time"])
+        self.run_stats["tokens"].add(run_data["token_estimate"])
+        self.run_stats["cost"].add(run_data["cost_estimate"])
+        if run_data["has_error"]:
+            self.error_count += 1
+        for window in self.run_windows.values():
+            window.add(run_data["execution_time"], run_data["token_estimate"],
+                       run_data["has_error"])
+
+        # Aggregate step-level metrics
+        for step in run_data["steps"]:
+            step_name = step.get("step_name", "unknown")
+            if step_name not in self.step_metrics:
+                self.step_windows[step_name] = _new_windows(self.clock)
+                self.step_metrics[step_name] = {
+                    **_new_stats(STEP_STATS),
+                    "success_count": 0,
+                    "failure_count": 0
+                }
+
+            metrics = self.step_metrics[step_name]
+            metrics["duration"].add(step.get("duration", 0))
+            metrics["tokens"].add(step.get("tokens", 0))
+            metrics["cost"].add(step.get("cost", 0))
+
+            success = step.get("status") == "success"
+            if success:
+                metrics["success_count"] += 1
+            else:
+                metrics["failure_count"] += 1
+
+            for window in self.step_windows[step_name].values():
+                window.add(step.get("duration", 0), step.get("tokens", 0), not success)
 
 
 class PerformanceMonitor:
-    """Monitor and analyze workflow performance"""
+    """
+    Monitor and analyze workflow performance.
 
-    def __init__(self):
+    Safe to share between threads: each thread records into one of a fixed
+    set of locked stripes, and the read methods merge the stripes.
+    """
+
+    def __init__(self, max_recent_runs: int = 1000, max_indexed_runs: int = 100000,
+                 clock=time.monotonic):
+        # Only the latest runs are kept; aggregates cover every run
         self.runs = []
-        self.step_metrics = {}
+        self.max_recent_runs = max_recent_runs
+        self.caches = {}
+        self.clock = clock
+        self._shards = StripedShards(lambda: _MonitorShard(clock))
+        # trace_id -> run record, oldest first (insertion order), capped
+        # across all threads
+        self.max_indexed_runs = max_indexed_runs
+        self._trace_index = {}
+        self._trace_lock = threading.Lock()
+
+    def track_cache(self, name: str, cache):
+        """Include a cache's get_stats() in this monitor's reports"""
+        self.caches[name] = cache
+
+    def get_cache_stats(self) -> dict:
+        """Get stats (hit rate, bytes stored, evictions) for tracked caches"""
+        return {name: cache.get_stats() for name, cache in list(self.caches.items())}
 
     def record_run(self, state: dict):
         """Record metrics from a completed workflow run"""
+        trace_metadata = state.get("trace_metadata", {})
+        steps = trace_metadata.get("steps", [])
         run_data = {
+            "trace_id": trace_metadata.get("trace_id"),
             "query": state.get("query", ""),
-            "execution_time": state.get("execution_time", 0),
+            # Workflow states only carry per-step numbers, so total those
+            "execution_time": state.get("execution_time",
+                                        sum(s.get("duration", 0) for s in steps)),
             "step_count": state.get("step_count", 0),
-            "token_estimate": state.get("token_estimate", 0),
-            "cost_estimate": state.get("cost_estimate", 0),
+            "token_estimate": state.get("token_estimate",
+                                        sum(s.get("tokens", 0) for s in steps)),
+            "cost_estimate": state.get("cost_estimate",
+                                       sum(s.get("cost", 0) for s in steps)),
             "has_error": state.get("error") is not None,
-            "steps": state.get("trace_metadata", {}).get("steps", [])
+            "steps": steps
         }
 
+        # list.append and slice deletion are atomic, so runs needs no lock
         self.runs.append(run_data)
+        if len(self.runs) > 2 * self.max_recent_runs:
+            # Trim in batches so appends stay amortized O(1)
+            del self.runs[:-self.max_recent_runs]
 
-        # Aggregate step-level metrics
-        for step in run_data["steps"]:
-            step_name = step.get("step_name", "unknown")
-            if step_name not in self.step_metrics:
-                self.step_metrics[step_name] = {
-                    "durations": [],
-                    "tokens": [],
-                    "costs": [],
-                    "success_count": 0,
-                    "failure_count": 0
-                }
+        if run_data["trace_id"] is not None:
+            with self._trace_lock:
+                self._trace_index[run_data["trace_id"]] = run_data
+                if len(self._trace_index) > self.max_indexed_runs:
+                    del self._trace_index[next(iter(self._trace_index))]
 
-            self.step_metrics[step_name]["durations"].append(
-                step.get("duration", 0))
-            self.step_metrics[step_name]["tokens"].append(
-                step.get("tokens", 0))
-            self.step_metrics[step_name]["costs"].append(step.get("cost", 0))
+        with self._shards.local() as shard:
+            shard.record(run_data)
 
-            if step.get("status") == "success":
-                self.step_metrics[step_name]["success_count"] += 1
-            else:
-                self.step_metrics[step_name]["failure_count"] += 1
+    def get_run(self, trace_id: str) -> Optional[dict]:
+        """Look up an indexed run by trace id"""
+        return self._trace_index.get(trace_id)
+
+    def get_run_index(self) -> dict:
+        """trace_id -> run record for every indexed run (a copy)"""
+        with self._trace_lock:
+            return dict(self._trace_index)
+
+    @property
+    def run_stats(self) -> dict:
+        """Run-level StreamingStats merged across threads"""
+        merged = _new_stats(RUN_STATS)
+        for shard in self._shards.all():
+            for name in RUN_STATS:
+                merged[name].merge(shard.run_stats[name])
+        return merged
+
+    @property
+    def error_count(self) -> int:
+        return sum(shard.error_count for shard in self._shards.all())
+
+    @property
+    def step_metrics(self) -> dict:
+        """Per-step StreamingStats and status counts merged across threads"""
+        merged = {}
+        for shard in self._shards.all():
+            for step_name, metrics in list(shard.step_metrics.items()):
+                if step_name not in merged:
+                    merged[step_name] = {
+                        **_new_stats(STEP_STATS),
+                        "success_count": 0,
+                        "failure_count": 0
+                    }
+                target = merged[step_name]
+                for name in STEP_STATS:
+                    target[name].merge(metrics[name])
+                target["success_count"] += metrics["success_count"]
+                target["failure_count"] += metrics["failure_count"]
+        return merged
 
     def get_summary(self) -> dict:
         """Get performance summary"""
-        if not self.runs:
+        run_stats = self.run_stats
+        total_runs = run_stats["execution_time"].count
+        if not total_runs:
             return {"total_runs": 0, "message": "No runs recorded"}
 
-        total_time = sum(r["execution_time"] for r in self.runs)
-        total_tokens = sum(r["token_estimate"] for r in self.runs)
-        total_cost = sum(r["cost_estimate"] for r in self.runs)
-        error_count = sum(1 for r in self.runs if r["has_error"])
+        times = run_stats["execution_time"]
+        tokens = run_stats["tokens"]
+        cost = run_stats["cost"]
 
         return {
-            "total_runs": len(self.runs),
-            "avg_execution_time": total_time / len(self.runs),
-            "total_tokens": total_tokens,
-            "avg_tokens_per_run": total_tokens / len(self.runs),
-            "total_cost": total_cost,
-            "avg_cost_per_run": total_cost / len(self.runs),
-            "error_rate": error_count / len(self.runs)
+            "total_runs": total_runs,
+            "avg_execution_time": times.mean,
+            "p50_execution_time": times.quantile(0.50),
+            "p95_execution_time": times.quantile(0.95),
+            "p99_execution_time": times.quantile(0.99),
+            "total_tokens": tokens.total,
+            "avg_tokens_per_run": tokens.mean,
+            "total_cost": cost.total,
+            "avg_cost_per_run": cost.mean,
+            "error_rate": self.error_count / total_runs
         }
 
     def get_step_analysis(self) -> dict:
@@ -70,25 +213,70 @@ class PerformanceMonitor:
         analysis = {}
 
         for step_name, metrics in self.step_metrics.items():
-            durations = metrics["durations"]
-            tokens = metrics["tokens"]
+            durations = metrics["duration"]
             total_runs = metrics["success_count"] + metrics["failure_count"]
 
-            if durations and total_runs > 0:
+            if durations.count and total_runs > 0:
                 analysis[step_name] = {
-                    "avg_duration": sum(durations) / len(durations),
-                    "max_duration": max(durations),
-                    "min_duration": min(durations),
-                    "avg_tokens": sum(tokens) / len(tokens) if tokens else 0,
+                    "avg_duration": durations.mean,
+                    "stddev_duration": durations.stddev,
+                    "max_duration": durations.max,
+                    "min_duration": durations.min,
+                    "p50_duration": durations.quantile(0.50),
+                    "p95_duration": durations.quantile(0.95),
+                    "p99_duration": durations.quantile(0.99),
+                    "avg_tokens": metrics["tokens"].mean,
                     "success_rate": metrics["success_count"] / total_runs
                 }
 
         return analysis
 
-    def get_recommendations(self) -> List[dict]:
-        """Generate optimization recommendations"""
+    def get_window_stats(self, window: str = "5m") -> dict:
+        """
+        Get recent throughput, error rate, latency percentiles and tokens/sec.
+
+        Args:
+            window: One of WINDOWS ("1m", "5m", "1h")
+
+        Returns:
+            {"runs": stats, "steps": {step_name: stats}} for that window
+        """
+        if window not in WINDOWS:
+            raise ValueError(f"Unknown window: {window}")
+
+        shards = self._shards.all()
+        step_windows = {}
+        for shard in shards:
+            for step_name, windows in list(shard.step_windows.items()):
+                step_windows.setdefault(step_name, []).append(windows[window])
+
+        return {
+            "runs": RollingWindow.combined_snapshot([s.run_windows[window] for s in shards]),
+            "steps": {
+                step_name: RollingWindow.combined_snapshot(windows)
+                for step_name, windows in step_windows.items()
+            }
+        }
+
+    def _recent_step_analysis(self, window: str) -> dict:
+        """Step stats for a recent window, keyed like get_step_analysis()"""
+        analysis = {}
+        for step_name, stats in self.get_window_stats(window)["steps"].items():
+            if stats["count"]:
+                analysis[step_name] = {
+                    "avg_duration": stats["avg_latency"],
+                    "avg_tokens": stats["avg_tokens"],
+                    "success_rate": 1 - stats["error_rate"]
+                }
+        return analysis
+
+    def get_recommendations(self, window: Optional[str] = None) -> List[dict]:
+        """Generate optimization recommendations (from a recent window if given)"""
         recommendations = []
-        step_analysis = self.get_step_analysis()
+        if window is None:
+            step_analysis = self.get_step_analysis()
+        else:
+            step_analysis = self._recent_step_analysis(window)
 
         for step_name, metrics in step_analysis.items():
             if metrics["avg_duration"] > 5.0:
@@ -137,9 +325,19 @@ class PerformanceMonitor:
             for step_name, metrics in step_analysis.items():
                 print(f"\n  {step_name.upper()}:")
                 print(f"    Avg duration: {metrics['avg_duration']:.2f}s")
+                print(f"    p95 duration: {metrics['p95_duration']:.2f}s")
                 print(f"    Avg tokens: {metrics['avg_tokens']:.0f}")
                 print(f"    Success rate: {metrics['success_rate']:.1%}")
 
+        cache_stats = self.get_cache_stats()
+        if cache_stats:
+            print("\nCaches:")
+            for name, stats in cache_stats.items():
+                print(f"\n  {name.upper()}:")
+                print(f"    Hit rate: {stats.get('hit_rate', 0):.1%}")
+                print(f"    Bytes stored: {stats.get('bytes_stored', 0)}")
+                print(f"    Evictions: {stats.get('evictions', 0)}")
+
         recommendations = self.get_recommendations()
         if recommendations:
             print("\n💡 RECOMMENDATIONS:")
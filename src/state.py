@@ -1,4 +1,7 @@
-from typing import TypedDict, Optional
+import operator
+from typing import Annotated, TypedDict, Optional
+
+from src.tracing import generate_trace_id
 
 
 class ResearchState(TypedDict):
@@ -11,6 +14,35 @@ class ResearchState(TypedDict):
     iteration_count: int          # Track loop iterations
     step_count: int               # Total steps executed
     error: Optional[str]          # Error tracking
+    trace_metadata: dict          # Per-step timings/tokens (see src.tracing)
+
+
+def merge_research_results(left: str, right: str) -> str:
+    """Reducer that appends research added by parallel branches"""
+    return left + right
+
+
+def latest_error(left: Optional[str], right: Optional[str]) -> Optional[str]:
+    """Reducer letting parallel branches both report an error (last one wins)"""
+    return right
+
+
+def merge_trace_metadata(left: dict, right: dict) -> dict:
+    """Reducer that appends the trace steps recorded by parallel branches"""
+    return {**left, **right, "steps": [*left.get("steps", ()), *right.get("steps", ())]}
+
+
+class ParallelResearchState(TypedDict):
+    """Research state whose shared fields can take parallel branch updates"""
+    query: str
+    research_results: Annotated[str, merge_research_results]
+    analysis: str
+    summary: str
+    quality_score: int
+    iteration_count: int
+    step_count: Annotated[int, operator.add]   # Branches add their steps
+    error: Annotated[Optional[str], latest_error]
+    trace_metadata: Annotated[dict, merge_trace_metadata]  # Branches add steps
 
 
 def create_initial_state(query: str) -> ResearchState:
@@ -23,7 +55,8 @@ def create_initial_state(query: str) -> ResearchState:
         "quality_score": 0,
         "iteration_count": 0,
         "step_count": 0,
-        "error": None
+        "error": None,
+        "trace_metadata": {"trace_id": generate_trace_id(), "steps": []}
     }
 
 
@@ -1,6 +1,17 @@
+import re
+import threading
 import time
 import uuid
-from typing import TypedDict, Optional
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Callable, List, TypedDict, Optional
+
+import numpy as np
+
+
+# Timings of recent streamed responses, newest last
+# Each entry: {"name", "time_to_first_token", "total_time", "chunks"}
+stream_timings = deque(maxlen=1000)
 
 
 class TracedState(TypedDict):
@@ -38,9 +49,121 @@ def generate_trace_id() -> str:
     return str(uuid.uuid4())
 
 
+# BPE-style pre-tokenizer: words and numbers carry their leading space,
+# punctuation runs (underscores included) and whitespace runs are
+# separate pieces.
+_PIECE_PATTERN = re.compile(
+    r"(?P<contraction>'(?:s|t|re|ve|m|ll|d))"
+    r"|(?P<word> ?[^\W\d_]+)"
+    r"|(?P<number> ?\d+)"
+    r"|(?P<symbol> ?(?:[^\s\w]|_)+)"
+    r"|(?P<space>\s+(?!\S)|\s+)"
+)
+_CONTRACTION, _WORD, _NUMBER, _SYMBOL, _SPACE = range(1, 6)
+
+# Strings longer than this are memoized by (length, hash) instead of by value
+MEMO_MAX_LENGTH = 10000
+
+# Long strings remembered by count only, so the memo holds no large text
+LONG_MEMO_SIZE = 256
+_long_counts = OrderedDict()
+_long_counts_lock = threading.Lock()
+
+
+def _piece_tokens(kind: int, piece: str) -> int:
+    """Approximate the BPE tokens for one pre-tokenized piece"""
+    if kind == _WORD:
+        core = piece.lstrip(" ")
+        if core.isascii():
+            # Common words are one token, longer ones split every ~4 chars
+            n = len(core)
+            return 1 if n <= 7 else 1 + -(-(n - 7) // 4)
+        # Non-Latin scripts: roughly one token per 3 UTF-8 bytes
+        return max(1, -(-len(core.encode("utf-8")) // 3))
+    if kind == _NUMBER:
+        return -(-len(piece.lstrip(" ")) // 3)
+    if kind == _SYMBOL:
+        return -(-len(piece.lstrip(" ").encode("utf-8")) // 2)
+    return 1
+
+
+def bpe_token_count(text: str) -> int:
+    """Count tokens offline with a BPE-style approximation"""
+    return sum(
+        _piece_tokens(match.lastindex, match.group())
+        for match in _PIECE_PATTERN.finditer(text)
+    )
+
+
+# Active token counter (see set_token_counter)
+_token_counter: Callable[[str], int] = bpe_token_count
+
+
+@lru_cache(maxsize=8192)
+def _memo_token_count(text: str) -> int:
+    return _token_counter(text)
+
+
+def set_token_counter(counter: Optional[Callable[[str], int]] = None):
+    """
+    Replace the token counter used by estimate_tokens().
+
+    Args:
+        counter: Callable taking text and returning a token count (e.g. a
+                 real tokenizer's len(encode(text))), or None for the
+                 built-in BPE-style counter
+    """
+    global _token_counter
+    _token_counter = counter or bpe_token_count
+    _memo_token_count.cache_clear()
+    with _long_counts_lock:
+        _long_counts.clear()
+
+
 def estimate_tokens(text: str) -> int:
-    """Estimate token count (rough approximation)"""
-    return len(text) // 4
+    """Estimate token count (memoized for repeated strings)"""
+    if len(text) <= MEMO_MAX_LENGTH:
+        return _memo_token_count(text)
+
+    # str caches its hash, so a field passed from step to step is looked
+    # up in O(1); a hash collision only skews an estimate
+    key = (len(text), hash(text))
+    with _long_counts_lock:
+        count = _long_counts.get(key)
+        if count is not None:
+            _long_counts.move_to_end(key)
+            return count
+    count = _token_counter(text)
+    with _long_counts_lock:
+        _long_counts[key] = count
+        if len(_long_counts) > LONG_MEMO_SIZE:
+            _long_counts.popitem(last=False)
+    return count
+
+
+def estimate_tokens_bulk(texts: List[str]) -> np.ndarray:
+    """
+    Estimate token counts for a batch of texts, counting each distinct
+    text once.
+
+    Counting is not vectorized: every distinct text goes through
+    estimate_tokens() in turn. The saving comes from deduplication, and
+    results are scattered back with one NumPy index, so a batch full of
+    repeated prompts costs little more than its distinct texts.
+
+    Returns:
+        int64 array of counts, in input order
+    """
+    positions = {}
+    inverse = np.fromiter(
+        (positions.setdefault(text, len(positions)) for text in texts),
+        dtype=np.int64, count=len(texts)
+    )
+    unique = list(positions)
+
+    counts = np.fromiter((estimate_tokens(t) for t in unique),
+                         dtype=np.int64, count=len(unique))
+    return counts[inverse]
 
 
 def estimate_cost(tokens: int, rate: float = 0.000002) -> float:
@@ -48,6 +171,158 @@ def estimate_cost(tokens: int, rate: float = 0.000002) -> float:
     return tokens * rate
 
 
+def _step_tokens(state: dict, result: dict, inputs: Optional[dict]):
+    """
+    Estimated (input, output) tokens of a node call.
+
+    Input counts the state fields the node's prompt reads (inputs maps
+    field -> character limit or None), or every string field without
+    inputs. Output counts changed string fields; text appended to a field
+    counts only the appended part.
+    """
+    input_tokens = output_tokens = 0
+    if inputs is None:
+        for value in state.values():
+            if value.__class__ is str and value:
+                input_tokens += estimate_tokens(value)
+    else:
+        for key, limit in inputs.items():
+            value = state.get(key)
+            if value.__class__ is str and value:
+                input_tokens += estimate_tokens(value if limit is None else value[:limit])
+    for key, value in result.items():
+        if value.__class__ is not str or not value:
+            continue
+        old = state.get(key)
+        if old is value:
+            continue
+        if old.__class__ is str and old and value.startswith(old):
+            value = value[len(old):]
+        output_tokens += estimate_tokens(value)
+    return input_tokens, output_tokens
+
+
+def _with_step(state: dict, result: dict, name: str, start: float,
+               inputs: Optional[dict], status: str, error: Optional[str]) -> dict:
+    """Append one step record to the result's trace_metadata"""
+    duration = time.perf_counter() - start
+    input_tokens, output_tokens = _step_tokens(state, result, inputs)
+    tokens = input_tokens + output_tokens
+    metadata = state.get("trace_metadata") or {}
+    step = {
+        "step_name": name,
+        "duration": duration,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "tokens": tokens,
+        "cost": estimate_cost(tokens),
+        "status": status,
+        "error": error
+    }
+    # New dict and list so earlier checkpoints keep their own step history
+    result["trace_metadata"] = {**metadata, "steps": [*metadata.get("steps", ()), step]}
+    return result
+
+
+def _step_status(state: dict, result: dict):
+    """Nodes report failures in state["error"] rather than raising"""
+    error = result.get("error")
+    if error and error != state.get("error"):
+        return "failure", error
+    return "success", None
+
+
+def _raised(state: dict, name: str, exc: Exception) -> dict:
+    """Turn an exception from a node into the usual error state"""
+    return {**state, "error": f"{name} failed: {exc}"}
+
+
+def instrument_node(name: str, node, anode=None, inputs: Optional[dict] = None):
+    """
+    Wrap a workflow node so each call appends a step to trace_metadata["steps"].
+
+    Each step records step_name, duration (perf_counter seconds), input and
+    output tokens, cost and status, matching what PerformanceMonitor.record_run
+    reads. A step fails when the node sets a new state["error"]. A node that
+    raises is recorded as a failed step and reported through state["error"],
+    like nodes that catch their own errors.
+
+    Args:
+        name: Step name to record
+        node: Sync node taking and returning a full state dict
+        anode: Optional async version of node
+        inputs: State fields the node's prompt reads, as field -> character
+                limit (None = whole field); every string field when omitted
+
+    Returns:
+        (run, arun) wrapped functions; arun is None without anode
+    """
+    def run(state):
+        start = time.perf_counter()
+        try:
+            result = node(state)
+        except Exception as e:
+            result = _raised(state, name, e)
+        result = dict(result) if result is state else result
+        return _with_step(state, result, name, start, inputs,
+                          *_step_status(state, result))
+
+    if anode is None:
+        return run, None
+
+    async def arun(state):
+        start = time.perf_counter()
+        try:
+            result = await anode(state)
+        except Exception as e:
+            result = _raised(state, name, e)
+        result = dict(result) if result is state else result
+        return _with_step(state, result, name, start, inputs,
+                          *_step_status(state, result))
+
+    return run, arun
+
+
+def _record_stream_timing(name: str, start: float, first: Optional[float], chunks: int):
+    """Append one stream timing entry"""
+    stream_timings.append({
+        "name": name,
+        "time_to_first_token": first,
+        "total_time": time.perf_counter() - start,
+        "chunks": chunks
+    })
+
+
+def time_stream(chunks, name: str = "stream"):
+    """Pass through a stream of chunks, recording time to first token"""
+    start = time.perf_counter()
+    first = None
+    count = 0
+    try:
+        for chunk in chunks:
+            if first is None:
+                first = time.perf_counter() - start
+            count += 1
+            yield chunk
+    finally:
+        _record_stream_timing(name, start, first, count)
+
+
+async def atime_stream(chunks, name: str = "stream"):
+    """Async version of time_stream()"""
+    start = time.perf_counter()
+    first = None
+    count = 0
+    try:
+        async for chunk in chunks:
+            if first is None:
+                first = time.perf_counter() - start
+            count += 1
+            yield chunk
+    finally:
+        _record_stream_timing(name, start, first, count)
+
+
 def get_trace_summary(state: TracedState) -> dict:
     """Get a summary of the trace"""
     return {
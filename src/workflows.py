@@ -1,12 +1,55 @@
+import threading
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
-from src.state import ResearchState, create_initial_state
+from src.tracing import instrument_node
+from src.state import ResearchState, ParallelResearchState, create_initial_state
 from src.nodes import (
     research_node, analysis_node, summary_node,
     cost_research_node, expand_research_node,
-    decide_after_research
+    aresearch_node, aanalysis_node, asummary_node,
+    acost_research_node, aexpand_research_node,
+    decide_after_research, decide_research_branches, PROMPT_FIELDS
 )
 
 
+def _add_node(workflow, name, node, anode, traced=True):
+    """Register a node with sync and async implementations"""
+    if traced:
+        node, anode = instrument_node(name, node, anode, PROMPT_FIELDS.get(name))
+    # invoke() runs node, ainvoke() awaits anode, so one graph serves both
+    workflow.add_node(name, RunnableLambda(node, afunc=anode, name=name))
+
+
+def _to_update(before: dict, after: dict) -> dict:
+    """Turn a full-state node result into an update for ParallelResearchState"""
+    update = {key: value for key, value in after.items() if before.get(key) != value}
+
+    # Reducer fields take increments: the appended text and the added steps
+    if "research_results" in update:
+        update["research_results"] = after["research_results"][len(before["research_results"]):]
+    if "step_count" in update:
+        update["step_count"] = after["step_count"] - before["step_count"]
+    if "trace_metadata" in update:
+        seen = len(before["trace_metadata"].get("steps", ()))
+        steps = after["trace_metadata"].get("steps", [])[seen:]
+        update["trace_metadata"] = {**after["trace_metadata"], "steps": steps}
+    return update
+
+
+def _add_branch_node(workflow, name, node, anode):
+    """Register a traced node that may run alongside others in the same step"""
+    node, anode = instrument_node(name, node, anode, PROMPT_FIELDS.get(name))
+
+    def run(state):
+        return _to_update(state, node(state))
+
+    async def arun(state):
+        return _to_update(state, await anode(state))
+
+    # Traced above, on the full state; the reducers merge the branch steps
+    _add_node(workflow, name, run, arun, traced=False)
+
+
 def create_linear_workflow():
     """Create a simple linear workflow: research -> analysis -> summary"""
     print("🏗️ Building linear workflow...")
@@ -15,9 +58,9 @@ def create_linear_workflow():
     workflow = StateGraph(ResearchState)
 
     # Add workers
-    workflow.add_node("research", research_node)
-    workflow.add_node("analysis", analysis_node)
-    workflow.add_node("summary", summary_node)
+    _add_node(workflow, "research", research_node, aresearch_node)
+    _add_node(workflow, "analysis", analysis_node, aanalysis_node)
+    _add_node(workflow, "summary", summary_node, asummary_node)
 
     # Connect them with arrows
     workflow.add_edge("research", "analysis")
@@ -38,11 +81,11 @@ def create_conditional_workflow():
     workflow = StateGraph(ResearchState)
 
     # Add all workers (including branch workers)
-    workflow.add_node("research", research_node)
-    workflow.add_node("cost_research", cost_research_node)
-    workflow.add_node("expand_research", expand_research_node)
-    workflow.add_node("analysis", analysis_node)
-    workflow.add_node("summary", summary_node)
+    _add_node(workflow, "research", research_node, aresearch_node)
+    _add_node(workflow, "cost_research", cost_research_node, acost_research_node)
+    _add_node(workflow, "expand_research", expand_research_node, aexpand_research_node)
+    _add_node(workflow, "analysis", analysis_node, aanalysis_node)
+    _add_node(workflow, "summary", summary_node, asummary_node)
 
     # Add decision point after research
     workflow.add_conditional_edges(
@@ -66,13 +109,77 @@ def create_conditional_workflow():
     return workflow.compile()
 
 
+def create_parallel_workflow():
+    """Create a workflow that runs every applicable research branch at once"""
+    print("🏗️ Building parallel workflow...")
+
+    # Reducers on research_results and step_count merge branch updates
+    workflow = StateGraph(ParallelResearchState)
+
+    _add_branch_node(workflow, "research", research_node, aresearch_node)
+    _add_branch_node(workflow, "cost_research", cost_research_node, acost_research_node)
+    _add_branch_node(workflow, "expand_research", expand_research_node, aexpand_research_node)
+    _add_branch_node(workflow, "analysis", analysis_node, aanalysis_node)
+    _add_branch_node(workflow, "summary", summary_node, asummary_node)
+
+    # Fan out to one or both research branches (or straight to analysis)
+    workflow.add_conditional_edges(
+        "research",
+        decide_research_branches,
+        ["cost_research", "expand_research", "analysis"]
+    )
+
+    # Analysis waits for every branch that ran
+    workflow.add_edge("cost_research", "analysis")
+    workflow.add_edge("expand_research", "analysis")
+    workflow.add_edge("analysis", "summary")
+    workflow.add_edge("summary", END)
+
+    workflow.set_entry_point("research")
+
+    return workflow.compile()
+
+
+# Builders for each workflow type
+WORKFLOW_BUILDERS = {
+    "linear": create_linear_workflow,
+    "conditional": create_conditional_workflow,
+    "parallel": create_parallel_workflow
+}
+
+# Compiled graphs are immutable once built, so one instance per type is
+# shared by every thread and asyncio task in the process
+_compiled_workflows = {}
+_compiled_workflows_lock = threading.Lock()
+
+
+def get_workflow(workflow_type: str = "linear"):
+    """Get the compiled workflow for a type, compiling it on first use"""
+    if workflow_type not in WORKFLOW_BUILDERS:
+        raise ValueError(f"Unknown workflow type: {workflow_type}")
+
+    app = _compiled_workflows.get(workflow_type)
+    if app is None:
+        with _compiled_workflows_lock:
+            app = _compiled_workflows.get(workflow_type)
+            if app is None:
+                app = WORKFLOW_BUILDERS[workflow_type]()
+                _compiled_workflows[workflow_type] = app
+    return app
+
+
+def clear_workflow_cache():
+    """Drop compiled workflows (they are rebuilt on next use)"""
+    with _compiled_workflows_lock:
+        _compiled_workflows.clear()
+
+
 def run_research_workflow(query: str, workflow_type: str = "linear") -> dict:
     """Run a research workflow"""
-    # Choose which workflow to use
-    if workflow_type == "conditional":
-        app = create_conditional_workflow()
-    else:
-        app = create_linear_workflow()
+    # Choose which workflow to use (unknown types fall back to linear)
+    if workflow_type not in WORKFLOW_BUILDERS:
+        workflow_type = "linear"
+    app = get_workflow(workflow_type)
 
     # Create starting state
     initial_state = create_initial_state(query)
@@ -81,3 +188,13 @@ def run_research_workflow(query: str, workflow_type: str = "linear") -> dict:
     final_state = app.invoke(initial_state)
 
     return final_state
+
+
+async def arun_research_workflow(query: str, workflow_type: str = "linear") -> dict:
+    """Run a research workflow without blocking the event loop"""
+    if workflow_type not in WORKFLOW_BUILDERS:
+        workflow_type = "linear"
+    app = get_workflow(workflow_type)
+
+    initial_state = create_initial_state(query)
+    return await app.ainvoke(initial_state)
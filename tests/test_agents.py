@@ -56,3 +56,159 @@ def test_tool_names_are_correct():
     tool_names = [tool.name for tool in tools]
     expected_names = ["Research", "Analyze", "Summarize", "FactCheck"]
     assert set(tool_names) == set(expected_names)
+
+
+def test_all_tools_have_coroutines():
+    """Test that every tool can be awaited natively"""
+    tools = get_all_tools()
+    for tool in tools:
+        assert tool.coroutine is not None
+
+
+def test_arun_agent_with_fake_llm(monkeypatch):
+    """Test that the async agent returns the final answer"""
+    import asyncio
+    from langchain_core.language_models import FakeListChatModel
+    import src.agents as agents
+    fake = FakeListChatModel(responses=["Thought: easy\nFinal Answer: 42"])
+    monkeypatch.setattr(agents, "get_llm", lambda: fake)
+
+    assert asyncio.run(agents.arun_agent("What is the answer?")) == "42"
+
+
+def _parallel_fake_llm():
+    """Fake LLM: plans Research + FactCheck at once, tools take 0.3s each"""
+    import time
+    from langchain_core.runnables import RunnableLambda
+    from langchain_core.messages import AIMessage
+
+    def respond(prompt, **kwargs):
+        text = prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+        if text.startswith("Research and provide"):
+            time.sleep(0.3)
+            return AIMessage(content="solar is cheap")
+        if text.startswith("Evaluate the accuracy"):
+            time.sleep(0.3)
+            return AIMessage(content="claim holds")
+        if "Observation:" in text:
+            return AIMessage(content="Thought: done\nFinal Answer: all checked")
+        return AIMessage(content=(
+            "Thought: need both\nAction: Research\nAction Input: solar prices\n"
+            "Action: FactCheck\nAction Input: \"solar got cheaper\""))
+
+    return RunnableLambda(respond)
+
+
+def test_multi_action_parser():
+    """Test that several actions in one response become a list in order"""
+    from src.agents import MultiActionReActParser
+    parser = MultiActionReActParser()
+
+    actions = parser.parse(
+        "Thought: both\nAction: Research\nAction Input: solar\n"
+        "Action: FactCheck\nAction Input: \"panels are cheap\"")
+    single = parser.parse("Thought: one\nAction: Research\nAction Input: wind")
+
+    assert [(a.tool, a.tool_input) for a in actions] == [
+        ("Research", "solar"), ("FactCheck", "panels are cheap")]
+    assert actions[0].log.startswith("Thought: both")
+    assert single.tool == "Research"
+
+
+def test_agent_executor_hooks_unchanged():
+    """Test that the AgentExecutor internals ParallelAgentExecutor overrides still match"""
+    import inspect
+    from langchain.agents import AgentExecutor
+
+    def params(method):
+        return list(inspect.signature(method).parameters)
+
+    assert params(AgentExecutor._iter_next_step) == [
+        "self", "name_to_tool_map", "color_mapping", "inputs",
+        "intermediate_steps", "run_manager"], "AgentExecutor._iter_next_step changed"
+    assert params(AgentExecutor._perform_agent_action) == [
+        "self", "name_to_tool_map", "color_mapping", "agent_action",
+        "run_manager"], "AgentExecutor._perform_agent_action changed"
+    assert inspect.isgeneratorfunction(AgentExecutor._iter_next_step)
+
+
+def test_parallel_agent_runs_tools_concurrently(monkeypatch):
+    """Test that tools planned together overlap and merge in plan order"""
+    import time
+    import src.agents as agents
+    monkeypatch.setattr(agents, "get_llm", _parallel_fake_llm)
+    executor = agents.create_research_agent(parallel_tools=True)
+    executor.return_intermediate_steps = True
+
+    start = time.perf_counter()
+    result = executor.invoke({"input": "Are solar panels cheaper now?"})
+    elapsed = time.perf_counter() - start
+
+    steps = result["intermediate_steps"]
+    assert result["output"] == "all checked"
+    assert [action.tool for action, _ in steps] == ["Research", "FactCheck"]
+    assert steps[1][1] == "Fact Check: claim holds"
+    assert elapsed < 0.55  # Two 0.3s tools, run together
+
+
+def test_parallel_agent_async(monkeypatch):
+    """Test that the async path also runs planned tools together"""
+    import asyncio
+    import src.agents as agents
+    monkeypatch.setattr(agents, "get_llm", _parallel_fake_llm)
+
+    answer = asyncio.run(agents.arun_agent("Are solar panels cheaper now?", parallel_tools=True))
+
+    assert answer == "all checked"
+
+
+def test_research_agent_is_built_once(monkeypatch):
+    """Test that run_agent reuses one executor until the LLM changes"""
+    from langchain_core.language_models import FakeListChatModel
+    import src.agents as agents
+    fake = FakeListChatModel(responses=["Thought: easy\nFinal Answer: 42"])
+    monkeypatch.setattr(agents, "get_llm", lambda: fake)
+    agents.clear_agent_cache()
+
+    first = agents.get_research_agent()
+    assert agents.get_research_agent() is first
+    assert agents.get_research_agent(parallel_tools=True) is not first
+
+    other = FakeListChatModel(responses=["Final Answer: 7"])
+    monkeypatch.setattr(agents, "get_llm", lambda: other)
+    assert agents.get_research_agent() is not first
+    agents.clear_agent_cache()
+
+
+def test_run_agent_overrides_do_not_leak(monkeypatch):
+    """Test that per-call overrides leave the shared agent untouched"""
+    from concurrent.futures import ThreadPoolExecutor
+    from langchain_core.language_models import FakeListChatModel
+    import src.agents as agents
+    fake = FakeListChatModel(responses=["Thought: easy\nFinal Answer: 42"])
+    monkeypatch.setattr(agents, "get_llm", lambda: fake)
+    agents.clear_agent_cache()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        answers = list(pool.map(
+            lambda i: agents.run_agent(f"q{i}", max_iterations=2, verbose=False), range(8)))
+
+    shared = agents.get_research_agent()
+    assert answers == ["42"] * 8
+    assert shared.max_iterations == 5
+    assert shared.verbose is True
+    agents.clear_agent_cache()
+
+
+def test_agent_tools_reuse_cached_results():
+    """Test that a repeated tool call does not ask the LLM again"""
+    from langchain_core.language_models import FakeListChatModel
+    from src.cache import ToolResultCache
+    from src.agents import create_agent_tools
+    llm = FakeListChatModel(responses=["first", "second"])
+    cache = ToolResultCache()
+    research = create_agent_tools(llm, cache)[0]
+
+    assert research.invoke("solar panels") == "Research Results: first"
+    assert research.invoke("Solar panels ") == "Research Results: first"
+    assert cache.get_tool_stats()["Research"]["hits"] == 1
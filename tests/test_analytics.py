@@ -0,0 +1,95 @@
+import pytest
+
+from src.analytics import TraceAnalytics
+from src.feedback import FeedbackCollector
+from src.performance import PerformanceMonitor
+
+
+def _run(trace_id, execution_time, step_count=3):
+    return {
+        "execution_time": execution_time,
+        "step_count": step_count,
+        "error": None,
+        "trace_metadata": {"trace_id": trace_id, "steps": []}
+    }
+
+
+def _analytics():
+    monitor = PerformanceMonitor()
+    feedback = FeedbackCollector()
+    for i in range(100):
+        slow = i < 20
+        monitor.record_run(_run(f"t{i}", 10.0 + i if slow else 1.0, 5 if slow else 3))
+        feedback.submit_feedback(f"t{i}", 1 if slow else 5)
+    feedback.submit_feedback("never-recorded", 1)
+    return TraceAnalytics(monitor, feedback)
+
+
+def test_join_pairs_feedback_with_runs():
+    """Test that feedback rows get their run's metrics by trace_id"""
+    joined = _analytics().join()
+
+    assert len(joined["score"]) == 100  # Unmatched feedback is left out
+    first = list(joined["trace_id"]).index("t0")
+    assert joined["execution_time"][first] == 10.0
+    assert joined["step_count"][first] == 5
+
+
+def test_p95_latency_of_low_rated_runs():
+    """Test the "p95 latency of runs rated 1-2 stars" query"""
+    analytics = _analytics()
+
+    assert analytics.percentile(95, max_score=2) == pytest.approx(28.05)
+    assert analytics.percentile(95, min_score=4) == 1.0
+    assert analytics.percentile(95, min_score=3, max_score=3) is None
+
+
+def test_metric_by_score():
+    """Test steps vs. score summaries"""
+    by_score = _analytics().metric_by_score("step_count")
+
+    assert by_score[1] == {"count": 20, "mean": 5.0, "p50": 5.0, "p95": 5.0}
+    assert by_score[5]["count"] == 80
+    assert 3 not in by_score
+
+
+def test_monitor_indexes_runs_by_trace_id():
+    """Test that the trace index is bounded and keeps the newest runs"""
+    monitor = PerformanceMonitor(max_indexed_runs=2)
+    for i in range(3):
+        monitor.record_run(_run(f"t{i}", 1.0))
+
+    assert monitor.get_run("t0") is None
+    assert monitor.get_run("t2")["execution_time"] == 1.0
+    assert set(monitor.get_run_index()) == {"t1", "t2"}
+
+
+def test_trace_index_cap_holds_across_threads():
+    """Test that max_indexed_runs bounds the index however many threads record"""
+    from concurrent.futures import ThreadPoolExecutor
+    monitor = PerformanceMonitor(max_indexed_runs=5)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: monitor.record_run(_run(f"t{i}", 1.0)), range(200)))
+
+    assert len(monitor.get_run_index()) == 5
+    assert monitor.get_summary()["total_runs"] == 200
+
+
+def test_workflow_runs_join_with_feedback(monkeypatch):
+    """Test that a workflow's trace_id links its run to user feedback"""
+    from langchain_core.language_models import FakeListChatModel
+    import src.nodes as nodes
+    from src.workflows import run_research_workflow
+    fake = FakeListChatModel(responses=["research", "analysis", "summary"])
+    monkeypatch.setattr(nodes, "get_llm", lambda: fake)
+    monitor = PerformanceMonitor()
+    feedback = FeedbackCollector()
+
+    final_state = run_research_workflow("test query")
+    monitor.record_run(final_state)
+    feedback.submit_feedback(final_state["trace_metadata"]["trace_id"], 2)
+
+    joined = TraceAnalytics(monitor, feedback).join()
+    assert list(joined["step_count"]) == [3.0]
+    assert joined["execution_time"][0] > 0
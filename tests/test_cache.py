@@ -0,0 +1,321 @@
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from src.cache import LLMResponseCache, MemoryCacheTier, ToolResultCache, normalize_prompt
+from src.performance import PerformanceMonitor
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _generations(text):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+def test_repeated_prompt_served_from_cache():
+    """Test that a repeated prompt does not call the model again"""
+    cache = LLMResponseCache()
+    llm = FakeListChatModel(responses=["first", "second"], cache=cache)
+
+    assert llm.invoke("hello").content == "first"
+    assert llm.invoke("hello").content == "first"
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_model_config_is_part_of_key():
+    """Test that different model configs do not share entries"""
+    cache = LLMResponseCache()
+    cache.update("prompt", "model-a", _generations("a"))
+
+    assert cache.lookup("prompt", "model-a")[0].text == "a"
+    assert cache.lookup("prompt", "model-b") is None
+
+
+def test_normalized_keys():
+    """Test that normalized mode ignores whitespace and case differences"""
+    cache = LLMResponseCache(normalize=True)
+    cache.update("Hello   World", "model", _generations("hi"))
+
+    assert cache.lookup("hello world", "model") is not None
+    assert normalize_prompt("  A\n b ") == "a b"
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+    tier = MemoryCacheTier(max_entries=2, ttl=None)
+    tier.set("a", 1, 10)
+    tier.set("b", 2, 10)
+    tier.get("a")
+    tier.set("c", 3, 10)
+
+    assert tier.get("b") is None
+    assert tier.get("a") == 1
+    assert tier.evictions == 1
+    assert tier.bytes_stored == 20
+
+
+def test_ttl_expiry():
+    """Test that entries expire after their TTL"""
+    clock = FakeClock()
+    cache = LLMResponseCache(ttl=10, clock=clock)
+    cache.update("prompt", "model", _generations("old"))
+
+    clock.now = 11
+
+    assert cache.lookup("prompt", "model") is None
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_sqlite_tier_persists(tmp_path):
+    """Test that a new cache instance reads entries from SQLite"""
+    path = str(tmp_path / "llm_cache.db")
+    LLMResponseCache(sqlite_path=path).update("prompt", "model", _generations("saved"))
+
+    cache = LLMResponseCache(sqlite_path=path)
+    result = cache.lookup("prompt", "model")
+
+    assert result[0].message.content == "saved"
+    assert cache.get_stats()["disk_bytes"] > 0
+
+
+def test_monitor_reports_cache_stats():
+    """Test that cache stats are exposed through PerformanceMonitor"""
+    monitor = PerformanceMonitor()
+    cache = LLMResponseCache()
+    monitor.track_cache("llm", cache)
+
+    cache.lookup("prompt", "model")
+
+    stats = monitor.get_cache_stats()["llm"]
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.0
+
+
+def test_set_response_cache_bypasses_sampling_models():
+    """Test that temperature > 0 models skip the cache when asked"""
+    from src.client import get_shared_llm, set_response_cache, clear_shared_clients
+    clear_shared_clients()
+    cache = LLMResponseCache()
+
+    set_response_cache(cache, bypass_when_sampling=True)
+    try:
+        greedy = get_shared_llm(model_kwargs={"temperature": 0.0})
+        sampling = get_shared_llm(model_kwargs={"temperature": 0.7})
+        assert greedy.cache is cache
+        assert sampling.cache is False
+    finally:
+        set_response_cache(None)
+        clear_shared_clients()
+
+
+def test_sampling_bypass_ignores_global_cache():
+    """Test that bypassed models do not fall back to LangChain's global cache"""
+    from langchain_core.globals import get_llm_cache, set_llm_cache
+    from src.client import get_shared_llm, set_response_cache, clear_shared_clients
+    clear_shared_clients()
+    global_cache = LLMResponseCache()
+    previous = get_llm_cache()
+    set_llm_cache(global_cache)
+
+    set_response_cache(LLMResponseCache(), bypass_when_sampling=True)
+    try:
+        sampling = get_shared_llm(model_kwargs={"temperature": 0.7})
+        assert sampling.cache is False
+        llm = FakeListChatModel(responses=["a", "b"], cache=sampling.cache)
+        llm.invoke("hello")
+        llm.invoke("hello")
+        assert global_cache.get_stats()["hits"] + global_cache.get_stats()["misses"] == 0
+    finally:
+        set_llm_cache(previous)
+        set_response_cache(None)
+        clear_shared_clients()
+
+
+def test_hashing_embed_is_deterministic_unit_vector():
+    """Test that embeddings are stable and normalized"""
+    import numpy as np
+    from src.cache import hashing_embed
+    v1 = hashing_embed("solar panel prices")
+    v2 = hashing_embed("solar panel prices")
+
+    assert np.array_equal(v1, v2)
+    assert abs(float(np.linalg.norm(v1)) - 1.0) < 1e-5
+
+
+def test_semantic_cache_hits_rewording():
+    """Test that a reordered or padded query reuses the cached value"""
+    from src.cache import SemanticCache
+    cache = SemanticCache(threshold=0.85)
+    cache.update("cost of solar panels", "solar research")
+
+    assert cache.lookup("What is the cost of solar panels?") == "solar research"
+    assert cache.lookup("solar panels cost") == "solar research"
+    assert cache.lookup("wind turbine maintenance") is None
+    assert cache.get_stats()["hits"] == 2
+
+
+def test_semantic_cache_misses_synonym_paraphrase():
+    """Test the hashing embedding's limit: synonyms are not matched"""
+    from src.cache import SemanticCache
+    cache = SemanticCache(threshold=0.85)
+    cache.update("cost of solar panels", "solar research")
+
+    # Shares "solar panel" but not cost/prices, scoring about 0.6
+    assert cache.lookup("solar panel prices") is None
+
+
+def test_semantic_cache_misses_different_queries():
+    """Test that look-alike queries with a different meaning do not hit"""
+    from src.cache import SemanticCache
+    cache = SemanticCache(threshold=0.85)
+    cache.update("how to install python on windows", "install guide")
+    cache.update("solar panel installation cost 2023", "2023 prices")
+
+    assert cache.lookup("how to uninstall python on windows") is None
+    assert cache.lookup("solar panel installation cost 2024") is None
+    assert cache.lookup("solar panels not worth installation cost 2023") is None
+    assert cache.lookup("solar panel installation costs 2023") == "2023 prices"
+
+
+def test_semantic_cache_custom_embedding_matches_synonyms():
+    """Test that a synonym-aware embed_fn makes the paraphrase hit"""
+    from src.cache import SemanticCache, hashing_embed
+
+    def embed(text):
+        return hashing_embed(text.replace("prices", "cost"))
+
+    cache = SemanticCache(threshold=0.85, embed_fn=embed)
+    cache.update("cost of solar panels", "solar research")
+
+    assert cache.lookup("solar panel prices") == "solar research"
+
+
+def test_semantic_cache_replaces_oldest_when_full():
+    """Test that the oldest entry is replaced once the index is full"""
+    from src.cache import SemanticCache
+    cache = SemanticCache(max_entries=2)
+    cache.update("solar energy", "a")
+    cache.update("wind energy", "b")
+    cache.update("hydro power", "c")
+
+    assert cache.lookup("solar energy") is None
+    assert cache.lookup("hydro power") == "c"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_research_node_uses_semantic_cache(monkeypatch):
+    """Test that research for a similar query skips the LLM"""
+    import src.nodes as nodes
+    from src.cache import SemanticCache
+    from src.state import create_initial_state
+    llm = FakeListChatModel(responses=["fresh research", "second call"])
+    monkeypatch.setattr(nodes, "get_llm", lambda: llm)
+    monkeypatch.setattr(nodes, "research_cache", SemanticCache())
+
+    first = nodes.research_node(create_initial_state("cost of solar panels"))
+    second = nodes.research_node(create_initial_state("solar panels cost"))
+
+    assert first["research_results"] == "fresh research"
+    assert second["research_results"] == "fresh research"
+    assert llm.i == 1  # Only the first query reached the model
+
+
+def test_tool_cache_ttl_per_tool():
+    """Test that each tool keeps results for its own TTL"""
+    clock = FakeClock()
+    cache = ToolResultCache(ttls={"Research": 100, "FactCheck": 10}, clock=clock)
+    calls = []
+
+    def tool(text):
+        calls.append(text)
+        return f"result {len(calls)}"
+
+    cache.call("Research", "solar panels", tool)
+    cache.call("FactCheck", "solar panels", tool)
+    clock.now = 11
+    cache.call("Research", "Solar  Panels", tool)
+    cache.call("FactCheck", "solar panels", tool)
+
+    assert len(calls) == 3
+    stats = cache.get_tool_stats()
+    assert stats["Research"]["hits"] == 1
+    assert stats["FactCheck"]["misses"] == 2
+
+
+def test_tool_cache_never_caches_current_time():
+    """Test that a zero TTL calls the tool every time"""
+    cache = ToolResultCache()
+    calls = []
+    cache.call("CurrentTime", "short", calls.append)
+    cache.call("CurrentTime", "short", calls.append)
+
+    assert len(calls) == 2
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_tool_cache_does_not_cache_failures():
+    """Test that a failed call is retried on the next lookup"""
+    cache = ToolResultCache()
+
+    def failing(text):
+        raise RuntimeError("throttled")
+
+    try:
+        cache.call("Research", "topic", failing)
+    except RuntimeError:
+        pass
+
+    assert cache.call("Research", "topic", lambda text: "ok") == "ok"
+
+
+def test_tool_cache_single_flight():
+    """Test that concurrent identical calls run the tool once"""
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    cache = ToolResultCache()
+    calls = []
+    lock = threading.Lock()
+
+    def slow_tool(text):
+        with lock:
+            calls.append(text)
+        time.sleep(0.2)
+        return "done"
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(lambda i: cache.call("Research", "topic", slow_tool), range(5)))
+
+    assert results == ["done"] * 5
+    assert len(calls) == 1
+    stats = cache.get_tool_stats()["Research"]
+    assert stats["coalesced"] + stats["hits"] == 4
+    assert stats["hit_rate"] == 0.8
+
+
+def test_tool_cache_async_single_flight():
+    """Test that concurrent identical async calls run the tool once"""
+    import asyncio
+    cache = ToolResultCache()
+    calls = []
+
+    async def slow_tool(text):
+        calls.append(text)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        return await asyncio.gather(
+            *(cache.acall("FactCheck", "claim", slow_tool) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["done"] * 5
+    assert len(calls) == 1
+    assert cache.get_tool_stats()["FactCheck"]["coalesced"] == 4
@@ -37,3 +37,163 @@ def test_research_chain_requires_llm():
     import inspect
     sig = inspect.signature(build_research_chain)
     assert 'llm' in sig.parameters
+
+
+def _use_fake_llm(monkeypatch, responses):
+    """Route chain builders to a fake LLM and start with an empty cache."""
+    from langchain_core.language_models import FakeListChatModel
+    import src.chains as chains
+
+    fake = FakeListChatModel(responses=responses)
+    monkeypatch.setattr(chains, "get_shared_llm", lambda *args, **kwargs: fake)
+    chains.invalidate_chain_cache()
+    return fake
+
+
+def test_get_chain_is_cached(monkeypatch):
+    """Test that the same prompt and model config reuse one chain."""
+    from src.chains import get_chain
+    _use_fake_llm(monkeypatch, ["ok"])
+    assert get_chain("assistant") is get_chain("assistant")
+    assert get_chain("assistant") is not get_chain("summarizer")
+
+
+def test_chain_cache_counts_hits_and_misses(monkeypatch):
+    """Test that cache lookups update hit and miss counters."""
+    from src.chains import chat, get_chain_cache_stats
+    _use_fake_llm(monkeypatch, ["Hola", "Bonjour"])
+    before = get_chain_cache_stats()
+
+    assert chat("Spanish", "Hello") == "Hola"
+    assert chat("French", "Hello") == "Bonjour"
+
+    after = get_chain_cache_stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+
+def test_invalidate_chain_cache_by_prompt(monkeypatch):
+    """Test that invalidation only drops chains for the given prompt."""
+    from src.chains import get_chain, invalidate_chain_cache
+    _use_fake_llm(monkeypatch, ["ok"])
+    assistant = get_chain("assistant")
+    summarizer = get_chain("summarizer")
+
+    invalidate_chain_cache("assistant")
+
+    assert get_chain("assistant") is not assistant
+    assert get_chain("summarizer") is summarizer
+
+
+def test_chain_cache_follows_shared_llm(monkeypatch):
+    """Test that a replaced shared LLM rebuilds its cached chains."""
+    from langchain_core.language_models import FakeListChatModel
+    import src.chains as chains
+    _use_fake_llm(monkeypatch, ["old"])
+    old = chains.get_chain("assistant")
+
+    replacement = FakeListChatModel(responses=["new"])
+    monkeypatch.setattr(chains, "get_shared_llm", lambda *args, **kwargs: replacement)
+
+    assert chains.get_chain("assistant") is not old
+    assert chains.chat("Spanish", "Hello") == "new"
+
+
+def test_chain_cache_key_uses_default_kwargs(monkeypatch):
+    """Test that spelling out a default model kwarg reuses the same chain."""
+    from src.chains import get_chain
+    _use_fake_llm(monkeypatch, ["ok"])
+
+    assert get_chain("assistant", model_kwargs={"temperature": 0.7}) is get_chain("assistant")
+
+
+def test_achat_with_fake_llm(monkeypatch):
+    """Test that achat awaits the chain and returns text."""
+    import asyncio
+    from src.chains import achat
+    _use_fake_llm(monkeypatch, ["Hola"])
+    assert asyncio.run(achat("Spanish", "Hello")) == "Hola"
+
+
+def test_asummarize_with_fake_llm(monkeypatch):
+    """Test that asummarize awaits the chain and returns text."""
+    import asyncio
+    from src.chains import asummarize
+    _use_fake_llm(monkeypatch, ["Short summary"])
+    assert asyncio.run(asummarize("Some long text")) == "Short summary"
+
+
+def _use_echo_llm(monkeypatch):
+    """Route chains to an LLM that echoes the prompt and fails on 'bad'."""
+    from langchain_core.runnables import RunnableLambda
+    import src.chains as chains
+
+    def echo(prompt_value):
+        text = prompt_value.to_string()
+        if "bad" in text:
+            raise RuntimeError("bad input")
+        return text.split("Text: ")[-1].split("\n")[0]
+
+    llm = RunnableLambda(echo)
+    monkeypatch.setattr(chains, "get_shared_llm", lambda *args, **kwargs: llm)
+    chains.invalidate_chain_cache()
+
+
+def test_summarize_many_keeps_order_and_isolates_failures(monkeypatch):
+    """Test that batch results follow input order and errors stay per item."""
+    from src.chains import summarize_many
+    _use_echo_llm(monkeypatch)
+
+    results = summarize_many(["one", "bad", "three"], max_concurrency=2)
+
+    assert results[0] == "one"
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == "three"
+
+
+def test_asummarize_many_keeps_order(monkeypatch):
+    """Test that the async batch returns results in input order."""
+    import asyncio
+    from src.chains import asummarize_many
+    _use_echo_llm(monkeypatch)
+
+    texts = [f"text {i}" for i in range(10)]
+    results = asyncio.run(asummarize_many(texts, max_concurrency=3))
+
+    assert results == texts
+
+
+def test_chat_many_with_fake_llm(monkeypatch):
+    """Test that chat_many returns one response per message."""
+    from src.chains import chat_many
+    _use_fake_llm(monkeypatch, ["a", "b", "c"])
+
+    results = chat_many("English", ["1", "2", "3"], max_concurrency=1)
+
+    assert results == ["a", "b", "c"]
+
+
+def test_stream_chat_yields_deltas(monkeypatch):
+    """Test that streaming yields pieces that join to the full response."""
+    from src.chains import stream_chat
+    from src.tracing import stream_timings
+    _use_fake_llm(monkeypatch, ["Hola amigo"])
+
+    deltas = list(stream_chat("Spanish", "Hello friend"))
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == "Hola amigo"
+    assert stream_timings[-1]["name"] == "chat"
+    assert stream_timings[-1]["time_to_first_token"] is not None
+
+
+def test_astream_summarize_yields_deltas(monkeypatch):
+    """Test that async streaming yields the full summary."""
+    import asyncio
+    from src.chains import astream_summarize
+    _use_fake_llm(monkeypatch, ["Short summary"])
+
+    async def collect():
+        return [delta async for delta in astream_summarize("Long text")]
+
+    assert "".join(asyncio.run(collect())) == "Short summary"
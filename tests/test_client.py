@@ -0,0 +1,55 @@
+"""Tests for shared client and LLM registry."""
+
+
+from src.client import (
+    create_client, get_shared_client, get_shared_llm,
+    clear_shared_clients
+)
+
+
+def test_create_client_applies_pool_settings():
+    """Test that pool size and keep-alive reach the botocore config."""
+    client = create_client(max_pool_connections=7, tcp_keepalive=True)
+    assert client.meta.config.max_pool_connections == 7
+    assert client.meta.config.tcp_keepalive is True
+
+
+def test_shared_client_is_reused():
+    """Test that the same settings return the same client."""
+    clear_shared_clients()
+    client1 = get_shared_client()
+    client2 = get_shared_client()
+    assert client1 is client2
+
+
+def test_shared_client_keyed_by_settings():
+    """Test that different settings get different clients."""
+    clear_shared_clients()
+    client1 = get_shared_client(max_pool_connections=10)
+    client2 = get_shared_client(max_pool_connections=20)
+    assert client1 is not client2
+
+
+def test_shared_llm_is_reused():
+    """Test that the same model config returns the same LLM."""
+    clear_shared_clients()
+    llm1 = get_shared_llm()
+    llm2 = get_shared_llm()
+    assert llm1 is llm2
+
+
+def test_shared_llm_keyed_by_model_kwargs():
+    """Test that model kwargs are part of the registry key."""
+    clear_shared_clients()
+    llm1 = get_shared_llm(model_kwargs={"temperature": 0.0})
+    llm2 = get_shared_llm(model_kwargs={"temperature": 0.7})
+    assert llm1 is not llm2
+    assert llm1.temperature == 0.0
+
+
+def test_clear_shared_clients():
+    """Test that clearing the registry forces a rebuild."""
+    client1 = get_shared_client()
+    clear_shared_clients()
+    client2 = get_shared_client()
+    assert client1 is not client2
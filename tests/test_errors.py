@@ -60,4 +60,115 @@ def test_get_solutions():
     solutions = tracker.get_solutions()
     
     assert "rate_limit" in solutions
-    assert len(solutions["rate_limit"]) > 0
\ No newline at end of file
+    assert len(solutions["rate_limit"]) > 0
+
+
+def test_log_error_is_exact_under_threads():
+    """Test that concurrent log_error calls count every error"""
+    from concurrent.futures import ThreadPoolExecutor
+    tracker = ErrorTracker()
+    messages = ["Request timed out", "Rate limit exceeded", "Something odd"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: tracker.log_error(messages[i % 3]), range(3000)))
+
+    assert tracker.error_counts == {"timeout": 1000, "rate_limit": 1000, "unknown": 1000}
+    assert len(tracker.errors) == 3000
+    assert tracker.get_summary()["total_errors"] == 3000
+
+
+def test_max_errors_bounds_all_threads():
+    """Test that max_errors caps stored errors however many threads log"""
+    import threading
+    tracker = ErrorTracker(max_errors=10)
+
+    threads = [threading.Thread(target=tracker.log_error, args=("Request timed out",))
+               for _ in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(tracker.errors) == 10
+    assert tracker.get_summary()["total_errors"] == 40
+
+
+def test_compiled_classifier_keeps_category_order():
+    """Test that the earliest matching category wins, like the ordered scan"""
+    from src.errors import compile_error_classifier
+    classify = compile_error_classifier(ErrorTracker.ERROR_TYPES)
+
+    assert classify("invalid json from connection pool, request timed out") == "timeout"
+    assert classify("network unreachable while parsing") == "network"
+    assert classify("all good") == "unknown"
+
+
+def test_classifier_handles_overlapping_keywords():
+    """Test that prefix-related and overlapping keywords keep category order"""
+    from src.errors import compile_error_classifier
+    classify = compile_error_classifier(ErrorTracker.ERROR_TYPES)
+    assert classify("formatimeout") == "timeout"
+
+    tracker = ErrorTracker()
+    tracker.register_error_type("bedrock_throttling", ["throttl"], first=True)
+    assert tracker.classify_error("Please throttle requests") == "bedrock_throttling"
+
+    classify = compile_error_classifier({"short": ["time"], "long": ["timeout"]})
+    assert classify("timeout") == "short"
+    classify = compile_error_classifier({"long": ["timeout"], "short": ["time"]})
+    assert classify("time is up") == "short"
+    assert classify("timeout") == "long"
+
+
+def test_register_error_type():
+    """Test that user categories classify and bring their own solutions"""
+    tracker = ErrorTracker()
+    tracker.register_error_type("guardrail", ["content blocked", "guardrail"],
+                                solutions=["Rephrase the request"])
+    tracker.register_error_type("quota", ["quota"], first=True)
+
+    tracker.log_error("Guardrail intervened: content blocked")
+
+    assert tracker.classify_error("Service quota exceeded, timed out") == "quota"
+    assert tracker.error_counts == {"guardrail": 1}
+    assert tracker.get_solutions() == {"guardrail": ["Rephrase the request"]}
+    assert ErrorTracker().classify_error("quota timed out") == "timeout"
+
+
+def test_error_log_is_bounded_but_counts_are_not():
+    """Test that old errors are dropped while the summary counts them all"""
+    tracker = ErrorTracker(max_errors=5)
+    for i in range(20):
+        tracker.log_error(f"Rate limit exceeded #{i}", {"payload": "x" * 10000})
+
+    assert [e["message"] for e in tracker.errors] == [
+        f"Rate limit exceeded #{i}" for i in range(15, 20)
+    ]
+    assert len(tracker.errors[0]["context"]["payload"]) == 200
+    assert tracker.get_summary()["total_errors"] == 20
+
+
+def test_evicted_errors_spill_to_rotating_jsonl(tmp_path):
+    """Test that errors falling out of memory are appended and rotated"""
+    from src.errors import JSONLErrorSpill
+    path = str(tmp_path / "errors.jsonl")
+    tracker = ErrorTracker(max_errors=2, spill=JSONLErrorSpill(path, max_bytes=300, backups=1))
+    for i in range(10):
+        tracker.log_error(f"timeout {i}")
+
+    with open(path) as f:
+        newest = [line for line in f]
+    assert '"timeout 7"' in newest[-1]
+    assert (tmp_path / "errors.jsonl.1").exists()
+    assert not (tmp_path / "errors.jsonl.2").exists()
+
+
+def test_evicted_errors_spill_to_sqlite(tmp_path):
+    """Test that the SQLite spill keeps only the newest max_rows"""
+    from src.errors import SQLiteErrorSpill
+    spill = SQLiteErrorSpill(str(tmp_path / "errors.db"), max_rows=3)
+    tracker = ErrorTracker(max_errors=1, spill=spill)
+    for i in range(10):
+        tracker.log_error(f"network down {i}")
+
+    assert spill.count() == 3
@@ -0,0 +1,79 @@
+import urllib.request
+
+from src.errors import ErrorTracker
+from src.exporter import render_metrics, start_metrics_server
+from src.feedback import FeedbackCollector
+from src.performance import PerformanceMonitor
+
+
+def _monitor():
+    monitor = PerformanceMonitor()
+    for duration in (0.2, 0.7, 3.0):
+        monitor.record_run({
+            "execution_time": duration,
+            "token_estimate": 100,
+            "error": None,
+            "trace_metadata": {"steps": [
+                {"step_name": "research", "duration": duration,
+                 "tokens": 100, "status": "success"}
+            ]}
+        })
+    return monitor
+
+
+def test_render_metrics_openmetrics_format():
+    """Test counters, histogram buckets and the EOF marker"""
+    text = render_metrics(monitor=_monitor())
+    lines = text.splitlines()
+
+    assert lines[-1] == "# EOF"
+    assert "# TYPE assistant_runs counter" in lines
+    assert "assistant_runs_total 3" in lines
+    assert 'assistant_step_duration_seconds_bucket{step="research",le="0.5"} 1' in lines
+    assert 'assistant_step_duration_seconds_bucket{step="research",le="+Inf"} 3' in lines
+    assert 'assistant_step_runs_total{step="research",status="success"} 3' in lines
+    assert 'assistant_window_throughput{window="1m"} 0.05' in lines
+
+
+def test_histogram_counts_values_on_bucket_bounds():
+    """Test that durations equal to a bucket bound fall in that le bucket"""
+    monitor = PerformanceMonitor()
+    for duration in (0.05, 0.5, 5.0):
+        monitor.record_run({"execution_time": duration, "token_estimate": 0,
+                            "error": None, "trace_metadata": {"steps": []}})
+
+    lines = render_metrics(monitor=monitor).splitlines()
+
+    assert 'assistant_run_duration_seconds_bucket{le="0.05"} 1' in lines
+    assert 'assistant_run_duration_seconds_bucket{le="0.5"} 2' in lines
+    assert 'assistant_run_duration_seconds_bucket{le="5.0"} 3' in lines
+
+
+def test_render_error_and_feedback_metrics():
+    """Test that error counts and feedback scores are exported"""
+    errors = ErrorTracker()
+    errors.log_error("Request timed out")
+    feedback = FeedbackCollector()
+    feedback.submit_feedback("t1", 5)
+    feedback.submit_feedback("t2", 3, comment='says "meh"')
+
+    lines = render_metrics(error_tracker=errors, feedback=feedback).splitlines()
+
+    assert 'assistant_errors_total{type="timeout"} 1' in lines
+    assert 'assistant_feedback_total{score="5"} 1' in lines
+    assert "assistant_feedback_score 4.0" in lines
+
+
+def test_metrics_server_serves_endpoint():
+    """Test that the background server answers /metrics"""
+    server = start_metrics_server(port=0, monitor=_monitor())
+    try:
+        url = f"http://127.0.0.1:{server.port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode("utf-8")
+            content_type = response.headers["Content-Type"]
+    finally:
+        server.stop()
+
+    assert content_type.startswith("application/openmetrics-text")
+    assert "assistant_runs_total 3" in body
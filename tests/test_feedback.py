@@ -69,4 +69,82 @@ def test_get_insights():
     insights = collector.get_insights()
     
     assert len(insights) > 0
-    assert any("High satisfaction" in i for i in insights)
\ No newline at end of file
+    assert any("High satisfaction" in i for i in insights)
+
+
+def test_submit_feedback_rejects_fractional_score():
+    """Test that half stars are rejected and whole floats are stored as ints"""
+    collector = FeedbackCollector()
+
+    with pytest.raises(ValueError):
+        collector.submit_feedback("trace-123", 4.5)
+    entry = collector.submit_feedback("trace-123", 4.0)
+
+    assert entry["score"] == 4
+    assert collector.get_summary()["total_feedback"] == 1
+    assert len(collector.feedback_entries) == 1
+
+
+def test_submit_feedback_is_exact_under_threads():
+    """Test that concurrent submissions are all kept"""
+    from concurrent.futures import ThreadPoolExecutor
+    collector = FeedbackCollector()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: collector.submit_feedback(f"t{i}", i % 5 + 1), range(2500)))
+
+    summary = collector.get_summary()
+    assert summary["total_feedback"] == 2500
+    assert summary["score_distribution"] == {i: 500 for i in range(1, 6)}
+
+
+def test_summary_uses_running_histogram():
+    """Test that summary counts come from the columns, not a rescan"""
+    collector = FeedbackCollector()
+    for score in [1, 2, 2, 4, 5, 5]:
+        collector.submit_feedback(f"trace-{score}", score)
+
+    summary = collector.get_summary()
+    columns = collector.get_columns()
+
+    assert summary["score_distribution"] == {1: 1, 2: 2, 3: 0, 4: 1, 5: 2}
+    assert summary["negative_rate"] == 0.5
+    assert columns["score"].dtype.name == "uint8"
+    assert columns["timestamp"].dtype.name == "float64"
+    assert list(columns["trace_id"][:2]) == ["trace-1", "trace-2"]
+
+
+def test_npz_round_trip(tmp_path):
+    """Test bulk export and import through a .npz file"""
+    path = str(tmp_path / "feedback.npz")
+    source = FeedbackCollector()
+    source.submit_feedback("t1", 5, "Great", tags=["fast"])
+    for i in range(1000):
+        source.submit_feedback(f"t{i % 10}", i % 5 + 1)
+    source.export_npz(path)
+
+    target = FeedbackCollector()
+    assert target.import_npz(path) == 1001
+
+    assert target.get_summary() == source.get_summary()
+    noted = [e for e in target.feedback_entries if e["comment"]]
+    assert noted == [{**noted[0], "trace_id": "t1", "score": 5,
+                      "comment": "Great", "tags": ["fast"]}]
+    assert any("include comments" in i for i in target.get_insights())
+
+
+def test_import_npz_rejects_invalid_scores(tmp_path):
+    """Test that out-of-range and fractional scores are rejected before casting"""
+    import numpy as np
+    for bad in ([4, 261], [4.0, 3.7], [0, 5]):
+        path = str(tmp_path / "bad.npz")
+        count = len(bad)
+        np.savez_compressed(
+            path, trace_id=np.array(["t"] * count), score=np.array(bad),
+            timestamp=np.zeros(count), comment=np.array([""] * count),
+            tags=np.array(["[]"] * count))
+
+        collector = FeedbackCollector()
+        with pytest.raises(ValueError):
+            collector.import_npz(path)
+        assert collector.get_summary()["total_feedback"] == 0
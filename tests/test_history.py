@@ -0,0 +1,86 @@
+"""Tests for disk-backed chat histories."""
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.history import (
+    SQLiteMessageStore, SQLiteChatMessageHistory, JSONLChatMessageHistory
+)
+
+
+def _turns(history, count):
+    """Add count human/AI turns to a history."""
+    for i in range(count):
+        history.add_messages([HumanMessage(content=f"q{i}"), AIMessage(content=f"a{i}")])
+
+
+def test_sqlite_history_survives_restart(tmp_path):
+    """Test that a new store on the same file sees earlier messages."""
+    path = str(tmp_path / "chat.db")
+    store = SQLiteMessageStore(path)
+    _turns(SQLiteChatMessageHistory("alice", store), 2)
+
+    restarted = SQLiteChatMessageHistory("alice", SQLiteMessageStore(path))
+
+    assert [m.content for m in restarted.messages] == ["q0", "a0", "q1", "a1"]
+    assert isinstance(restarted.messages[1], AIMessage)
+
+
+def test_sqlite_history_loads_only_window(tmp_path):
+    """Test that only the last window messages are loaded."""
+    store = SQLiteMessageStore(str(tmp_path / "chat.db"))
+    history = SQLiteChatMessageHistory("bob", store, window=3)
+    _turns(history, 5)
+
+    assert [m.content for m in history.messages] == ["a3", "q4", "a4"]
+    assert store.count("bob") == 10
+
+
+def test_sqlite_history_writes_each_turn(tmp_path):
+    """Test that another connection sees a turn as soon as it is added."""
+    path = str(tmp_path / "chat.db")
+    history = SQLiteChatMessageHistory("carol", SQLiteMessageStore(path))
+    other_process = SQLiteMessageStore(path)
+
+    _turns(history, 1)
+    assert other_process.count("carol") == 2
+
+    _turns(history, 1)
+    assert other_process.count("carol") == 4
+
+
+def test_sqlite_history_clear(tmp_path):
+    """Test that clearing removes one session only."""
+    store = SQLiteMessageStore(str(tmp_path / "chat.db"))
+    _turns(SQLiteChatMessageHistory("dave", store), 1)
+    _turns(SQLiteChatMessageHistory("erin", store), 1)
+
+    SQLiteChatMessageHistory("dave", store).clear()
+
+    assert store.count("dave") == 0
+    assert store.count("erin") == 2
+
+
+def test_jsonl_history_survives_restart_with_window(tmp_path):
+    """Test that JSONL histories persist and load only the last messages."""
+    directory = str(tmp_path / "sessions")
+    _turns(JSONLChatMessageHistory("user/1", directory), 3)
+
+    restarted = JSONLChatMessageHistory("user/1", directory, window=2)
+
+    assert [m.content for m in restarted.messages] == ["q2", "a2"]
+
+
+def test_use_persistent_history(tmp_path, monkeypatch):
+    """Test that the memory chatbot store can switch to SQLite."""
+    import src.memory as memory
+    monkeypatch.setattr(memory, "memory_store", memory.SessionStore())
+    monkeypatch.setattr(memory, "persistent_history", None)
+
+    memory.use_persistent_history(str(tmp_path / "chat.db"))
+    memory.get_session_history("frank").add_user_message("hello")
+    memory.memory_store.clear()  # Simulate a worker restart
+
+    assert memory.get_session_history("frank").messages[0].content == "hello"
+
+    memory.clear_session("frank")
+    assert memory.get_session_history("frank").messages == []
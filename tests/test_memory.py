@@ -48,6 +48,231 @@ def test_chat_with_memory_exists():
     assert callable(chat_with_memory)
 
 
-def test_memory_store_is_dict():
-    """Test that memory store is a dictionary."""
-    assert isinstance(memory_store, dict)
+def test_memory_store_is_session_store():
+    """Test that memory store is a bounded session store."""
+    from src.memory import SessionStore
+    assert isinstance(memory_store, SessionStore)
+
+
+def test_achat_with_memory_keeps_history(monkeypatch):
+    """Test that async chat appends both turns to session history."""
+    import asyncio
+    from langchain_core.language_models import FakeListChatModel
+    import src.memory as memory
+    fake = FakeListChatModel(responses=["Nice to meet you"])
+    monkeypatch.setattr(memory, "get_shared_llm", lambda: fake)
+    clear_session("async_test")
+
+    reply = asyncio.run(memory.achat_with_memory("I am Ana", "async_test"))
+
+    assert reply == "Nice to meet you"
+    assert len(get_session_history("async_test").messages) == 2
+    clear_session("async_test")
+
+
+def test_stream_chat_with_memory_saves_reply(monkeypatch):
+    """Test that the assembled streamed reply is added to history."""
+    from langchain_core.language_models import FakeListChatModel
+    import src.memory as memory
+    fake = FakeListChatModel(responses=["Hello Ana"])
+    monkeypatch.setattr(memory, "get_shared_llm", lambda: fake)
+    clear_session("stream_test")
+
+    deltas = list(memory.stream_chat_with_memory("I am Ana", "stream_test"))
+
+    messages = get_session_history("stream_test").messages
+    assert "".join(deltas) == "Hello Ana"
+    assert len(messages) == 2
+    assert messages[1].content == "Hello Ana"
+    clear_session("stream_test")
+
+
+class FakeClock:
+    """Manually advanced clock for expiry tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_session_store_evicts_least_recently_used():
+    """Test that the oldest session is evicted past max_sessions."""
+    from src.memory import SessionStore
+    store = SessionStore(max_sessions=2)
+    store.get("a")
+    store.get("b")
+    store.get("a")
+    store.get("c")
+
+    assert "b" not in store
+    assert "a" in store and "c" in store
+    assert store.evictions == 1
+
+
+def test_session_store_expires_idle_sessions():
+    """Test that idle sessions expire after idle_ttl."""
+    from src.memory import SessionStore
+    clock = FakeClock()
+    store = SessionStore(idle_ttl=60, clock=clock)
+    store.get("old")
+
+    clock.now = 61
+    store.get("new")
+
+    assert "old" not in store
+    assert store.expirations == 1
+
+
+def test_session_store_caps_messages():
+    """Test that each history keeps only max_messages messages."""
+    from src.memory import SessionStore
+    store = SessionStore(max_messages=3)
+    history = store.get("capped")
+    for i in range(5):
+        history.add_user_message(f"message {i}")
+
+    assert [m.content for m in history.messages] == [
+        "message 2", "message 3", "message 4"]
+
+
+def test_session_store_gauges():
+    """Test that gauges report resident sessions and bytes."""
+    from src.memory import SessionStore
+    store = SessionStore()
+    store.get("g").add_user_message("hello")
+
+    gauges = store.get_gauges()
+
+    assert gauges["resident_sessions"] == 1
+    assert gauges["approx_bytes"] > 0
+
+
+def _long_turns(count, words=50):
+    """Build count human/AI message pairs of roughly equal size."""
+    from langchain_core.messages import AIMessage, HumanMessage
+    messages = []
+    for i in range(count):
+        messages.append(HumanMessage(content=f"question {i} " + "word " * words))
+        messages.append(AIMessage(content=f"answer {i} " + "word " * words))
+    return messages
+
+
+def test_history_window_keeps_short_history():
+    """Test that history under budget is sent unchanged."""
+    from langchain_core.language_models import FakeListChatModel
+    from src.memory import HistoryWindow
+    llm = FakeListChatModel(responses=["summary"])
+    window = HistoryWindow(max_tokens=10000, llm=llm)
+    messages = _long_turns(2)
+
+    assert window.apply(messages, "short") == messages
+    assert window.stats[-1]["saved_tokens"] == 0
+
+
+def test_history_window_summarizes_and_reuses_summary():
+    """Test that old turns fold into a cached summary within budget."""
+    from langchain_core.language_models import FakeListChatModel
+    from src.memory import HistoryWindow
+    from src.tracing import estimate_tokens
+    llm = FakeListChatModel(responses=["first summary", "second summary"])
+    window = HistoryWindow(max_tokens=400, summary_tokens=50, llm=llm)
+    messages = _long_turns(10)
+
+    windowed = window.apply(messages, "long")
+
+    assert windowed[0].type == "system"
+    assert "first summary" in windowed[0].content
+    assert sum(estimate_tokens(m.content) for m in windowed) <= 400
+    assert window.stats[-1]["saved_tokens"] > 0
+
+    # One more short turn fits in the window: the summary is reused
+    from langchain_core.messages import HumanMessage
+    window.apply(messages + [HumanMessage(content="ok")], "long")
+    assert llm.i == 1
+    assert window.get_stats()["saved_tokens"] > 0
+
+
+def test_history_window_boundary_with_repeated_messages():
+    """Test that repeated turns do not move the summary boundary back."""
+    from langchain_core.language_models import FakeListChatModel
+    from langchain_core.messages import HumanMessage, AIMessage
+    from src.memory import HistoryWindow
+    llm = FakeListChatModel(responses=["first summary", "second summary"])
+    window = HistoryWindow(max_tokens=400, summary_tokens=50, llm=llm)
+    messages = []
+    for _ in range(12):
+        messages.append(HumanMessage(content="tell me more"))
+        messages.append(AIMessage(content="more details " + "word " * 40))
+
+    first = window.apply(messages, "repeat")
+    second = window.apply(messages + [HumanMessage(content="tell me more")], "repeat")
+
+    assert llm.i == 1
+    assert len(second) == len(first) + 1
+
+
+def test_history_window_boundary_scrolled_out():
+    """Test that trimming the oldest messages does not re-summarize them."""
+    from langchain_core.language_models import FakeListChatModel
+    from langchain_core.messages import HumanMessage
+    from src.memory import HistoryWindow
+    llm = FakeListChatModel(responses=["first summary", "second summary"])
+    window = HistoryWindow(max_tokens=400, summary_tokens=50, llm=llm)
+    messages = _long_turns(10)
+
+    first = window.apply(messages, "capped")
+    kept = len(first) - 1  # Minus the summary message
+    # A capped history dropped everything up to the verbatim messages
+    trimmed = messages[-kept:] + [HumanMessage(content="ok")]
+    second = window.apply(trimmed, "capped")
+
+    assert llm.i == 1
+    assert second[1:] == trimmed
+
+
+def test_history_window_drops_summary_of_other_conversation():
+    """Test that a new conversation under a reused session id gets no old summary."""
+    from langchain_core.language_models import FakeListChatModel
+    from langchain_core.messages import HumanMessage
+    from src.memory import HistoryWindow
+    llm = FakeListChatModel(responses=["old summary"])
+    window = HistoryWindow(max_tokens=400, summary_tokens=50, llm=llm)
+    window.apply(_long_turns(10), "reused")
+
+    fresh = [HumanMessage(content="hello again")]
+
+    assert window.apply(fresh, "reused") == fresh
+    assert "reused" not in window._summaries
+
+
+def test_history_window_bounds_summaries():
+    """Test that summaries are capped by session count and idle time."""
+    from langchain_core.language_models import FakeListChatModel
+    from src.memory import HistoryWindow
+    now = [0.0]
+    llm = FakeListChatModel(responses=["summary"])
+    window = HistoryWindow(max_tokens=400, summary_tokens=50, llm=llm,
+                           max_sessions=2, idle_ttl=60, clock=lambda: now[0])
+    for session_id in ("a", "b", "c"):
+        window.apply(_long_turns(10), session_id)
+    assert list(window._summaries) == ["b", "c"]
+
+    now[0] = 61
+    window.apply(_long_turns(10), "d")
+    assert list(window._summaries) == ["d"]
+
+
+def test_store_eviction_forgets_summary():
+    """Test that an evicted session does not leave its summary behind."""
+    from src.memory import SessionStore
+    dropped = []
+    store = SessionStore(max_sessions=1, on_drop=dropped.append)
+    store.get("alice")
+    store.get("bob")
+
+    assert dropped == ["alice"]
+
+    from src import memory
+    assert memory.memory_store.on_drop == memory.history_window.forget
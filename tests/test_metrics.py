@@ -0,0 +1,105 @@
+import random
+import statistics
+
+from src.metrics import DURATION_BUCKETS, QuantileSketch, StreamingStats
+
+
+def test_streaming_stats_match_exact_values():
+    """Test that mean, variance, min and max equal the exact statistics"""
+    random.seed(7)
+    values = [random.uniform(0.1, 10) for _ in range(5000)]
+    stats = StreamingStats()
+    for value in values:
+        stats.add(value)
+
+    assert stats.count == 5000
+    assert abs(stats.mean - statistics.mean(values)) < 1e-9
+    assert abs(stats.variance - statistics.variance(values)) < 1e-6
+    assert stats.min == min(values)
+    assert stats.max == max(values)
+
+
+def test_sketch_quantiles_within_relative_error():
+    """Test that p50/p95/p99 are within 1% of the exact quantiles"""
+    random.seed(3)
+    values = sorted(random.lognormvariate(0, 1) for _ in range(20000))
+    sketch = QuantileSketch(relative_error=0.01)
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.50, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) / exact <= 0.011
+
+
+def test_sketch_memory_does_not_grow_with_samples():
+    """Test that the bucket count depends on the value range only"""
+    sketch = QuantileSketch()
+    for i in range(100000):
+        sketch.add(1 + (i % 100) / 100)
+
+    assert sketch.count == 100000
+    assert len(sketch.buckets) < 40
+
+
+def test_merge_equals_single_stream():
+    """Test that merging two halves gives the same aggregates as one stream"""
+    left, right, whole = StreamingStats(), StreamingStats(), StreamingStats()
+    for i in range(1, 101):
+        (left if i % 2 else right).add(i)
+        whole.add(i)
+
+    left.merge(right)
+
+    assert left.count == whole.count
+    assert abs(left.variance - whole.variance) < 1e-9
+    assert left.quantile(0.95) == whole.quantile(0.95)
+
+
+def test_bucket_counts_are_exact_at_bounds():
+    """Test that a value equal to a bound is counted in that bucket"""
+    left = StreamingStats(bounds=DURATION_BUCKETS)
+    right = StreamingStats(bounds=DURATION_BUCKETS)
+    for value in (0.05, 0.5, 0.0):
+        left.add(value)
+    for value in (5.0, 0.051, 500):
+        right.add(value)
+
+    left.merge(right)
+    counts = dict(zip(left.bounds, left.cumulative_counts()))
+
+    assert counts[0.05] == 2
+    assert counts[0.1] == 3
+    assert counts[0.5] == 4
+    assert counts[5] == 5
+    assert counts[120] == 5
+
+
+def test_empty_and_zero_values():
+    """Test that empty stats report nothing and zeros are counted"""
+    stats = StreamingStats()
+    assert stats.to_dict() == {"count": 0}
+    assert stats.quantile(0.5) is None
+
+    stats.add(0.0)
+    stats.add(0.0)
+    stats.add(4.0)
+    assert stats.quantile(0.5) == 0.0
+
+
+def test_rolling_window_resets_reused_slots():
+    """Test that a slot reused after the ring wraps starts empty"""
+    from src.metrics import RollingWindow
+    now = [0.0]
+    window = RollingWindow(span=10, slot_width=1, clock=lambda: now[0])
+    window.add(2.0, tokens=10)
+    window.add(2.0, tokens=10, error=True)
+
+    now[0] = 10.5  # Same ring position as t=0, one full span later
+    window.add(1.0, tokens=5)
+    stats = window.snapshot()
+
+    assert stats["count"] == 1
+    assert stats["error_rate"] == 0.0
+    assert stats["throughput"] == 0.1
+    assert stats["tokens_per_sec"] == 5.0
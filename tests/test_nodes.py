@@ -52,3 +52,69 @@ def test_decide_after_research_accepts_sufficient_content():
     state = {"research_results": long_content}
     result = decide_after_research(state)
     assert result == "analysis"
+
+
+def test_aresearch_node_updates_state(monkeypatch):
+    """Test that the async research node fills in research results"""
+    import asyncio
+    from langchain_core.language_models import FakeListChatModel
+    import src.nodes as nodes
+    from src.state import create_initial_state
+    fake = FakeListChatModel(responses=["solar facts"])
+    monkeypatch.setattr(nodes, "get_llm", lambda: fake)
+
+    state = asyncio.run(nodes.aresearch_node(create_initial_state("solar")))
+
+    assert state["research_results"] == "solar facts"
+    assert state["step_count"] == 1
+    assert state["error"] is None
+
+
+def test_research_node_records_error(monkeypatch):
+    """Test that LLM failures are stored in the state error field"""
+    import src.nodes as nodes
+    from src.state import create_initial_state
+
+    class FailingLLM:
+        def invoke(self, prompt):
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(nodes, "get_llm", lambda: FailingLLM())
+
+    state = research_node(create_initial_state("solar"))
+
+    assert state["research_results"] == ""
+    assert state["error"] == "Research failed: boom"
+
+
+def test_cost_research_node_reports_error(monkeypatch):
+    """Test that a failed cost lookup keeps the research and sets error"""
+    import src.nodes as nodes
+    from src.nodes import cost_research_node
+    from src.state import create_initial_state
+
+    class FailingLLM:
+        def invoke(self, prompt):
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(nodes, "get_llm", lambda: FailingLLM())
+    state = {**create_initial_state("solar"), "research_results": "price is high"}
+
+    result = cost_research_node(state)
+
+    assert result["research_results"] == "price is high"
+    assert result["error"] == "Cost research failed: boom"
+
+
+def test_decide_research_branches_fans_out():
+    """Test that brief research with cost concerns takes both branches"""
+    from src.nodes import decide_research_branches
+    state = {"research_results": "The price is high"}
+    assert decide_research_branches(state) == ["cost_research", "expand_research"]
+
+
+def test_decide_research_branches_sufficient():
+    """Test that long research without cost concerns goes to analysis"""
+    from src.nodes import decide_research_branches
+    state = {"research_results": "A" * 400}
+    assert decide_research_branches(state) == ["analysis"]
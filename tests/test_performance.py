@@ -85,4 +85,119 @@ def test_get_recommendations_slow_step():
     recommendations = monitor.get_recommendations()
     
     assert len(recommendations) > 0
-    assert any(r["issue"] == "High latency" for r in recommendations)
\ No newline at end of file
+    assert any(r["issue"] == "High latency" for r in recommendations)
+
+
+def _step_run(duration, status="success"):
+    return {
+        "execution_time": duration,
+        "error": None,
+        "trace_metadata": {
+            "steps": [{"step_name": "research", "duration": duration,
+                       "tokens": 100, "cost": 0.0002, "status": status}]
+        }
+    }
+
+
+def test_step_analysis_reports_percentiles():
+    """Test that per-step p50/p95/p99 come from the streaming sketch"""
+    monitor = PerformanceMonitor()
+    for i in range(1, 101):
+        monitor.record_run(_step_run(i / 10))
+
+    research = monitor.get_step_analysis()["research"]
+
+    assert abs(research["avg_duration"] - 5.05) < 1e-9
+    assert abs(research["p50_duration"] - 5.0) / 5.0 < 0.03
+    assert abs(research["p95_duration"] - 9.5) / 9.5 < 0.03
+    assert research["max_duration"] == 10.0
+    assert monitor.get_summary()["p99_execution_time"] > 9.5
+
+
+def test_recent_runs_are_bounded():
+    """Test that old runs are dropped while aggregates keep counting"""
+    monitor = PerformanceMonitor(max_recent_runs=10)
+    for _ in range(100):
+        monitor.record_run(_step_run(1.0))
+
+    assert len(monitor.runs) <= 20
+    assert monitor.get_summary()["total_runs"] == 100
+    assert monitor.step_metrics["research"]["duration"].count == 100
+
+
+class FakeClock:
+    """Manually advanced clock for window tests"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_window_stats_only_cover_recent_runs():
+    """Test that the 1m window forgets runs older than a minute"""
+    clock = FakeClock()
+    monitor = PerformanceMonitor(clock=clock)
+    for _ in range(10):
+        monitor.record_run(_step_run(1.0))
+
+    clock.now += 120
+    monitor.record_run(_step_run(4.0, status="failure"))
+
+    recent = monitor.get_window_stats("1m")
+    assert recent["runs"]["count"] == 1
+    assert recent["steps"]["research"]["error_rate"] == 1.0
+    assert abs(recent["steps"]["research"]["p95_latency"] - 4.0) / 4.0 < 0.02
+    assert recent["steps"]["research"]["tokens_per_sec"] == 25.0
+    assert monitor.get_window_stats("5m")["runs"]["count"] == 11
+
+
+def test_recommendations_from_recent_window():
+    """Test that a recent regression shows up even when lifetime averages are fine"""
+    clock = FakeClock()
+    monitor = PerformanceMonitor(clock=clock)
+    for _ in range(100):
+        monitor.record_run(_step_run(1.0))
+
+    clock.now += 3600
+    monitor.record_run(_step_run(8.0))
+
+    assert not any(r["issue"] == "High latency" for r in monitor.get_recommendations())
+    recent = monitor.get_recommendations(window="1m")
+    assert any(r["issue"] == "High latency" for r in recent)
+
+
+def test_record_run_is_exact_under_threads():
+    """Test that concurrent record_run calls lose no runs or steps"""
+    from concurrent.futures import ThreadPoolExecutor
+    monitor = PerformanceMonitor()
+
+    def record(i):
+        monitor.record_run(_step_run(0.5, status="success" if i % 4 else "failure"))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(record, range(4000)))
+
+    research = monitor.step_metrics["research"]
+    assert monitor.get_summary()["total_runs"] == 4000
+    assert research["success_count"] == 3000
+    assert research["failure_count"] == 1000
+    assert research["duration"].count == 4000
+    assert monitor.get_window_stats("1m")["steps"]["research"]["count"] == 4000
+
+
+def test_short_lived_threads_do_not_grow_shards():
+    """Test that a thread per run keeps a fixed number of shards"""
+    import threading
+    from src.metrics import DEFAULT_STRIPES
+    monitor = PerformanceMonitor()
+
+    for i in range(50):
+        thread = threading.Thread(target=monitor.record_run,
+                                  args=({"execution_time": 1.0, "step_count": 1},))
+        thread.start()
+        thread.join()
+
+    assert len(monitor._shards.all()) == DEFAULT_STRIPES
+    assert monitor.get_summary()["total_runs"] == 50
@@ -66,3 +66,140 @@ def test_get_trace_summary():
     assert summary["execution_time"] == 5.0
     assert summary["steps"] == 3
     assert summary["has_error"] is False
+
+
+def test_time_stream_records_first_token():
+    """Test that stream timing passes chunks through and records TTFT"""
+    from src.tracing import time_stream, stream_timings
+
+    chunks = list(time_stream(iter(["a", "b", "c"]), "test_stream"))
+
+    assert chunks == ["a", "b", "c"]
+    assert stream_timings[-1]["name"] == "test_stream"
+    assert stream_timings[-1]["chunks"] == 3
+    assert stream_timings[-1]["time_to_first_token"] <= stream_timings[-1]["total_time"]
+
+
+def test_estimate_tokens_counts_code_and_non_english():
+    """Test that code and CJK text are not undercounted like len // 4"""
+    assert estimate_tokens("def foo(x):\n    return x + 1") >= 10
+    assert estimate_tokens("机器学习是人工智能的一个分支") >= 10
+    assert estimate_tokens("") == 0
+
+
+def test_estimate_tokens_counts_underscores():
+    """Test that snake_case and dunder identifiers count their underscores"""
+    from src.tracing import bpe_token_count
+    assert bpe_token_count("___") > 0
+    assert bpe_token_count("__init__") > bpe_token_count("init")
+    assert bpe_token_count("max_retry_count") > bpe_token_count("max retry count")
+
+
+def test_estimate_tokens_bulk_matches_single():
+    """Test that bulk counting agrees with per-text counting"""
+    from src.tracing import estimate_tokens_bulk
+    texts = ["Hello world", "def f(): pass", "Привет, мир", "Hello world", "", "12345678"]
+
+    counts = estimate_tokens_bulk(texts)
+
+    assert list(counts) == [estimate_tokens(t) for t in texts]
+
+
+def test_set_token_counter():
+    """Test that a custom token counter can be plugged in"""
+    from src.tracing import set_token_counter, estimate_tokens_bulk
+    set_token_counter(lambda text: len(text.split()))
+    try:
+        assert estimate_tokens("one two three") == 3
+        assert list(estimate_tokens_bulk(["a b", "c"])) == [2, 1]
+    finally:
+        set_token_counter(None)
+    assert estimate_tokens("one two three") == 3
+
+
+def test_instrument_node_records_step():
+    """Test that a wrapped node appends a timed step with token counts"""
+    from src.tracing import instrument_node
+    from src.state import create_initial_state
+
+    def node(state):
+        return {**state, "analysis": "some insights here", "step_count": 1}
+
+    run, arun = instrument_node("analysis", node)
+    result = run(create_initial_state("solar panels"))
+
+    step = result["trace_metadata"]["steps"][0]
+    assert arun is None
+    assert step["step_name"] == "analysis"
+    assert step["status"] == "success"
+    assert step["duration"] >= 0
+    assert step["input_tokens"] == estimate_tokens("solar panels")
+    assert step["output_tokens"] == estimate_tokens("some insights here")
+    assert step["cost"] == estimate_cost(step["tokens"])
+
+
+def test_instrument_node_records_failure_and_keeps_input_steps():
+    """Test that a node error is a failed step and earlier steps are untouched"""
+    import asyncio
+    from src.tracing import instrument_node
+    from src.state import create_initial_state
+
+    async def anode(state):
+        return {**state, "error": "Summary failed: timeout"}
+
+    _, arun = instrument_node("summary", lambda s: s, anode)
+    state = create_initial_state("q")
+    result = asyncio.run(arun(state))
+
+    assert result["trace_metadata"]["steps"][0]["status"] == "failure"
+    assert result["trace_metadata"]["steps"][0]["error"] == "Summary failed: timeout"
+    assert state["trace_metadata"]["steps"] == []
+
+
+def test_instrument_node_records_raised_exception():
+    """Test that a node that raises becomes a failed step with an error state"""
+    from src.tracing import instrument_node
+    from src.state import create_initial_state
+
+    def node(state):
+        raise RuntimeError("boom")
+
+    run, _ = instrument_node("analysis", node)
+    result = run(create_initial_state("q"))
+
+    assert result["error"] == "analysis failed: boom"
+    assert result["trace_metadata"]["steps"][0]["status"] == "failure"
+
+
+def test_instrument_node_counts_prompt_fields_and_appended_output():
+    """Test that input counts only prompt fields and output only new text"""
+    from src.tracing import instrument_node
+    from src.state import create_initial_state
+    state = {**create_initial_state("solar"), "research_results": "word " * 400}
+
+    def node(state):
+        return {**state, "research_results": state["research_results"] + "extra facts"}
+
+    run, _ = instrument_node("cost_research", node, inputs={"research_results": 500})
+    step = run(state)["trace_metadata"]["steps"][0]
+
+    assert step["input_tokens"] == estimate_tokens(state["research_results"][:500])
+    assert step["output_tokens"] == estimate_tokens("extra facts")
+
+
+def test_estimate_tokens_memoizes_long_text():
+    """Test that long strings are counted once and give the same estimate"""
+    from src import tracing
+    calls = []
+
+    def counter(text):
+        calls.append(text)
+        return 7
+
+    tracing.set_token_counter(counter)
+    try:
+        text = "x" * (tracing.MEMO_MAX_LENGTH + 1)
+        assert estimate_tokens(text) == estimate_tokens(text) == 7
+        assert len(calls) == 1
+    finally:
+        tracing.set_token_counter(None)
@@ -39,3 +39,125 @@ def test_conditional_workflow_compiles_without_error():
         assert workflow is not None
     except Exception as e:
         pytest.fail(f"Conditional workflow compilation failed: {e}")
+
+
+def test_get_workflow_compiles_once():
+    """Test that the compiled graph is reused for the same type"""
+    from src.workflows import get_workflow, clear_workflow_cache
+    clear_workflow_cache()
+    assert get_workflow("linear") is get_workflow("linear")
+    assert get_workflow("linear") is not get_workflow("conditional")
+
+
+def test_get_workflow_rejects_unknown_type():
+    """Test that unknown workflow types raise an error"""
+    from src.workflows import get_workflow
+    with pytest.raises(ValueError):
+        get_workflow("nonexistent")
+
+
+def test_run_research_workflow_with_fake_llm(monkeypatch):
+    """Test a full linear run reusing the cached graph"""
+    from langchain_core.language_models import FakeListChatModel
+    import src.nodes as nodes
+    fake = FakeListChatModel(responses=["research", "analysis", "summary"])
+    monkeypatch.setattr(nodes, "get_llm", lambda: fake)
+
+    final_state = run_research_workflow("test query")
+
+    assert final_state["summary"] == "summary"
+    assert final_state["step_count"] == 3
+
+
+def test_arun_research_workflow_with_fake_llm(monkeypatch):
+    """Test a full async conditional run with async nodes"""
+    import asyncio
+    from langchain_core.language_models import FakeListChatModel
+    import src.nodes as nodes
+    from src.workflows import arun_research_workflow
+    fake = FakeListChatModel(responses=["brief", "more", "analysis", "summary"])
+    monkeypatch.setattr(nodes, "get_llm", lambda: fake)
+
+    final_state = asyncio.run(arun_research_workflow("test query", "conditional"))
+
+    assert final_state["summary"] == "summary"
+    assert "Expanded:" in final_state["research_results"]
+    assert final_state["step_count"] == 4
+
+
+def test_create_parallel_workflow():
+    """Test that parallel workflow can be created"""
+    from src.workflows import create_parallel_workflow
+    workflow = create_parallel_workflow()
+    assert workflow is not None
+
+
+def test_parallel_workflow_runs_both_branches(monkeypatch):
+    """Test that cost and expand branches both merge into research results"""
+    from langchain_core.runnables import RunnableLambda
+    from langchain_core.messages import AIMessage
+    import src.nodes as nodes
+
+    def respond(text):
+        if text.startswith("Research cost"):
+            return AIMessage(content="cheaper options")
+        if text.startswith("Expand"):
+            return AIMessage(content="more detail")
+        if text.startswith("Research"):
+            return AIMessage(content="price is high")
+        return AIMessage(content="done")
+
+    fake = RunnableLambda(respond)
+    monkeypatch.setattr(nodes, "get_llm", lambda: fake)
+
+    final_state = run_research_workflow("solar", "parallel")
+
+    research = final_state["research_results"]
+    assert research.startswith("price is high")
+    assert "Cost Solutions:\ncheaper options" in research
+    assert "Expanded:\nmore detail" in research
+    assert final_state["step_count"] == 5
+    assert final_state["summary"] == "done"
+
+
+def test_workflow_steps_feed_performance_monitor(monkeypatch):
+    """Test that every linear node records a step PerformanceMonitor can read"""
+    from langchain_core.language_models import FakeListChatModel
+    import src.nodes as nodes
+    from src.performance import PerformanceMonitor
+    fake = FakeListChatModel(responses=["research", "analysis", "summary"])
+    monkeypatch.setattr(nodes, "get_llm", lambda: fake)
+
+    final_state = run_research_workflow("test query")
+    monitor = PerformanceMonitor()
+    monitor.record_run(final_state)
+
+    steps = final_state["trace_metadata"]["steps"]
+    assert [s["step_name"] for s in steps] == ["research", "analysis", "summary"]
+    assert all(s["status"] == "success" and s["tokens"] > 0 for s in steps)
+    assert monitor.step_metrics["analysis"]["success_count"] == 1
+
+
+def test_parallel_workflow_records_every_step(monkeypatch):
+    """Test that parallel branches each append a traced step"""
+    from langchain_core.runnables import RunnableLambda
+    from langchain_core.messages import AIMessage
+    import src.nodes as nodes
+
+    def respond(text):
+        if text.startswith("Research cost"):
+            raise RuntimeError("throttled")
+        if text.startswith("Research"):
+            return AIMessage(content="price is high")
+        return AIMessage(content="done")
+
+    monkeypatch.setattr(nodes, "get_llm", lambda: RunnableLambda(respond))
+
+    final_state = run_research_workflow("solar", "parallel")
+
+    steps = {s["step_name"]: s for s in final_state["trace_metadata"]["steps"]}
+    assert sorted(steps) == ["analysis", "cost_research", "expand_research",
+                             "research", "summary"]
+    assert steps["cost_research"]["status"] == "failure"
+    assert steps["expand_research"]["status"] == "success"
+    assert len(final_state["trace_metadata"]["steps"]) == 5